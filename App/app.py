@@ -1,6 +1,10 @@
 import streamlit as st
+from App.recursos import iniciar_calentamiento
 
 st.set_page_config(page_title="Tu Plan Personalizado",page_icon = 'image.jpg', layout="wide", initial_sidebar_state="collapsed")
+# Mientras se rellena el formulario se cargan en segundo plano los datos y
+# módulos de la página de resultados
+iniciar_calentamiento()
 logo = "image.jpg"
 st.sidebar.image(logo, width=300  )
 
@@ -49,6 +53,11 @@ with st.form(key='user_form'):
         ("Sedentario", "Poca Actividad (1-3 veces por semana)", "Actividad Moderada (3-5 veces por semana)", 'Intensa (6-7 veces por semana)')
     )
 
+    usar_api = st.checkbox(
+        "Buscar recetas online en Spoonacular (más lento, consume peticiones de la API)",
+        value=False
+    )
+
     submit_button = st.form_submit_button(label="Generar Plan")
 
     if submit_button:
@@ -72,6 +81,7 @@ with st.form(key='user_form'):
             st.session_state["altura"] = altura
             st.session_state["edad"] = edad
             st.session_state["factor_actividad"] = factor_actividad
+            st.session_state["usar_api"] = usar_api
 
         
         st.switch_page('pages/output.py')
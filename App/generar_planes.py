@@ -0,0 +1,267 @@
+"""
+Genera planes (calorías, rutina y menú semanal) para muchos perfiles a la vez.
+
+Lee un CSV o JSONL de perfiles con las columnas peso, altura, edad, sexo,
+factor_actividad, objetivo y nivel (los mismos valores que el formulario de la
+app) y escribe un registro por perfil en JSONL o Parquet. Los usuarios se
+agrupan por tramo de calorías, objetivo y tramo de peso, y cada grupo comparte
+un único menú semanal, ajustado como en la página a los macronutrientes del
+objetivo y el peso, que se escribe una vez en el fichero de planes.
+
+Uso (desde la raíz del repositorio):
+    python -m App.generar_planes perfiles.csv -o resultados.jsonl --planes planes.jsonl
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from App.perfil import calcular_calorias_df, rutina_personalizada
+from Recetas.cache import RecipeCache
+from Recetas.local_planner import LocalMealPlanner, load_recipe_corpus
+from Recetas.mealplanner import MealPlanner
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from Rutinas.catalogo import cargar_rutinas
+from Rutinas.indice import IndiceRutinas
+
+COLUMNAS_PERFIL = ['peso', 'altura', 'edad', 'sexo', 'factor_actividad', 'objetivo', 'nivel']
+RUTA_RUTINAS = os.path.join(os.path.dirname(__file__), 'rutinas.csv')
+
+# Estado de cada proceso del pool, inicializado una vez por proceso
+_estado = {}
+
+
+def leer_perfiles(ruta: str, tamano_lote: int):
+    """Devuelve un iterador de DataFrames de como mucho tamano_lote perfiles."""
+    if ruta.endswith('.jsonl'):
+        return pd.read_json(ruta, lines=True, chunksize=tamano_lote)
+    return pd.read_csv(ruta, chunksize=tamano_lote)
+
+
+def _inicializar(
+    ruta_rutinas: str, tramo: int, usar_api: bool, ruta_cache: str, tramo_peso: float = 5
+) -> None:
+    rutinas = cargar_rutinas(ruta_rutinas)
+    _estado['rutinas'] = rutinas
+    _estado['indice'] = IndiceRutinas(rutinas)
+    _estado['tramo'] = tramo
+    _estado['tramo_peso'] = tramo_peso
+    _estado['usar_api'] = usar_api
+    _estado['planes'] = {}
+    # El optimizer (el mismo que usa la página) se crea una vez por proceso
+    _estado['recetario'] = load_recipe_corpus()
+    _estado['optimizer'] = WeeklyPlanOptimizer(RecipePool.from_corpus(_estado['recetario']))
+    if usar_api:
+        _estado['cache'] = RecipeCache(ruta_cache)
+
+
+def _plan_del_grupo(calorias_tramo: int, objetivo: str, peso_tramo: float) -> list[dict] | None:
+    """
+    Menú semanal de un grupo (tramo de calorías, objetivo y tramo de peso)
+    ajustado al objetivo y al peso como en la página. Se genera solo la
+    primera vez en cada proceso.
+    """
+    planes = _estado['planes']
+    clave = (calorias_tramo, objetivo, peso_tramo)
+    if clave in planes:
+        return None
+    if _estado['usar_api']:
+        planner = MealPlanner(
+            cache=_estado['cache'], calories_bucket=_estado['tramo'], bulk=True,
+            optimizer=_estado['optimizer'], goal=objetivo, body_weight=peso_tramo,
+        )
+    else:
+        # La semilla fija hace que todos los procesos generen el mismo plan por tramo
+        planner = LocalMealPlanner(
+            _estado['recetario'], seed=calorias_tramo,
+            goal=objetivo, body_weight=peso_tramo, optimizer=_estado['optimizer'],
+        )
+    plan = planner.get_weekly_menu(calorias_tramo).to_dict(orient='records')
+    planes[clave] = plan
+    return plan
+
+
+def procesar_lote(perfiles: pd.DataFrame) -> tuple[list[dict], dict[tuple, list[dict]]]:
+    """
+    Calcula calorías, tramos y rutina de cada perfil del lote. Devuelve los
+    registros de salida y los planes de los grupos (tramo de calorías,
+    objetivo y tramo de peso) nuevos para este proceso.
+    """
+    calorias = calcular_calorias_df(perfiles).to_numpy(dtype=float, na_value=np.nan)
+    tramo = _estado['tramo']
+    tramos = np.round(calorias / tramo) * tramo
+    tramo_peso = _estado['tramo_peso']
+    pesos = np.round(perfiles['peso'].to_numpy(dtype=float) / tramo_peso) * tramo_peso
+
+    planes_nuevos = {}
+    validos = ~np.isnan(tramos)
+    grupos = pd.DataFrame({
+        'tramo': tramos[validos], 'objetivo': perfiles['objetivo'].to_numpy()[validos], 'peso': pesos[validos],
+    }).drop_duplicates()
+    for calorias_tramo, objetivo, peso_tramo in grupos.itertuples(index=False):
+        clave = (int(calorias_tramo), objetivo, float(peso_tramo))
+        plan = _plan_del_grupo(*clave)
+        if plan is not None:
+            planes_nuevos[clave] = plan
+
+    registros = []
+    for perfil, kcal, kcal_tramo, peso_tramo in zip(
+        perfiles.to_dict(orient='records'), calorias, tramos, pesos
+    ):
+        valido = not np.isnan(kcal)
+        rutina = None
+        if valido and perfil['sexo'] in ('Hombre', 'Mujer'):
+            rutina, _ = rutina_personalizada(
+                _estado['rutinas'], perfil['nivel'], perfil['sexo'],
+                perfil['objetivo'], _estado['indice'],
+            )
+        registros.append({
+            **perfil,
+            'calorias': int(kcal) if valido else None,
+            'tramo_calorias': int(kcal_tramo) if valido else None,
+            'tramo_peso': float(peso_tramo) if valido else None,
+            'rutina': rutina,
+        })
+    return registros, planes_nuevos
+
+
+class EscritorResultados:
+    """Escribe los registros a medida que llegan, en JSONL o en Parquet."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self.parquet = ruta.endswith('.parquet')
+        self._writer = None
+        self._fichero = None if self.parquet else open(ruta, 'w', encoding='utf-8')
+
+    def escribir(self, registros: list[dict]) -> None:
+        if not self.parquet:
+            for registro in registros:
+                self._fichero.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        df = pd.DataFrame(registros).astype(
+            {'calorias': 'Int64', 'tramo_calorias': 'Int64', 'tramo_peso': 'float64', 'rutina': 'string'}
+        )
+        if self._writer is None:
+            tabla = pa.Table.from_pandas(df, preserve_index=False)
+            self._writer = pq.ParquetWriter(self.ruta, tabla.schema)
+        else:
+            tabla = pa.Table.from_pandas(df, schema=self._writer.schema, preserve_index=False)
+        self._writer.write_table(tabla)
+
+    def cerrar(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        if self._fichero is not None:
+            self._fichero.close()
+
+
+def generar(
+    entrada: str,
+    salida: str,
+    salida_planes: str = None,
+    procesos: int = None,
+    tamano_lote: int = 5000,
+    tramo: int = 100,
+    usar_api: bool = False,
+    ruta_rutinas: str = RUTA_RUTINAS,
+    ruta_cache: str = 'cache_recetas.sqlite',
+    tramo_peso: float = 5,
+) -> dict[str, float]:
+    """
+    Procesa los perfiles por lotes en un pool de procesos. Como mucho hay
+    2 lotes por proceso en vuelo, así que la memoria no depende del tamaño de
+    la entrada. Los resultados se escriben en el mismo orden que la entrada.
+    """
+    procesos = procesos or os.cpu_count() or 1
+    escritor = EscritorResultados(salida)
+    planes = open(salida_planes, 'w', encoding='utf-8') if salida_planes else None
+    grupos_escritos = set()
+    total = 0
+    inicio = time.perf_counter()
+
+    def recoger(futuro) -> None:
+        nonlocal total
+        registros, planes_nuevos = futuro.result()
+        escritor.escribir(registros)
+        for clave, plan in planes_nuevos.items():
+            if clave in grupos_escritos:
+                continue
+            grupos_escritos.add(clave)
+            if planes is not None:
+                calorias_tramo, objetivo, peso_tramo = clave
+                planes.write(json.dumps({
+                    'tramo_calorias': calorias_tramo, 'objetivo': objetivo,
+                    'tramo_peso': peso_tramo, 'plan': plan,
+                }, ensure_ascii=False) + '\n')
+        total += len(registros)
+        ritmo = total / (time.perf_counter() - inicio)
+        logger.info(f"Procesados {total} perfiles ({ritmo:.0f} perfiles/s)")
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=procesos,
+            initializer=_inicializar,
+            initargs=(ruta_rutinas, tramo, usar_api, ruta_cache, tramo_peso),
+        ) as pool:
+            pendientes = deque()
+            for lote in leer_perfiles(entrada, tamano_lote):
+                faltan = [c for c in COLUMNAS_PERFIL if c not in lote.columns]
+                if faltan:
+                    raise ValueError(f"Faltan columnas en {entrada}: {faltan}")
+                pendientes.append(pool.submit(procesar_lote, lote))
+                if len(pendientes) >= 2 * procesos:
+                    recoger(pendientes.popleft())
+            while pendientes:
+                recoger(pendientes.popleft())
+    finally:
+        escritor.cerrar()
+        if planes is not None:
+            planes.close()
+
+    duracion = time.perf_counter() - inicio
+    return {
+        'perfiles': total,
+        'tramos': len({calorias_tramo for calorias_tramo, _, _ in grupos_escritos}),
+        'planes': len(grupos_escritos),
+        'segundos': duracion,
+    }
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('entrada', help='CSV o JSONL con los perfiles')
+    parser.add_argument('-o', '--salida', required=True, help='fichero .jsonl o .parquet de resultados')
+    parser.add_argument('--planes', help='fichero JSONL con el menú semanal de cada grupo')
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--lote', type=int, default=5000, help='perfiles por lote')
+    parser.add_argument('--tramo', type=int, default=100, help='anchura en calorías de cada tramo')
+    parser.add_argument('--tramo-peso', type=float, default=5, help='anchura en kg de cada tramo de peso')
+    parser.add_argument('--api', action='store_true', help='generar los menús con Spoonacular en vez del recetario local')
+    parser.add_argument('--rutinas', default=RUTA_RUTINAS)
+    parser.add_argument('--cache', default='cache_recetas.sqlite', help='caché de recetas cuando se usa la API')
+    args = parser.parse_args(argv)
+
+    resumen = generar(
+        args.entrada, args.salida, args.planes, args.procesos, args.lote,
+        args.tramo, args.api, args.rutinas, args.cache, args.tramo_peso,
+    )
+    logger.info(
+        f"{resumen['perfiles']} perfiles, {resumen['tramos']} tramos y {resumen['planes']} planes "
+        f"en {resumen['segundos']:.1f} s"
+    )
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
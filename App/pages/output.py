@@ -1,40 +1,77 @@
+import queue
+import threading
+import time
 import streamlit as st
 import pandas as pd
-from fuzzywuzzy import fuzz
-from typing import Tuple
-from Recetas.mealplanner import MealPlanner
+from typing import Iterator
+from loguru import logger
+from App.recursos import (
+    obtener_cache_recetas,
+    obtener_cliente_servicio,
+    obtener_indice_ejercicios,
+    obtener_indice_ofertas,
+    obtener_indice_rutinas,
+    obtener_optimizador,
+    obtener_ranking_ofertas,
+    obtener_recetario,
+    obtener_rutinas,
+    obtener_scheduler,
+    obtener_servidor_metricas,
+)
+from App.perfil import calcular_calorias, rutina_personalizada
+from Decathlon.ofertas import IndiceOfertas
+from Recetas.local_planner import LocalMealPlanner
+from Rutinas.ejercicios import COLUMNAS_EJERCICIOS_UI
+from Telemetria.trazas import TRAZADOR
 
-def calcular_calorias(objetivo, peso, altura, edad, genero, factor_actividad):
+class TiemposCarga:
     """
-    Calcula las calorías diarias necesarias según el género, peso, altura, edad y nivel de actividad.
-    
-    Args:
-    peso (float): Peso en kilogramos.
-    altura (float): Altura en centímetros.
-    edad (int): Edad en años.
-    genero (str): "Hombre" o "Mujer".
-    factor_actividad (float): Factor de actividad (ejemplo: 1.2 para sedentario, 1.55 para moderado).
-    
-    Returns:
-    float: Calorías estimadas.
+    Segundos desde que empieza a pintarse la página hasta cada hito (primer
+    contenido, primer día del menú, página completa...). Solo se guarda la
+    primera vez que se alcanza cada hito, y se registra como el tramo
+    pagina.<hito> para ver sus percentiles entre sesiones.
     """
-    factor_actividad_num = {
-        'Sedentario': 1.2, 
-        'Poca Actividad (1-3 veces por semana)': 1.375,
-        'Actividad Moderada (3-5 veces por semana)': 1.55, 
-        'Intensa (6-7 veces por semana)': 1.725
-    }
-    if genero.lower() == "mujer":
-        calorias = (65 + (9.6 * peso) + (1.8 * altura) - (4.7 * edad)) * factor_actividad_num[factor_actividad]
-    elif genero.lower() == "hombre":
-        calorias = (66 + (13.7 * peso) + (5 * altura) - (6.8 * edad)) * factor_actividad_num[factor_actividad]
-
-    if objetivo == 'Build Muscle':
-        calorias += 300
-    elif objetivo == 'Lose Fat':
-        calorias -= 300
-    
-    return int(calorias)
+
+    def __init__(self, reloj=time.perf_counter):
+        self.reloj = reloj
+        self.inicio = reloj()
+        self.hitos = {}
+
+    def marcar(self, hito: str) -> float:
+        if hito not in self.hitos:
+            self.hitos[hito] = self.reloj() - self.inicio
+            TRAZADOR.registrar(f"pagina.{hito}", self.hitos[hito])
+            logger.info(f"Página de resultados: {hito} a los {self.hitos[hito]:.3f} s")
+        return self.hitos[hito]
+
+_FIN = object()
+
+def en_segundo_plano(generador: Iterator) -> Iterator:
+    """
+    Empieza a consumir el generador en un hilo aparte en el momento de la
+    llamada y devuelve un iterador con sus mismos elementos, que se pueden
+    recoger más tarde (por ejemplo, después de pintar el resto de la página).
+    Las excepciones del generador se relanzan al recorrer el iterador.
+    """
+    cola = queue.Queue()
+
+    def consumir():
+        try:
+            for elemento in generador:
+                cola.put(elemento)
+        except Exception as e:
+            cola.put(e)
+        cola.put(_FIN)
+
+    threading.Thread(target=consumir, daemon=True).start()
+
+    def recoger():
+        while (elemento := cola.get()) is not _FIN:
+            if isinstance(elemento, Exception):
+                raise elemento
+            yield elemento
+
+    return recoger()
 
 def busqueda_ofertas(sumplementos, df_productos, umbral = 60):
     """
@@ -48,22 +85,14 @@ def busqueda_ofertas(sumplementos, df_productos, umbral = 60):
     Returns:
     df_ofertas (pd.DataFrame): DataFrame con las ofertas de productos recomendados.
     """
-    ofertas = []
-    for suplemento in sumplementos:
-        for index, row in df_productos.iterrows():
-            if fuzz.partial_ratio(suplemento, row['Tipo Producto']) > umbral:
-                ofertas.append(row)
-    df_ofertas = pd.DataFrame(ofertas)
-    return df_ofertas
-
-def mostrar_productos(df_productos):
+    return IndiceOfertas(df_productos).buscar(sumplementos, umbral)
+
+def pintar_productos(productos_aleatorios : pd.DataFrame):
     """
-    Muestra productos en formato de tienda (3 arriba, 3 abajo).
+    Pinta en formato de tienda (3 arriba, 3 abajo) unas ofertas ya elegidas.
     Args:
-    df_productos (pd.DataFrame): DataFrame con los productos.
+    productos_aleatorios (pd.DataFrame): Hasta 6 ofertas con las columnas de Decathlon.catalogo.COLUMNAS_PRODUCTOS_UI.
     """
-    productos_aleatorios = df_productos.sample(frac=1).drop_duplicates(subset=['Tipo Producto']).head(6)
-
     col1, col2, col3 = st.columns(3)
     col4, col5, col6 = st.columns(3)
     columnas = [col1, col2, col3, col4, col5, col6]
@@ -73,27 +102,76 @@ def mostrar_productos(df_productos):
             st.markdown(f"### 🔥 {oferta['Tipo Producto']}")
             st.markdown(f"<div style='text-align: center;'><img src='{oferta['Image URL']}' width='150'></div>", unsafe_allow_html=True)
             st.markdown(f"### 🤑 ~~{oferta['Precio Previo']}€~~ ➡️ **{oferta['Precio']}€**")
-            st.caption(f" {oferta['Etiqueta Web']} de la marca {oferta['Marca']} con un descuento del {oferta['Descuento Aplicado (en %)']}%")
+            variantes = f" ({oferta['n_variantes']} variantes)" if oferta['n_variantes'] > 1 else ""
+            st.caption(f" {oferta['Etiqueta Web']} de la marca {oferta['Marca']} con un descuento del {oferta['Descuento Aplicado (en %)']}%{variantes}")
 
 
-def rutina_personalizada(workouts : pd.DataFrame, nivel : str, sexo : str, objetivo : str) -> Tuple[str, pd.DataFrame]:
-    # Filtramos la rutina en base a los datos proporcionados
-    if sexo == 'Hombre':
-        sexo_ingles = 'Male'
-    elif sexo == 'Mujer':
-        sexo_ingles = 'Female'
-    
-    filtered_rows = workouts[
-        (workouts['Main Goal'] == objetivo) &
-        (workouts['Workout Title'] == nivel) &
-        ((workouts['Target Gender'] == sexo_ingles) | (workouts['Target Gender'] == 'Male & Female'))
-    ]
+def mostrar_ejercicios(ejercicios : pd.DataFrame):
+    """
+    Muestra una tabla de ejercicios por cada día de la rutina.
 
-    # Seleccionamos una rutina aleatoria de las filtradas para el usuario
-    rutina_aleatoria = workouts['Workout Title'].sample(1).values[0]  
-    filtered_rows = workouts[workouts['Workout Title'] == rutina_aleatoria]
+    Args:
+    ejercicios (pd.DataFrame): Filas de la tabla de ejercicios de la rutina (IndiceEjercicios.de_filas).
+    """
+    for _, tabla in ejercicios.groupby('fila', sort=False):
+        st.write(f"📌 **{tabla['day'].iloc[0]}**")
+        tabla = tabla[list(COLUMNAS_EJERCICIOS_UI)].dropna(axis='columns', how='all')
+        st.dataframe(tabla.rename(columns=COLUMNAS_EJERCICIOS_UI), hide_index=True, use_container_width=True)
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
+DIAS_INGLES = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday','sunday'] 
+COMIDAS = ['Desayuno', 'Comida', 'Cena']
+COMIDAS_INGLES = ['breakfast', 'lunch', 'dinner']
+
+def mostrar_dia(dia : str, dia_ingles : str, df_dieta : pd.DataFrame):
+    """
+    Muestra las tres comidas de un día del menú.
+
+    Args:
+    dia (str): Nombre del día en español, para el título.
+    dia_ingles (str): Nombre del día en la columna 'Meal' ('monday', ...).
+    df_dieta (pd.DataFrame): Filas del menú (basta con las de ese día).
+    """
+    st.markdown(f'<h2 style="color: #a6fff2;"> {dia}</h2>', unsafe_allow_html=True)
+
+    for comida, comida_ingles in zip(COMIDAS, COMIDAS_INGLES):
+        # Selección de emoji para cada comida
+        if comida == 'Desayuno':
+            emoji = '☀'
+        elif comida == 'Comida':
+            emoji = '🍽'
+        elif comida == 'Cena':
+            emoji = '🌇'
+        
+        # Filtrado del DataFrame según la comida correspondiente
+        df_comida = df_dieta[df_dieta['Meal'] == f'{dia_ingles.lower()} {comida_ingles}']
+
+        # Verifica si el DataFrame contiene datos antes de intentar acceder a ellos
+        if not df_comida.empty:
+            nombre_plato = df_comida['Name'].values[0] 
+            ingredientes = df_comida['Ingredients'].values[0] 
+            instrucciones = df_comida['Instructions'].values[0] 
+
+            st.write(f'### {emoji} {comida} : {nombre_plato}')
+            st.write(f'#### 🥕 Ingredientes:\n{ingredientes}')
+            st.write(f'#### 🍳 Preparación:\n{instrucciones}')
+            st.write(f'#### 🥗 Información nutricional:\n')
+            
+            # Mostrar información nutricional si las columnas existen
+            columnas_nutricionales = ['Calories', 'Carbs', 'Fat', 'Protein']
+            columnas_presentes = [col for col in columnas_nutricionales if col in df_comida]
+            if columnas_presentes:
+                for _, row in df_comida[columnas_presentes].iterrows():
+                    calorias = row.get('Calories', 'N/A')
+                    carbs = row.get('Carbs', 'N/A')
+                    grasas = row.get('Fat', 'N/A')
+                    proteina = row.get('Protein', 'N/A')
+                    st.write(f'🔥 Calorías: {calorias} | 🥖 Carbs: {carbs} | 🧈 Grasas: {grasas} | 💪 Proteína: {proteina}')
+            else:
+                st.write('Información nutricional no disponible.')
 
-    return rutina_aleatoria, filtered_rows
+        else:
+            st.write(f'### {emoji} {comida} : No hay datos disponibles para esta comida.')
 
 
 # ------------------------------
@@ -101,7 +179,9 @@ def rutina_personalizada(workouts : pd.DataFrame, nivel : str, sexo : str, objet
 # ------------------------------           
 
 if __name__ == '__main__':
+    tiempos = TiemposCarga()
     st.set_page_config(page_title="Tu Plan Personalizado",page_icon = 'image.jpg', layout="wide", initial_sidebar_state="collapsed")
+    obtener_servidor_metricas()
     st.markdown("<h1 style='color: green;'>🏋️‍♂️Descubre Tu Rutina Personalizada, Dieta basada en Calorías Diarias y Ofertas Exclusivas en Musculación 🥑</h1>", unsafe_allow_html=True)
     logo = "image.jpg"
     st.sidebar.image(logo, width=300  )
@@ -118,24 +198,43 @@ if __name__ == '__main__':
         st.error(f"Falta la clave en session_state: {e}")
         st.stop()
     
-    #Cargar df dieta
+    # El menú se descarga en segundo plano mientras se pintan la rutina y los productos
     calorias = calcular_calorias(objetivo, peso, altura, edad, sexo, factor_actividad)
-    m = MealPlanner()
-    df_dieta = m.get_weekly_menu(calorias)
+    # Con FITPLANNER_SERVICIO_URL la página es un cliente ligero del servicio de planes
+    servicio = obtener_cliente_servicio()
+    usar_api = st.session_state.get("usar_api", False)
+    if servicio is not None:
+        menu = servicio.iter_weekly_menu(calorias, usar_api, objetivo, peso)
+    elif usar_api:
+        # MealPlanner (con requests y dotenv) solo se importa si se usa la API
+        from Recetas.mealplanner import MealPlanner
+        m = MealPlanner(
+            cache=obtener_cache_recetas(), bulk=True, scheduler=obtener_scheduler(),
+            optimizer=obtener_optimizador(), goal=objetivo, body_weight=peso,
+        )
+        menu = m.iter_weekly_menu(calorias)
+    else:
+        # El menú se ajusta a las calorías y los macronutrientes del objetivo del usuario
+        menu = LocalMealPlanner(
+            obtener_recetario(), goal=objetivo, body_weight=peso, optimizer=obtener_optimizador()
+        ).iter_weekly_menu(calorias)
+    dias_dieta = en_segundo_plano(menu)
 
     # Workouts
     st.write(f'# Rutinas Adecuadas para {nivel}')
 
-    df_rutinas = pd.read_csv('rutinas.csv')
-
-    nombre_rutina, rutina = rutina_personalizada(df_rutinas, nivel, sexo, objetivo)
-    
+    if servicio is not None:
+        nombre_rutina, rutina, ejercicios = servicio.rutina(nivel, sexo, objetivo)
+    else:
+        df_rutinas = obtener_rutinas()
+        nombre_rutina, rutina = rutina_personalizada(df_rutinas, nivel, sexo, objetivo, obtener_indice_rutinas())
+        ejercicios = obtener_indice_ejercicios().de_filas(rutina.index)
 
     st.write(f"<h2 style='color: #a6ffcc;'>Tu rutina ideal es del tipo {rutina['Workout Type'].iloc[0]}: {nombre_rutina}</h2>", unsafe_allow_html=True)
     st.write("### Detalles de la rutina:")
-    for index, row in rutina.iterrows():
-        st.write(f"📌 - **{row['title']}**: {row['content']}")
+    mostrar_ejercicios(ejercicios)
     st.write(f"## Duración: {rutina['Program Duration'].iloc[0]}, y la debes realizar {rutina['Days Per Week'].iloc[0]} días/semana 📅")
+    tiempos.marcar('primer_contenido')
 
 
     #Productos recomendades Decathlon
@@ -147,17 +246,25 @@ if __name__ == '__main__':
         for supp in supps_list:
             st.markdown(f"- ✅ **{supp}**")
     
-    df_productos = pd.read_csv('productos_paginas.csv')
-    if isinstance(recommended_supps, str) and recommended_supps:
+    hay_suplementos = isinstance(recommended_supps, str) and recommended_supps
+    if servicio is not None:
+        recomendadas, otras = servicio.ofertas(supps_list if hay_suplementos else [])
+    else:
+        ranking = obtener_ranking_ofertas()
+        recomendadas = None
+        if hay_suplementos:
+            tipos_suplementos = obtener_indice_ofertas().tipos_coincidentes(supps_list)
+            recomendadas = ranking.elegir(6, tipos_suplementos)
+        otras = ranking.elegir(6)
+    if hay_suplementos:
         st.write(f"<h2 style='color: #a6ffcc;'> Suplementos recomendados con descuentos en Decathlon</h2>", unsafe_allow_html=True)
-        df_filtrado = busqueda_ofertas(supps_list, df_productos)
-        mostrar_productos(df_filtrado)
+        pintar_productos(recomendadas)
         st.write(f"<h2 style='color: #a6ffcc;'>Otros productos recomendados con descuentos</h2>", unsafe_allow_html=True)
-        mostrar_productos(df_productos)
+        pintar_productos(otras)
     else: 
         st.write(f"<h2 style='color: #a6ffcc;'>Productos recomendados con descuentos en Decathlon</h2>", unsafe_allow_html=True)
-        df_filtrado = df_productos
-        mostrar_productos(df_filtrado)
+        pintar_productos(otras)
+    tiempos.marcar('productos')
     
 
 
@@ -166,50 +273,20 @@ if __name__ == '__main__':
     
     st.write(f"<h2 style='color: #a6ffcc;'>Meal Planner para unas {calorias} calorías diarias aprox</h2>", unsafe_allow_html=True)
 
-    
-    dias_semana = ['Lunes', 'Martes', 'Miércoles', 'Jueves', 'Viernes', 'Sábado', 'Domingo']
-    dias_ingles = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday','sunday'] 
-    comidas = ['Desayuno', 'Comida', 'Cena']
-    comidas_ingles = ['breakfast', 'lunch', 'dinner']
-
-    for dia, dia_ingles in zip(dias_semana, dias_ingles):
-        st.markdown(f'<h2 style="color: #a6fff2;"> {dia}</h2>', unsafe_allow_html=True)
-
-        for comida, comida_ingles in zip(comidas, comidas_ingles):
-            # Selección de emoji para cada comida
-            if comida == 'Desayuno':
-                emoji = '☀'
-            elif comida == 'Comida':
-                emoji = '🍽'
-            elif comida == 'Cena':
-                emoji = '🌇'
-            
-            # Filtrado del DataFrame según la comida correspondiente
-            df_comida = df_dieta[df_dieta['Meal'] == f'{dia_ingles.lower()} {comida_ingles}']
-
-            # Verifica si el DataFrame contiene datos antes de intentar acceder a ellos
-            if not df_comida.empty:
-                nombre_plato = df_comida['Name'].values[0] 
-                ingredientes = df_comida['Ingredients'].values[0] 
-                instrucciones = df_comida['Instructions'].values[0] 
-
-                st.write(f'### {emoji} {comida} : {nombre_plato}')
-                st.write(f'#### 🥕 Ingredientes:\n{ingredientes}')
-                st.write(f'#### 🍳 Preparación:\n{instrucciones}')
-                st.write(f'#### 🥗 Información nutricional:\n')
-                
-                # Mostrar información nutricional si las columnas existen
-                columnas_nutricionales = ['Calories', 'Carbs', 'Fat', 'Protein']
-                columnas_presentes = [col for col in columnas_nutricionales if col in df_comida]
-                if columnas_presentes:
-                    for _, row in df_comida[columnas_presentes].iterrows():
-                        calorias = row.get('Calories', 'N/A')
-                        carbs = row.get('Carbs', 'N/A')
-                        grasas = row.get('Fat', 'N/A')
-                        proteina = row.get('Protein', 'N/A')
-                        st.write(f'🔥 Calorías: {calorias} | 🥖 Carbs: {carbs} | 🧈 Grasas: {grasas} | 💪 Proteína: {proteina}')
-                else:
-                    st.write('Información nutricional no disponible.')
+    # Un hueco por día, en orden, que se rellena cuando llegan sus recetas
+    huecos = {}
+    for dia, dia_ingles in zip(DIAS_SEMANA, DIAS_INGLES):
+        huecos[dia_ingles] = st.empty()
+        huecos[dia_ingles].info(f'Preparando el menú del {dia}...')
 
-            else:
-                st.write(f'### {emoji} {comida} : No hay datos disponibles para esta comida.')
\ No newline at end of file
+    for dia_ingles, df_dia in dias_dieta:
+        with huecos.pop(dia_ingles).container():
+            mostrar_dia(DIAS_SEMANA[DIAS_INGLES.index(dia_ingles)], dia_ingles, df_dia)
+        tiempos.marcar('primer_dia')
+
+    for dia_ingles, hueco in huecos.items():
+        with hueco.container():
+            mostrar_dia(DIAS_SEMANA[DIAS_INGLES.index(dia_ingles)], dia_ingles, pd.DataFrame(columns=['Meal']))
+
+    tiempos.marcar('completo')
+    st.session_state['tiempos_carga'] = tiempos.hitos
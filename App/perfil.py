@@ -0,0 +1,137 @@
+"""
+Cálculos a partir del perfil del usuario (calorías diarias y rutina), sin
+dependencias de Streamlit. Los usan la página de resultados y la generación
+de planes por lotes (App.generar_planes).
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from Rutinas.indice import IndiceRutinas
+
+FACTOR_ACTIVIDAD_NUM = {
+    'Sedentario': 1.2, 
+    'Poca Actividad (1-3 veces por semana)': 1.375,
+    'Actividad Moderada (3-5 veces por semana)': 1.55, 
+    'Intensa (6-7 veces por semana)': 1.725
+}
+
+def calcular_calorias(objetivo, peso, altura, edad, genero, factor_actividad):
+    """
+    Calcula las calorías diarias necesarias según el género, peso, altura, edad y nivel de actividad.
+    
+    Args:
+    peso (float): Peso en kilogramos.
+    altura (float): Altura en centímetros.
+    edad (int): Edad en años.
+    genero (str): "Hombre" o "Mujer".
+    factor_actividad (float): Factor de actividad (ejemplo: 1.2 para sedentario, 1.55 para moderado).
+    
+    Returns:
+    float: Calorías estimadas.
+    """
+    if genero.lower() == "mujer":
+        calorias = (65 + (9.6 * peso) + (1.8 * altura) - (4.7 * edad)) * FACTOR_ACTIVIDAD_NUM[factor_actividad]
+    elif genero.lower() == "hombre":
+        calorias = (66 + (13.7 * peso) + (5 * altura) - (6.8 * edad)) * FACTOR_ACTIVIDAD_NUM[factor_actividad]
+
+    if objetivo == 'Build Muscle':
+        calorias += 300
+    elif objetivo == 'Lose Fat':
+        calorias -= 300
+    
+    return int(calorias)
+
+COLUMNAS_PERFIL = {
+    'objetivo': 'objetivo',
+    'peso': 'peso',
+    'altura': 'altura',
+    'edad': 'edad',
+    'genero': 'sexo',
+    'factor_actividad': 'factor_actividad',
+}
+
+def _por_valor_unico(valores, funcion, defecto=np.nan) -> np.ndarray:
+    """
+    Aplica funcion a cada valor distinto de valores (una vez por valor, no por
+    fila) y devuelve el resultado para todas las filas. Los nulos toman el valor
+    defecto.
+    """
+    codigos, unicos = pd.factorize(pd.Series(valores, copy=False))
+    resultados = np.array([funcion(valor) for valor in unicos] + [defecto], dtype=float)
+    return resultados[codigos]
+
+def calcular_calorias_vectorizado(objetivo, peso, altura, edad, genero, factor_actividad) -> np.ndarray:
+    """
+    Versión de calcular_calorias que recibe columnas (arrays o Series) en lugar
+    de valores sueltos y calcula todas las calorías a la vez, con los mismos
+    coeficientes y en el mismo orden de operaciones, así que el resultado
+    coincide exactamente con el de la función escalar.
+
+    Args:
+    objetivo, genero, factor_actividad: Columnas de texto (mismos valores que calcular_calorias).
+    peso, altura, edad: Columnas numéricas.
+
+    Returns:
+    np.ndarray: Calorías truncadas a entero (como float). NaN si el género o el
+    factor de actividad no son válidos.
+    """
+    peso = np.asarray(peso, dtype=float)
+    altura = np.asarray(altura, dtype=float)
+    edad = np.asarray(edad, dtype=float)
+    sexo = _por_valor_unico(genero, lambda g: {"mujer": 0, "hombre": 1}.get(str(g).lower(), np.nan))
+    factor = _por_valor_unico(factor_actividad, lambda f: FACTOR_ACTIVIDAD_NUM.get(f, np.nan))
+    ajuste = _por_valor_unico(
+        objetivo,
+        lambda o: 300 if o == 'Build Muscle' else -300 if o == 'Lose Fat' else 0,
+        0.0,
+    )
+
+    calorias = np.select(
+        [sexo == 0, sexo == 1],
+        [
+            (65 + (9.6 * peso) + (1.8 * altura) - (4.7 * edad)) * factor,
+            (66 + (13.7 * peso) + (5 * altura) - (6.8 * edad)) * factor,
+        ],
+        np.nan,
+    )
+    return np.trunc(calorias + ajuste)
+
+def calcular_calorias_df(df_perfiles: pd.DataFrame, columnas: dict = None) -> pd.Series:
+    """
+    Calcula las calorías de todos los perfiles de un DataFrame.
+
+    Args:
+    df_perfiles (pd.DataFrame): Un perfil por fila.
+    columnas (dict): Nombre de la columna de cada argumento de calcular_calorias,
+    por defecto COLUMNAS_PERFIL (las claves de session_state de la app).
+
+    Returns:
+    pd.Series: Calorías (Int64, nulas si el perfil no es válido) con el índice de df_perfiles.
+    """
+    columnas = {**COLUMNAS_PERFIL, **(columnas or {})}
+    calorias = calcular_calorias_vectorizado(
+        **{argumento: df_perfiles[columna] for argumento, columna in columnas.items()}
+    )
+    return pd.Series(calorias, index=df_perfiles.index, name='calorias').astype('Int64')
+
+def rutina_personalizada(workouts : pd.DataFrame, nivel : str, sexo : str, objetivo : str, indice : IndiceRutinas = None) -> Tuple[str, pd.DataFrame]:
+    """
+    Elige al azar una rutina del objetivo, nivel y género del usuario (las rutinas
+    'Male & Female' valen para ambos). Si no hay ninguna, se elige entre todas.
+
+    Args:
+    workouts (pd.DataFrame): Catálogo de rutinas.
+    nivel (str): Nivel de experiencia ('Beginner', 'Intermediate', 'Advanced').
+    sexo (str): "Hombre" o "Mujer".
+    objetivo (str): Objetivo principal ('Lose Fat', 'Build Muscle', ...).
+    indice (IndiceRutinas): Índice precalculado de workouts. Si no se pasa, se construye.
+
+    Returns:
+    Tuple[str, pd.DataFrame]: Título de la rutina y sus filas.
+    """
+    if indice is None:
+        indice = IndiceRutinas(workouts)
+    return indice.personalizada(nivel, sexo, objetivo)
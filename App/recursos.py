@@ -0,0 +1,190 @@
+"""
+Recursos compartidos por todas las sesiones de la app (recetario, rutinas,
+productos y sus índices) y su calentamiento.
+
+Los módulos pesados (pandas, requests...) se importan dentro de cada función,
+la primera vez que se usa, para que app.py pueda importar este módulo sin
+pagar su coste. Al abrirse la app, iniciar_calentamiento() lanza en segundo
+plano calentar(), que importa la página de resultados y llena estas cachés
+mientras el usuario rellena el formulario.
+
+Antes de desplegar se pueden preparar las instantáneas de datos en disco
+(desde la raíz del repositorio):
+    python -m App.recursos
+"""
+
+import importlib
+import os
+import threading
+import time
+from typing import TYPE_CHECKING
+
+import streamlit as st
+from loguru import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from Decathlon.ofertas import IndiceOfertas, RankingOfertas
+    from Recetas.cache import RecipeCache
+    from Recetas.optimizer import WeeklyPlanOptimizer
+    from Recetas.scheduler import RequestScheduler
+    from Rutinas.ejercicios import IndiceEjercicios
+    from Rutinas.indice import IndiceRutinas
+    from Servicio.cliente import ClienteServicio
+
+DIRECTORIO_APP = os.path.dirname(os.path.abspath(__file__))
+RUTA_RUTINAS = os.path.join(DIRECTORIO_APP, 'rutinas.csv')
+RUTA_PRODUCTOS = os.path.join(DIRECTORIO_APP, 'productos_paginas.csv')
+RUTA_CACHE_RECETAS = os.path.join(DIRECTORIO_APP, 'cache_recetas.sqlite')
+DIRECTORIO_RECETARIO = os.path.join(os.path.dirname(DIRECTORIO_APP), 'Recetas', 'obsolote_files')
+
+@st.cache_resource
+def obtener_cache_recetas() -> "RecipeCache":
+    """
+    Caché de respuestas de Spoonacular compartida por todas las sesiones.
+    FITPLANNER_CACHE_RECETAS cambia el fichero (por ejemplo, para que una
+    prueba contra el servidor local no escriba en la caché de verdad).
+    """
+    from Recetas.cache import RecipeCache
+    return RecipeCache(os.getenv("FITPLANNER_CACHE_RECETAS") or RUTA_CACHE_RECETAS)
+
+@st.cache_resource
+def obtener_scheduler() -> "RequestScheduler | None":
+    """
+    Reparte las peticiones a Spoonacular entre todas las API keys del .env,
+    compartido por todas las sesiones para respetar los límites de la API.
+    None si no hay ninguna key.
+    """
+    from Recetas.scheduler import RequestScheduler
+    return RequestScheduler.from_env()
+
+@st.cache_resource
+def obtener_recetario() -> "pd.DataFrame":
+    """
+    Recetario local con el que se generan los planes sin conexión.
+    """
+    from Recetas.local_planner import cargar_recetario
+    return cargar_recetario(DIRECTORIO_RECETARIO)
+
+@st.cache_resource
+def obtener_optimizador() -> "WeeklyPlanOptimizer":
+    """
+    Optimizador de menús con el recetario local como pool de candidatas, con
+    su nutrición ya convertida a números una sola vez para todas las sesiones.
+    """
+    from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+    return WeeklyPlanOptimizer(RecipePool.from_corpus(obtener_recetario()))
+
+@st.cache_resource
+def obtener_rutinas() -> "pd.DataFrame":
+    """
+    Catálogo de rutinas ya tipado, compartido por todas las sesiones.
+    No se debe modificar en sitio.
+    """
+    from Rutinas.catalogo import cargar_rutinas
+    return cargar_rutinas(RUTA_RUTINAS)
+
+@st.cache_resource
+def obtener_indice_rutinas() -> "IndiceRutinas":
+    from Rutinas.indice import IndiceRutinas
+    return IndiceRutinas(obtener_rutinas())
+
+@st.cache_resource
+def obtener_indice_ejercicios() -> "IndiceEjercicios":
+    """
+    Ejercicios de todas las rutinas en formato largo (un ejercicio por fila),
+    leídos de su instantánea Parquet.
+    """
+    from Rutinas.ejercicios import IndiceEjercicios, cargar_ejercicios
+    return IndiceEjercicios(cargar_ejercicios(RUTA_RUTINAS), obtener_rutinas())
+
+@st.cache_resource
+def obtener_productos() -> "pd.DataFrame":
+    """
+    Catálogo de productos del Decathlon, compartido por todas las sesiones.
+    No se debe modificar en sitio.
+    """
+    from Decathlon.catalogo import cargar_productos
+    return cargar_productos(RUTA_PRODUCTOS)
+
+@st.cache_resource
+def obtener_indice_ofertas() -> "IndiceOfertas":
+    from Decathlon.ofertas import IndiceOfertas
+    return IndiceOfertas(obtener_productos())
+
+@st.cache_resource
+def obtener_ranking_ofertas() -> "RankingOfertas":
+    """
+    Productos del Decathlon con las variantes agrupadas y las mejores ofertas
+    de cada tipo ya calculadas.
+    """
+    from Decathlon.ofertas import RankingOfertas
+    return RankingOfertas(obtener_productos())
+
+@st.cache_resource
+def obtener_servidor_metricas():
+    """
+    Si FITPLANNER_METRICAS_PUERTO está definida, sirve las métricas de los
+    tramos (HTTP, Filtering, CSV, página) en formato Prometheus en ese puerto.
+    """
+    from Telemetria.trazas import TRAZADOR
+    puerto = os.getenv("FITPLANNER_METRICAS_PUERTO")
+    return TRAZADOR.servir(int(puerto)) if puerto else None
+
+@st.cache_resource
+def obtener_cliente_servicio() -> "ClienteServicio | None":
+    """
+    Si FITPLANNER_SERVICIO_URL está definida, la página pide el menú, la rutina
+    y las ofertas a ese servicio de planes (python -m Servicio.servidor) en
+    lugar de calcularlos en este proceso. Un solo cliente, con su pool de
+    conexiones, para todas las sesiones.
+    """
+    from Servicio.cliente import ClienteServicio
+    return ClienteServicio.desde_entorno()
+
+# Lo que necesita la página de resultados para su primer render, en orden.
+# Los recursos de la API (caché y scheduler) no se calientan: solo se usan si
+# el usuario lo pide.
+PASOS_CALENTAMIENTO = {
+    "importar_pagina": lambda: importlib.import_module("App.pages.output"),
+    "rutinas": obtener_rutinas,
+    "indice_rutinas": obtener_indice_rutinas,
+    "indice_ejercicios": obtener_indice_ejercicios,
+    "productos": obtener_productos,
+    "ranking_ofertas": obtener_ranking_ofertas,
+    "indice_ofertas": obtener_indice_ofertas,
+    "recetario": obtener_recetario,
+    "optimizador": obtener_optimizador,
+}
+
+def calentar() -> dict[str, float]:
+    """
+    Ejecuta los pasos de PASOS_CALENTAMIENTO y devuelve los segundos de cada
+    uno. Un paso que falla solo se registra: la página lo volverá a intentar.
+    """
+    from Telemetria.trazas import tramo
+
+    tiempos = {}
+    for paso, funcion in PASOS_CALENTAMIENTO.items():
+        inicio = time.perf_counter()
+        try:
+            with tramo(f"calentamiento.{paso}"):
+                funcion()
+        except Exception as e:
+            logger.warning(f"Calentamiento: falló el paso {paso}: {e}")
+        tiempos[paso] = time.perf_counter() - inicio
+    logger.info(f"Calentamiento terminado en {sum(tiempos.values()):.3f} s")
+    return tiempos
+
+@st.cache_resource(show_spinner=False)
+def iniciar_calentamiento() -> threading.Thread:
+    """Lanza calentar() en segundo plano una sola vez por proceso del servidor."""
+    hilo = threading.Thread(target=calentar, name="calentamiento", daemon=True)
+    hilo.start()
+    return hilo
+
+
+if __name__ == "__main__":
+    for paso, segundos in calentar().items():
+        print(f"{paso:<20} {segundos * 1000:8.1f} ms")
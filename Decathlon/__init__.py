@@ -0,0 +1,25 @@
+"""
+Los submódulos se importan la primera vez que se usa cada nombre, así
+`import Decathlon` no carga pandas, requests ni fuzzywuzzy hasta que hacen falta.
+"""
+from typing import TYPE_CHECKING
+
+from Utilidades.perezoso import exportaciones_perezosas
+
+if TYPE_CHECKING:
+    from .catalogo import agrupar_variantes, cargar_productos
+    from .ingesta import AlmacenCatalogo, DescargaCatalogo
+    from .ofertas import IndiceOfertas, RankingOfertas
+
+_EXPORTACIONES = {
+    "AlmacenCatalogo": ".ingesta",
+    "DescargaCatalogo": ".ingesta",
+    "IndiceOfertas": ".ofertas",
+    "RankingOfertas": ".ofertas",
+    "agrupar_variantes": ".catalogo",
+    "cargar_productos": ".catalogo",
+}
+
+__all__ = list(_EXPORTACIONES)
+
+__getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTACIONES)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from Utilidades.instantaneas import cargar_snapshot
+
+COLUMNAS_CATEGORICAS_PRODUCTOS = ['Marca', 'Tipo Producto']
+# Columnas de las ofertas que muestra la página (pintar_productos)
+COLUMNAS_PRODUCTOS_UI = [
+    'Tipo Producto', 'Image URL', 'Precio Previo', 'Precio', 'n_variantes',
+    'Etiqueta Web', 'Marca', 'Descuento Aplicado (en %)',
+]
+
+
+def preparar_productos(df: pd.DataFrame) -> pd.DataFrame:
+    for columna in COLUMNAS_CATEGORICAS_PRODUCTOS:
+        df[columna] = df[columna].astype('category')
+    return df
+
+
+def cargar_productos(ruta_csv: str = 'productos_paginas.csv') -> pd.DataFrame:
+    return cargar_snapshot(ruta_csv, preparar_productos)
+
+
+def agrupar_variantes(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Agrupa las variantes (sabor, tamaño, imagen...) de un mismo producto, que
+    comparten la ruta de 'Product URL' y solo cambian en los parámetros.
+
+    Devuelve (productos, variantes):
+    - variantes: las filas de df ordenadas por producto y, dentro de cada uno,
+      por descuento de mayor a menor, con la columna 'producto' (su posición en
+      productos).
+    - productos: una fila por producto con los datos de su variante de mayor
+      descuento, más 'variantes_inicio' y 'n_variantes', el tramo de variantes
+      que le corresponde.
+    """
+    codigos, _ = pd.factorize(df['Product URL'].str.split('?', n=1).str[0])
+    descuento = df['Descuento Aplicado (en %)'].fillna(-np.inf).to_numpy()
+    orden = np.lexsort((np.arange(len(df)), -descuento, codigos))
+
+    variantes = df.iloc[orden].reset_index(drop=True)
+    variantes['producto'] = codigos[orden].astype(np.int32)
+    inicio = np.flatnonzero(np.diff(codigos[orden], prepend=-1) != 0)
+
+    productos = variantes.iloc[inicio].drop(columns='producto').reset_index(drop=True)
+    productos['variantes_inicio'] = inicio.astype(np.int32)
+    productos['n_variantes'] = np.diff(inicio, append=len(variantes)).astype(np.int32)
+    return productos, variantes
@@ -0,0 +1,302 @@
+"""
+Actualiza el catálogo de productos del Decathlon de forma incremental.
+
+Descarga todas las páginas del buscador en paralelo (misma API que
+decathlon.ipynb), compara cada producto con la versión anterior por su
+Product URL y un hash del contenido, guarda solo las filas nuevas, modificadas
+o eliminadas en un almacén versionado de ficheros Parquet y sustituye de forma
+atómica el CSV que lee la app.
+
+Uso (desde la raíz del repositorio):
+    python -m Decathlon.ingesta --salida App/productos_paginas.csv
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+URL_CATALOGO = "https://www.decathlon.es/es/ajax/nfs/browse"
+PRODUCTOS_POR_PAGINA = 40
+CLAVE = 'Product URL'
+COLUMNAS_PRODUCTOS = [
+    'Marca', 'Etiqueta Web', 'Tipo Producto', 'Precio', 'Precio Previo',
+    'Descuento Aplicado (en %)', 'Image URL', 'Product URL', 'descuento_correcto',
+]
+COLUMNAS_NUMERICAS = ['Precio', 'Precio Previo', 'Descuento Aplicado (en %)']
+DIRECTORIO_ALMACEN = os.path.join(os.path.dirname(__file__), '.catalogo')
+
+
+def peticion_pagina(offset: int) -> tuple[dict, dict]:
+    """
+    Payload y cabeceras de la página que empieza en offset. Si está disponible
+    el módulo variables del notebook (no se sube al repositorio porque lleva
+    las cabeceras de sesión), se usa su get_headers.
+    """
+    try:
+        from variables import get_headers
+    except ImportError:
+        return {'from': offset, 'size': PRODUCTOS_POR_PAGINA}, {'Content-Type': 'application/json'}
+    return get_headers(offset)
+
+
+def extraer_productos(respuesta: dict) -> list[dict]:
+    """Los mismos campos que se sacaban en decathlon.ipynb de cada producto."""
+    productos = []
+    for item in respuesta['blocks']['items']:
+        model = item['models'][0]
+        productos.append({
+            'Marca': item['brand'].get('label', 'No disponible'),
+            'Etiqueta Web': item.get('webLabel', 'No disponible'),
+            'Tipo Producto': item.get('natureLabel', 'No disponible'),
+            'Precio': model.get('price', 'No disponible'),
+            'Precio Previo': model.get('previousPrice', 'No disponible'),
+            'Descuento Aplicado (en %)': model.get('discountRate', 'No disponible'),
+            'Image URL': model.get('image', {}).get('url', 'No disponible'),
+            'Product URL': model.get('url', 'No disponible'),
+        })
+    return productos
+
+
+def tipar_productos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Deja los tipos igual venga el catálogo de la API, del CSV o del almacén
+    (números como float y textos ausentes como NaN), para que los hashes de un
+    mismo producto coincidan.
+    """
+    df = df.copy()
+    for columna in df.columns:
+        if columna in COLUMNAS_NUMERICAS:
+            df[columna] = pd.to_numeric(df[columna], errors='coerce').astype('float64')
+        elif columna == 'descuento_correcto':
+            df[columna] = df[columna].astype(bool)
+        else:
+            df[columna] = df[columna].astype(object).where(df[columna].notna(), np.nan)
+    return df
+
+
+def limpiar_productos(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte precios y descuentos a números, marca si el descuento cuadra con
+    los precios (con un margen de 1 punto) y ordena por descuento, como se hacía
+    en el notebook antes de exportar el CSV.
+    """
+    df = tipar_productos(df)
+    calculado = (df['Precio Previo'] - df['Precio']) / df['Precio Previo'] * 100
+    df['descuento_correcto'] = (calculado - df['Descuento Aplicado (en %)']).abs() <= 1
+    df = df.drop_duplicates(subset=[CLAVE], keep='first')
+    return df.sort_values('Descuento Aplicado (en %)', ascending=False, kind='stable', ignore_index=True)[
+        COLUMNAS_PRODUCTOS
+    ]
+
+
+def hash_filas(df: pd.DataFrame) -> pd.Series:
+    """Hash del contenido de cada producto (todas las columnas salvo la clave)."""
+    columnas = [c for c in COLUMNAS_PRODUCTOS if c != CLAVE]
+    return pd.Series(
+        pd.util.hash_pandas_object(df[columnas], index=False).to_numpy(),
+        index=df[CLAVE].to_numpy(),
+    )
+
+
+def comparar(anterior: pd.DataFrame, actual: pd.DataFrame) -> pd.DataFrame:
+    """
+    Filas que cambian entre dos versiones del catálogo, con una columna
+    'estado' que vale 'nuevo', 'modificado' o 'eliminado'. Las eliminadas
+    conservan sus últimos datos.
+    """
+    hash_anterior = hash_filas(anterior)
+    hash_actual = hash_filas(actual)
+    comunes = hash_actual.index.intersection(hash_anterior.index)
+    modificados = comunes[hash_actual[comunes].to_numpy() != hash_anterior[comunes].to_numpy()]
+    nuevos = hash_actual.index.difference(hash_anterior.index)
+    eliminados = hash_anterior.index.difference(hash_actual.index)
+
+    partes = [
+        actual[actual[CLAVE].isin(nuevos)].assign(estado='nuevo'),
+        actual[actual[CLAVE].isin(modificados)].assign(estado='modificado'),
+        anterior[anterior[CLAVE].isin(eliminados)].assign(estado='eliminado'),
+    ]
+    return pd.concat(partes, ignore_index=True)
+
+
+class DescargaCatalogo:
+    """
+    Descarga las páginas del catálogo en un pool de hilos que comparten una
+    requests.Session con conexiones reutilizables. Cuenta los bytes recibidos.
+    """
+
+    def __init__(
+        self,
+        url: str = URL_CATALOGO,
+        hilos: int = 8,
+        timeout: float = 20,
+        peticion: Callable[[int], tuple[dict, dict]] = peticion_pagina,
+        session: requests.Session = None,
+    ):
+        self.url = url
+        self.hilos = max(1, hilos)
+        self.timeout = timeout
+        self.peticion = peticion
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.hilos)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+        self.session = session
+        self.bytes = 0
+        self.paginas = 0
+        self._lock = threading.Lock()
+
+    def pagina(self, numero: int) -> dict:
+        payload, headers = self.peticion(numero * PRODUCTOS_POR_PAGINA)
+        response = self.session.post(self.url, json=payload, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+        with self._lock:
+            self.bytes += len(response.content)
+            self.paginas += 1
+        return response.json()
+
+    def productos(self) -> pd.DataFrame:
+        """
+        Todas las páginas del catálogo. La primera dice cuántas hay y el resto
+        se piden a la vez. Si falla alguna se lanza la excepción, para no
+        publicar un catálogo incompleto.
+        """
+        primera = self.pagina(0)
+        total = primera['pager']['total']
+        with ThreadPoolExecutor(max_workers=self.hilos) as pool:
+            respuestas = [primera, *pool.map(self.pagina, range(1, total))]
+        productos = [producto for respuesta in respuestas for producto in extraer_productos(respuesta)]
+        logger.info(f"Descargadas {total} páginas con {len(productos)} productos ({self.bytes} bytes)")
+        return pd.DataFrame(productos, columns=COLUMNAS_PRODUCTOS[:-1])
+
+
+class AlmacenCatalogo:
+    """
+    Almacén versionado del catálogo en un directorio:
+
+    - cambios-NNNNNN.parquet: filas que cambiaron en la versión NNNNNN.
+    - actual.parquet: el catálogo completo de la última versión.
+    - versiones.jsonl: un resumen por versión (fecha, cambios, bytes...).
+
+    Todas las escrituras van a un fichero temporal que luego se renombra, así
+    que quien lee nunca ve un fichero a medias.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_ALMACEN):
+        self.directorio = directorio
+        os.makedirs(directorio, exist_ok=True)
+
+    @property
+    def ruta_actual(self) -> str:
+        return os.path.join(self.directorio, 'actual.parquet')
+
+    @property
+    def ruta_versiones(self) -> str:
+        return os.path.join(self.directorio, 'versiones.jsonl')
+
+    def version(self) -> int:
+        versiones = glob.glob(os.path.join(self.directorio, 'cambios-*.parquet'))
+        return max((int(os.path.basename(v)[8:14]) for v in versiones), default=0)
+
+    def actual(self) -> pd.DataFrame | None:
+        if not os.path.exists(self.ruta_actual):
+            return None
+        return pd.read_parquet(self.ruta_actual)
+
+    def cambios(self, version: int) -> pd.DataFrame:
+        return pd.read_parquet(os.path.join(self.directorio, f'cambios-{version:06d}.parquet'))
+
+    def guardar(self, catalogo: pd.DataFrame, cambios: pd.DataFrame, resumen: dict) -> int:
+        version = self.version() + 1
+        _escribir_atomico(cambios, os.path.join(self.directorio, f'cambios-{version:06d}.parquet'))
+        _escribir_atomico(catalogo, self.ruta_actual)
+        with open(self.ruta_versiones, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'version': version, **resumen}, ensure_ascii=False) + '\n')
+        return version
+
+
+def _escribir_atomico(df: pd.DataFrame, ruta: str) -> None:
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    if ruta.endswith('.parquet'):
+        df.to_parquet(temporal, index=False)
+    else:
+        df.to_csv(temporal, index=False, encoding='utf-8')
+    os.replace(temporal, ruta)
+
+
+def actualizar(
+    salida: str = os.path.join('App', 'productos_paginas.csv'),
+    directorio: str = DIRECTORIO_ALMACEN,
+    descarga: DescargaCatalogo = None,
+) -> dict:
+    """
+    Descarga el catálogo, guarda los cambios como una versión nueva y, si hay
+    alguno, reemplaza el CSV de salida. La versión anterior es la última del
+    almacén o, la primera vez, el propio CSV de salida.
+    """
+    descarga = descarga or DescargaCatalogo()
+    almacen = AlmacenCatalogo(directorio)
+    inicio = time.perf_counter()
+
+    catalogo = limpiar_productos(descarga.productos())
+    segundos_descarga = time.perf_counter() - inicio
+
+    anterior = almacen.actual()
+    if anterior is None and os.path.exists(salida):
+        anterior = tipar_productos(pd.read_csv(salida))
+    if anterior is None:
+        anterior = catalogo.iloc[:0]
+    cambios = comparar(anterior, catalogo)
+    conteo = cambios['estado'].value_counts()
+
+    resumen = {
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'productos': len(catalogo),
+        'nuevos': int(conteo.get('nuevo', 0)),
+        'modificados': int(conteo.get('modificado', 0)),
+        'eliminados': int(conteo.get('eliminado', 0)),
+        'paginas': descarga.paginas,
+        'bytes': descarga.bytes,
+        'filas_por_segundo': len(catalogo) / max(segundos_descarga, 1e-9),
+    }
+    if len(cambios):
+        resumen['version'] = almacen.guardar(catalogo, cambios, resumen)
+        _escribir_atomico(catalogo, salida)
+    else:
+        resumen['version'] = almacen.version()
+    resumen['segundos'] = time.perf_counter() - inicio
+    logger.info(
+        f"Catálogo v{resumen['version']}: {resumen['productos']} productos "
+        f"({resumen['nuevos']} nuevos, {resumen['modificados']} modificados, "
+        f"{resumen['eliminados']} eliminados), {resumen['filas_por_segundo']:.0f} filas/s, "
+        f"{resumen['bytes']} bytes"
+    )
+    return resumen
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--salida', default=os.path.join('App', 'productos_paginas.csv'), help='CSV que lee la app')
+    parser.add_argument('--almacen', default=DIRECTORIO_ALMACEN, help='directorio de versiones del catálogo')
+    parser.add_argument('--url', default=URL_CATALOGO)
+    parser.add_argument('--hilos', type=int, default=8, help='páginas que se descargan a la vez')
+    args = parser.parse_args(argv)
+    actualizar(args.salida, args.almacen, DescargaCatalogo(args.url, args.hilos))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
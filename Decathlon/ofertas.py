@@ -0,0 +1,104 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+from Decathlon.catalogo import agrupar_variantes
+
+
+@lru_cache(maxsize=65536)
+def _puntuacion(suplemento: str, tipo: str) -> int:
+    return fuzz.partial_ratio(suplemento, tipo)
+
+
+class IndiceOfertas:
+    """
+    Índice para buscar productos por similitud con el nombre de un suplemento.
+
+    Los valores de 'Tipo Producto' se codifican una sola vez (hay unos pocos
+    cientos distintos frente a miles de filas), de modo que cada suplemento se
+    compara solo con los tipos únicos y las filas se recuperan con el código de
+    cada una. Las puntuaciones se memorizan entre búsquedas.
+    """
+
+    def __init__(self, df_productos: pd.DataFrame, columna: str = 'Tipo Producto'):
+        self.productos = df_productos
+        codigos, tipos = pd.factorize(df_productos[columna])
+        self.tipos = list(tipos)
+        # Los tipos nulos tienen código -1, que apunta a la posición extra añadida
+        # al final de cada máscara y nunca coincide
+        self._codigos = codigos
+
+    def puntuaciones(self, suplemento: str) -> np.ndarray:
+        return np.array([_puntuacion(suplemento, tipo) for tipo in self.tipos], dtype=int)
+
+    def tipos_coincidentes(self, suplementos: list[str], umbral: int = 60) -> list[str]:
+        """Tipos de producto que superan el umbral con alguno de los suplementos."""
+        coincide = np.zeros(len(self.tipos), dtype=bool)
+        for suplemento in suplementos:
+            coincide |= self.puntuaciones(suplemento) > umbral
+        return [tipo for tipo, si in zip(self.tipos, coincide) if si]
+
+    def posiciones(self, suplemento: str, umbral: int = 60) -> np.ndarray:
+        coincide = np.append(self.puntuaciones(suplemento) > umbral, False)
+        return np.flatnonzero(coincide[self._codigos])
+
+    def buscar(self, suplementos: list[str], umbral: int = 60) -> pd.DataFrame:
+        """
+        Devuelve, por cada suplemento y en el orden original, las filas cuyo
+        tipo de producto supera el umbral de similitud (igual que recorrer el
+        DataFrame fila a fila).
+        """
+        posiciones = [self.posiciones(suplemento, umbral) for suplemento in suplementos]
+        if not posiciones:
+            return self.productos.iloc[[]]
+        return self.productos.iloc[np.concatenate(posiciones)]
+
+
+class RankingOfertas:
+    """
+    Mejores ofertas de cada tipo de producto, calculadas una sola vez.
+
+    Las variantes de un mismo producto se agrupan (ver agrupar_variantes) y,
+    para cada 'Tipo Producto', se guardan las posiciones de sus top_n productos
+    con más descuento. Elegir las ofertas que se muestran es entonces sacar
+    unos cuantos tipos al azar y un producto al azar de cada uno, sin barajar
+    ni deduplicar el catálogo entero.
+    """
+
+    def __init__(self, df_productos: pd.DataFrame, top_n: int = 10):
+        self.productos, self.variantes = agrupar_variantes(df_productos)
+        self.top_n = top_n
+        codigos, tipos = pd.factorize(self.productos['Tipo Producto'])
+        descuento = self.productos['Descuento Aplicado (en %)'].fillna(-np.inf).to_numpy()
+        # Por tipo y, dentro de cada tipo, por descuento de mayor a menor
+        orden = np.lexsort((np.arange(len(codigos)), -descuento, codigos))
+        orden = orden[codigos[orden] >= 0]
+        inicio = np.flatnonzero(np.diff(codigos[orden], prepend=-1) != 0)
+        fin = np.append(inicio[1:], len(orden))
+        self._cubetas: dict[str, np.ndarray] = {
+            tipos[codigos[orden[i]]]: orden[i:min(f, i + top_n)] for i, f in zip(inicio, fin)
+        }
+        self.tipos = list(self._cubetas)
+
+    def mejores(self, tipo: str) -> pd.DataFrame:
+        """Los top_n productos del tipo, de mayor a menor descuento."""
+        return self.productos.iloc[self._cubetas.get(tipo, [])]
+
+    def elegir(self, n: int = 6, tipos: list[str] = None, rng: random.Random = random) -> pd.DataFrame:
+        """
+        n productos de tipos distintos, elegidos al azar entre las mejores
+        ofertas de cada tipo. Con tipos se limita la elección a esos tipos.
+        """
+        candidatos = self.tipos if tipos is None else [t for t in tipos if t in self._cubetas]
+        elegidos = rng.sample(candidatos, min(n, len(candidatos)))
+        posiciones = [rng.choice(self._cubetas[tipo]) for tipo in elegidos]
+        return self.productos.iloc[posiciones]
+
+    def variantes_de(self, posicion: int) -> pd.DataFrame:
+        """Variantes del producto en esa posición de productos."""
+        producto = self.productos.iloc[posicion]
+        inicio = producto['variantes_inicio']
+        return self.variantes.iloc[inicio:inicio + producto['n_variantes']]
@@ -1,4 +1,34 @@
-from filtering import Filtering
-from mealplanner import MealPlanner
+"""
+Los submódulos se importan la primera vez que se usa cada nombre, así
+`import Recetas` no carga pandas, requests ni dotenv hasta que hacen falta.
+"""
+from typing import TYPE_CHECKING
 
-__all__ = ["Filtering", "MealPlanner"]
\ No newline at end of file
+from Utilidades.perezoso import exportaciones_perezosas
+
+if TYPE_CHECKING:
+    from .cache import RecipeCache
+    from .fetcher import RecipeFetcher
+    from .filtering import Filtering
+    from .local_planner import LocalMealPlanner
+    from .mealplanner import MealPlanner
+    from .optimizer import RecipePool, WeeklyPlanOptimizer
+    from .plan_builder import MealPlanBuilder
+    from .scheduler import RequestScheduler, TokenBucket
+
+_EXPORTS = {
+    "Filtering": ".filtering",
+    "LocalMealPlanner": ".local_planner",
+    "MealPlanBuilder": ".plan_builder",
+    "MealPlanner": ".mealplanner",
+    "RecipeCache": ".cache",
+    "RecipeFetcher": ".fetcher",
+    "RecipePool": ".optimizer",
+    "RequestScheduler": ".scheduler",
+    "TokenBucket": ".scheduler",
+    "WeeklyPlanOptimizer": ".optimizer",
+}
+
+__all__ = list(_EXPORTS)
+
+__getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTS)
@@ -0,0 +1,186 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from loguru import logger
+
+
+class RecipeCache:
+    """
+    Caché de respuestas de Spoonacular en dos niveles: un LRU en memoria delante
+    de una tabla SQLite en disco.
+
+    Las claves son cadenas del tipo "endpoint:id" y los valores cualquier objeto
+    serializable a JSON. Cada entrada caduca a los ttl segundos y, cuando se
+    supera el tamaño máximo de un nivel, se descartan las menos usadas.
+    Es seguro usarla desde varios hilos (el fetcher concurrente la comparte).
+
+    Los aciertos en memoria no escriben en SQLite en cada lectura: la hora del
+    último uso se apunta y se vuelca de una vez antes de descartar entradas
+    del disco, así el disco descarta de verdad las menos usadas.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        ttl: float = 30 * 24 * 3600,
+        max_memory_items: int = 512,
+        max_disk_items: int = 20000,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_memory_items = max_memory_items
+        self.max_disk_items = max_disk_items
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        self._memory: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        # Último uso de las claves leídas de memoria, pendiente de escribir en disco
+        self._pending_access: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON cache (accessed_at)")
+        self._db.commit()
+        # Filas en disco, para no contarlas en cada escritura
+        (self._rows,) = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()
+
+    @staticmethod
+    def recipe_key(endpoint: str, meal_id: int) -> str:
+        return f"{endpoint}:{meal_id}"
+
+    @staticmethod
+    def plan_key(time_frame: str, calories_bucket: int) -> str:
+        return f"mealplanner:{time_frame}:{calories_bucket}"
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._pending_access[key] = now
+                    if len(self._pending_access) > max(self.max_memory_items, 64):
+                        self._flush_access()
+                        self._db.commit()
+                    self.hits += 1
+                    self.memory_hits += 1
+                    return value
+                del self._memory[key]
+
+            row = self._db.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > now:
+                self._db.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._db.commit()
+                value = json.loads(row[0])
+                self._remember(key, row[1], value)
+                self.hits += 1
+                self.disk_hits += 1
+                return value
+            if row is not None:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._db.commit()
+                self._rows -= 1
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, ttl: float = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, expires_at, value)
+            self._pending_access.pop(key, None)
+            inserted = self._db.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            ).rowcount
+            if inserted:
+                self._rows += 1
+            else:
+                self._db.execute(
+                    "UPDATE cache SET value = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+                    (json.dumps(value), expires_at, now, key),
+                )
+            if self._rows > self.max_disk_items:
+                excess = self._rows - self.max_disk_items
+                # Antes de elegir las menos usadas, el disco tiene que saber
+                # qué se ha leído de memoria
+                self._flush_access()
+                self._db.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (excess,),
+                )
+                self._rows -= excess
+                self.disk_evictions += excess
+            self._db.commit()
+
+    def _flush_access(self) -> None:
+        if self._pending_access:
+            self._db.executemany(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _remember(self, key: str, expires_at: float, value) -> None:
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._pending_access.clear()
+            self._db.execute("DELETE FROM cache")
+            self._db.commit()
+            self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def evictions(self) -> int:
+        """Entradas descartadas por tamaño en los dos niveles."""
+        return self.memory_evictions + self.disk_evictions
+
+    @property
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "evictions": self.evictions,
+            "memory_evictions": self.memory_evictions,
+            "disk_evictions": self.disk_evictions,
+            "memory_items": len(self._memory),
+        }
+
+    def log_stats(self) -> None:
+        logger.info(f"Estadísticas de la caché de recetas: {self.stats}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush_access()
+            self._db.commit()
+            self._db.close()
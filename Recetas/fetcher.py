@@ -0,0 +1,201 @@
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+from loguru import logger
+from requests.adapters import HTTPAdapter
+
+from Recetas.cache import RecipeCache
+from Recetas.scheduler import RequestScheduler
+from Telemetria.trazas import tramo
+
+
+class RecipeFetcher:
+    """
+    Descarga en paralelo los detalles de varias recetas de Spoonacular.
+
+    Para cada ID se piden los endpoints information, analyzedInstructions y
+    nutritionWidget, repartiendo todas las peticiones en un pool de hilos de
+    tamaño max_workers. Las recetas repetidas en el plan se piden una sola vez
+    y, si se pasa una caché, solo se descargan las respuestas que no estén en ella.
+
+    Todas las peticiones salen por una misma requests.Session, de modo que las
+    conexiones con la API se reutilizan (keep-alive) entre recetas. Si se pasa
+    un RequestScheduler, las peticiones pasan por él (rotación de API keys,
+    límite de ritmo y reintentos) y se ignora api_key.
+    """
+
+    ENDPOINTS = {
+        "information": "recipes/{meal_id}/information",
+        "analyzedInstructions": "recipes/{meal_id}/analyzedInstructions",
+        "nutritionWidget": "recipes/{meal_id}/nutritionWidget.json",
+    }
+    BULK_ENDPOINT = "recipes/informationBulk"
+    BULK_CACHE_ENDPOINT = "informationBulk"
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        max_workers: int = 8,
+        timeout: float = 10,
+        cache: RecipeCache = None,
+        session: requests.Session = None,
+        scheduler: RequestScheduler = None,
+    ):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler
+        if session is None and scheduler is not None:
+            session = scheduler.session
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    @staticmethod
+    def span_name(path: str) -> str:
+        """Nombre del tramo de una petición, sin los IDs: 'http.recipes/information'."""
+        return "http." + "/".join(part for part in path.split("/") if not part.isdigit())
+
+    def request(self, path: str, params: dict = None, description: str = ""):
+        """Envía un GET a la API y devuelve la respuesta, o None si no hubo respuesta."""
+        with tramo(self.span_name(path)) as span:
+            response = self._send(path, params, description)
+            span.anotar(status=response.status_code if response is not None else None)
+        return response
+
+    def _send(self, path: str, params: dict = None, description: str = ""):
+        url = f"{self.base_url}/{path}"
+        if self.scheduler is not None:
+            response = self.scheduler.get(url, params)
+            if response is None:
+                logger.error(f"Sin respuesta de la API para {description or path}")
+            return response
+        params = {"apiKey": self.api_key, **(params or {})}
+        try:
+            return self.session.get(url, params=params, timeout=self.timeout)
+        except requests.RequestException as e:
+            # El mensaje de la excepción lleva la URL completa, con la API key
+            logger.error(f"Error en la solicitud a {description or path}: {type(e).__name__}")
+            return None
+
+    def _get(self, path: str, params: dict = None, description: str = ""):
+        response = self.request(path, params, description)
+        if response is None:
+            return None
+        if response.status_code == 200:
+            return response.json()
+        logger.error(
+            f"Error en la solicitud: {response.status_code} - {response.text}"
+        )
+        return None
+
+    def fetch(self, endpoint: str, meal_id: int):
+        """Devuelve la respuesta JSON de un endpoint, o None si la petición falla."""
+        if self.cache is not None:
+            key = RecipeCache.recipe_key(endpoint, meal_id)
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+        path = self.ENDPOINTS[endpoint].format(meal_id=meal_id)
+        data = self._get(path, description=f"{endpoint} ({meal_id})")
+        if data is not None and self.cache is not None:
+            self.cache.set(key, data)
+        return data
+
+    def fetch_all(self, meal_ids: list[int]) -> dict[int, dict[str, object]]:
+        """
+        Devuelve {meal_id: {endpoint: respuesta}}. Si una petición falla, la
+        respuesta de ese endpoint es None.
+        """
+        unique_ids = list(dict.fromkeys(meal_ids))
+        tasks = [(endpoint, meal_id) for meal_id in unique_ids for endpoint in self.ENDPOINTS]
+        results = {meal_id: {} for meal_id in unique_ids}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            responses = pool.map(lambda task: self.fetch(*task), tasks)
+            for (endpoint, meal_id), data in zip(tasks, responses):
+                results[meal_id][endpoint] = data
+        logger.info(
+            f"Obtenidas {len(tasks)} respuestas de {len(unique_ids)} recetas "
+            f"con {self.max_workers} hilos"
+        )
+        return results
+
+    def fetch_bulk(self, meal_ids: list[int]) -> dict[int, dict]:
+        """
+        Pide todas las recetas en una sola llamada a informationBulk con
+        includeNutrition=true (ingredientes, instrucciones y nutrición juntos).
+        Devuelve {meal_id: receta}; las recetas que falten no aparecen.
+        """
+        unique_ids = list(dict.fromkeys(meal_ids))
+        results = {}
+        if self.cache is not None:
+            for meal_id in unique_ids:
+                key = RecipeCache.recipe_key(self.BULK_CACHE_ENDPOINT, meal_id)
+                data = self.cache.get(key)
+                if data is not None:
+                    results[meal_id] = data
+        missing = [meal_id for meal_id in unique_ids if meal_id not in results]
+        if missing:
+            params = {
+                "ids": ",".join(str(meal_id) for meal_id in missing),
+                "includeNutrition": "true",
+            }
+            data = self._get(self.BULK_ENDPOINT, params, description="informationBulk")
+            for recipe in data or []:
+                meal_id = recipe.get("id")
+                results[meal_id] = recipe
+                if self.cache is not None:
+                    key = RecipeCache.recipe_key(self.BULK_CACHE_ENDPOINT, meal_id)
+                    self.cache.set(key, recipe)
+        logger.info(
+            f"Obtenidas {len(results)} de {len(unique_ids)} recetas "
+            f"({len(missing)} en una petición bulk)"
+        )
+        return results
+
+    def iter_groups(
+        self, groups: dict[str, list[int]]
+    ) -> Iterator[tuple[str, dict[int, dict[str, object]]]]:
+        """
+        Descarga las recetas de varios grupos (por ejemplo, los días del plan)
+        en un mismo pool y devuelve cada grupo en cuanto tiene todas sus
+        respuestas, sin esperar a los demás. Cada grupo llega como
+        (nombre, {meal_id: {endpoint: respuesta}}).
+        """
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            # Cada petición se hace una vez aunque la receta se repita entre grupos
+            submitted = {}
+            pending = {}
+            for name, meal_ids in groups.items():
+                pending[name] = set()
+                for meal_id in dict.fromkeys(meal_ids):
+                    for endpoint in self.ENDPOINTS:
+                        task = (endpoint, meal_id)
+                        if task not in submitted:
+                            submitted[task] = pool.submit(self.fetch, *task)
+                        pending[name].add(task)
+            futures = {future: task for task, future in submitted.items()}
+            results = {}
+
+            def completed_groups():
+                for name in [name for name, tasks in pending.items() if tasks <= results.keys()]:
+                    del pending[name]
+                    yield name, {
+                        meal_id: {endpoint: results[(endpoint, meal_id)] for endpoint in self.ENDPOINTS}
+                        for meal_id in dict.fromkeys(groups[name])
+                    }
+
+            yield from completed_groups()
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+                yield from completed_groups()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
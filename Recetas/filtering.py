@@ -1,15 +1,16 @@
-from loguru import logger
+from Telemetria.trazas import registrar_payload, trazar
 
 
 class Filtering:
     @staticmethod
+    @trazar("filtering.id_by_meal")
     def filter_id_by_meal(data_in_json: dict) -> dict[str, list[int]]:
         weekly_meals_data = data_in_json.get("week", {})
         days_and_meals = {}
         for day, meals in weekly_meals_data.items():
             meals_id_list = [meal.get("id") for meal in meals.get("meals", [])]
             days_and_meals[day] = meals_id_list
-        logger.debug(f"IDs filtrados: {days_and_meals}")
+        registrar_payload("IDs filtrados: {}", lambda: days_and_meals)
         return days_and_meals
 
     @staticmethod
@@ -25,7 +26,7 @@ class Filtering:
 
         name = recipe_details.get("title", "")
         ingredients = filter_ingredients()
-        logger.debug(f"Nombre e ingredientes filtrados: {name} - {ingredients}")
+        registrar_payload("Nombre e ingredientes filtrados: {}", lambda: f"{name} - {ingredients}")
         return {"Name": name, "Ingredients": ingredients}
 
     @staticmethod
@@ -38,7 +39,7 @@ class Filtering:
             for i, instruction in enumerate(steps)
         ]
         instructions_str = " ".join(instructions_list)
-        logger.debug(f"Instrucciones filtradas: {instructions_str}")
+        registrar_payload("Instrucciones filtradas: {}", lambda: instructions_str)
         return {"Instructions": instructions_str}
 
     @staticmethod
@@ -49,5 +50,50 @@ class Filtering:
             "Fat": nutrition_data.get("fat", 0),
             "Protein": nutrition_data.get("protein", 0),
         }
-        logger.debug(f"Datos nutricionales filtrados: {filtered}")
+        registrar_payload("Datos nutricionales filtrados: {}", lambda: filtered)
         return filtered
+
+    @staticmethod
+    def filter_bulk_nutrition_facts(nutrition: dict) -> dict[str, str]:
+        """
+        Convierte la lista "nutrients" de informationBulk al mismo formato que
+        devuelve nutritionWidget ("316" calorías, "45g" del resto).
+        """
+        nutrients = {
+            nutrient.get("name"): nutrient for nutrient in nutrition.get("nutrients", [])
+        }
+
+        def amount(name: str, with_unit: bool = True):
+            nutrient = nutrients.get(name)
+            if nutrient is None:
+                return 0
+            value = round(nutrient.get("amount", 0))
+            return f"{value}{nutrient.get('unit', '')}" if with_unit else str(value)
+
+        filtered = {
+            "Calories": amount("Calories", with_unit=False),
+            "Carbs": amount("Carbohydrates"),
+            "Fat": amount("Fat"),
+            "Protein": amount("Protein"),
+        }
+        registrar_payload("Datos nutricionales filtrados: {}", lambda: filtered)
+        return filtered
+
+    @staticmethod
+    def filter_bulk_recipe(recipe: dict) -> dict[str, str]:
+        """
+        Extrae de una receta de informationBulk las mismas columnas que las
+        tres llamadas separadas (nombre, ingredientes, instrucciones y nutrición).
+        """
+        return {
+            **Filtering.filter_name_and_ingredients(recipe),
+            **Filtering.filter_instructions(recipe.get("analyzedInstructions", [])),
+            **Filtering.filter_bulk_nutrition_facts(recipe.get("nutrition", {})),
+        }
+
+    @staticmethod
+    @trazar("filtering.bulk_recipes")
+    def filter_bulk_recipes(recipes: list[dict]) -> dict[int, dict[str, str]]:
+        return {
+            recipe.get("id"): Filtering.filter_bulk_recipe(recipe) for recipe in recipes
+        }
@@ -0,0 +1,208 @@
+import ast
+import os
+from collections.abc import Iterator
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Recetas.nutrition import KCAL_PER_GRAM, MACROS, daily_targets
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from Utilidades.instantaneas import cargar_snapshot
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "obsolote_files")
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MEALS = ["breakfast", "lunch", "dinner"]
+
+
+def _join_steps(steps) -> str:
+    """Los pasos están guardados como la representación de una lista de Python."""
+    if not isinstance(steps, str) or not steps:
+        return ""
+    try:
+        return " ".join(ast.literal_eval(steps))
+    except (ValueError, SyntaxError):
+        return steps
+
+
+def _prepare_corpus(nutrition: pd.DataFrame, completed: pd.DataFrame) -> pd.DataFrame:
+    nutrition = nutrition[["id", "title", "calories", "protein", "fat", "carbs"]]
+    corpus = nutrition.merge(completed, on="id", how="left")
+    corpus["ingredients"] = corpus["ingredients"].fillna("")
+    corpus["steps"] = corpus["steps"].map(_join_steps)
+    return corpus
+
+
+def _read_completed(data_dir: str) -> pd.DataFrame:
+    return pd.read_csv(
+        os.path.join(data_dir, "recipes_completed.csv"),
+        usecols=["id", "ingredients", "steps"],
+    )
+
+
+def load_recipe_corpus(data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    Une recipes_nutrition.csv (nutrición de todas las recetas) con
+    recipes_completed.csv (ingredientes y pasos de una parte de ellas).
+    """
+    nutrition = pd.read_csv(
+        os.path.join(data_dir, "recipes_nutrition.csv"),
+        usecols=["id", "title", "calories", "protein", "fat", "carbs"],
+    )
+    corpus = _prepare_corpus(nutrition, _read_completed(data_dir))
+    logger.info(f"Recetario local cargado con {len(corpus)} recetas")
+    return corpus
+
+
+def cargar_recetario(data_dir: str = DATA_DIR) -> pd.DataFrame:
+    """
+    El mismo recetario que load_recipe_corpus, leído de una instantánea
+    binaria que se regenera si cambia alguno de los dos CSV.
+    """
+    return cargar_snapshot(
+        os.path.join(data_dir, "recipes_nutrition.csv"),
+        lambda nutrition: _prepare_corpus(nutrition, _read_completed(data_dir)),
+        "recetario",
+        dependencias=[os.path.join(data_dir, "recipes_completed.csv")],
+    )
+
+
+class LocalMealPlanner:
+    """
+    Genera el plan semanal a partir del recetario local, sin llamar a la API.
+
+    Para cada día se prueban `candidates` parejas aleatorias de recetas y se
+    completa cada pareja con la receta cuya energía más se acerca a las calorías
+    que faltan (búsqueda binaria sobre las calorías ordenadas). Todas las
+    combinaciones se puntúan a la vez con NumPy según el error relativo de
+    calorías y, si se indican macro_ratios ({"Protein": 0.3, "Carbs": 0.4,
+    "Fat": 0.3}), la desviación del reparto de macronutrientes.
+    Una receta no se repite en la misma semana.
+
+    Con un goal del formulario ('Build Muscle', 'Lose Fat'...), al terminar,
+    la semana se ajusta con WeeklyPlanOptimizer a los objetivos diarios de
+    calorías, proteína, hidratos y grasa (con body_weight, la proteína se
+    calcula por kg). El optimizador solo propone recetas completas, así que
+    el plan ajustado no tiene más comidas sin ingredientes o instrucciones
+    que el plan de partida. Se puede pasar un optimizer ya creado, que debe
+    tener como pool estas mismas recetas.
+    """
+
+    def __init__(
+        self,
+        recipes: pd.DataFrame = None,
+        macro_ratios: dict[str, float] = None,
+        candidates: int = 512,
+        macro_weight: float = 1.0,
+        incomplete_penalty: float = 0.02,
+        seed: int = None,
+        goal: str = None,
+        body_weight: float = None,
+        optimizer: WeeklyPlanOptimizer = None,
+    ):
+        self.recipes = (
+            load_recipe_corpus() if recipes is None else recipes
+        ).reset_index(drop=True)
+        self.macro_ratios = macro_ratios
+        self.goal = goal
+        self.body_weight = body_weight
+        if optimizer is None and goal is not None:
+            optimizer = WeeklyPlanOptimizer(RecipePool.from_corpus(self.recipes))
+        self.optimizer = optimizer
+        self.candidates = candidates
+        self.macro_weight = macro_weight
+        self.incomplete_penalty = incomplete_penalty
+        self.rng = np.random.default_rng(seed)
+        self._calories = self.recipes["calories"].to_numpy(dtype=float)
+        self._macro_kcal = (
+            self.recipes[["protein", "carbs", "fat"]].to_numpy(dtype=float) * KCAL_PER_GRAM
+        )
+        self._incomplete = (self.recipes["ingredients"] == "").to_numpy()
+
+    def _score(self, combos: np.ndarray, target_calories: float) -> np.ndarray:
+        total = self._calories[combos].sum(axis=1)
+        score = np.abs(total - target_calories) / target_calories
+        if self.macro_ratios:
+            target = np.array([self.macro_ratios.get(macro, 0.0) for macro in MACROS])
+            macro_kcal = self._macro_kcal[combos].sum(axis=1)
+            ratios = macro_kcal / np.maximum(macro_kcal.sum(axis=1, keepdims=True), 1.0)
+            score += self.macro_weight * np.abs(ratios - target).sum(axis=1)
+        score += self.incomplete_penalty * self._incomplete[combos].sum(axis=1)
+        return score
+
+    def _pick_day(self, target_calories: float, available: np.ndarray) -> np.ndarray:
+        idx = np.flatnonzero(available)
+        order = idx[np.argsort(self._calories[idx], kind="stable")]
+        sorted_calories = self._calories[order]
+
+        first = self.rng.choice(idx, self.candidates)
+        second = self.rng.choice(idx, self.candidates)
+        remaining = target_calories - self._calories[first] - self._calories[second]
+        pos = np.searchsorted(sorted_calories, remaining)
+        below = order[np.clip(pos - 1, 0, len(order) - 1)]
+        above = order[np.clip(pos, 0, len(order) - 1)]
+        third = np.where(
+            np.abs(self._calories[below] - remaining) <= np.abs(self._calories[above] - remaining),
+            below,
+            above,
+        )
+
+        combos = np.stack([first, second, third], axis=1)
+        score = self._score(combos, target_calories)
+        repeated = (first == second) | (first == third) | (second == third)
+        score[repeated] = np.inf
+        best = combos[np.argmin(score)]
+        # Desayuno la más ligera, comida la más fuerte y cena la intermedia
+        lightest, middle, heaviest = best[np.argsort(self._calories[best], kind="stable")]
+        return np.array([lightest, heaviest, middle])
+
+    def _row(self, meal_label: str, recipe: pd.Series) -> dict[str, str]:
+        return {
+            "Meal": meal_label,
+            "Name": recipe["title"],
+            "Ingredients": recipe["ingredients"],
+            "Instructions": recipe["steps"],
+            "Calories": str(round(recipe["calories"])),
+            "Carbs": f"{round(recipe['carbs'])}g",
+            "Fat": f"{round(recipe['fat'])}g",
+            "Protein": f"{round(recipe['protein'])}g",
+        }
+
+    def _pick_week(self, target_calories: float) -> list[np.ndarray]:
+        available = np.ones(len(self.recipes), dtype=bool)
+        week = []
+        for _ in DAYS:
+            if available.sum() < 3:
+                available[:] = True
+            picked = self._pick_day(target_calories, available)
+            available[picked] = False
+            week.append(picked)
+        return week
+
+    def _optimize_week(self, week: list[np.ndarray], target_calories: float) -> list[np.ndarray]:
+        ids = self.recipes["id"].to_numpy()
+        days_and_ids = {day: ids[picked].tolist() for day, picked in zip(DAYS, week)}
+        optimized = self.optimizer.optimize(
+            days_and_ids, daily_targets(target_calories, self.goal, self.body_weight)
+        )
+        rows = pd.Index(ids)
+        return [rows.get_indexer(optimized[day]) for day in DAYS]
+
+    def iter_weekly_menu(self, target_calories: int) -> Iterator[tuple[str, pd.DataFrame]]:
+        """Devuelve (día, filas del día) de cada día de la semana, en orden."""
+        week = self._pick_week(float(target_calories))
+        if self.optimizer is not None:
+            week = self._optimize_week(week, float(target_calories))
+        for i, (day, picked) in enumerate(zip(DAYS, week)):
+            rows = [
+                self._row(f"{day} {meal}", self.recipes.iloc[recipe_idx])
+                for meal, recipe_idx in zip(MEALS, picked)
+            ]
+            start = i * len(MEALS)
+            yield day, pd.DataFrame(rows, index=pd.RangeIndex(start, start + len(rows)))
+
+    def get_weekly_menu(self, target_calories: int) -> pd.DataFrame:
+        df = pd.concat([day_df for _, day_df in self.iter_weekly_menu(target_calories)])
+        logger.info(f"Menú semanal local generado para {target_calories} calorías")
+        return df
@@ -1,130 +1,272 @@
 import os
-import requests
+from collections.abc import Iterator
+
 import pandas as pd
 from dotenv import load_dotenv
 from loguru import logger
+from Recetas.cache import RecipeCache
+from Recetas.fetcher import RecipeFetcher
 from Recetas.filtering import Filtering  # Importa la clase Filtering
+from Recetas.nutrition import daily_targets
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from Recetas.plan_builder import MEAL_SLOTS, MealPlanBuilder
+from Recetas.scheduler import RequestScheduler
+from Telemetria.trazas import registrar_payload, trazar
 
 load_dotenv()
 
 
 class MealPlanner:
-    URL_PLANNER = "https://api.spoonacular.com/mealplanner/generate"
+    BASE_URL = "https://api.spoonacular.com"
+
+    def __init__(
+        self,
+        api_key: str = None,
+        base_url: str = None,
+        max_workers: int = 8,
+        cache: RecipeCache = None,
+        calories_bucket: int = 100,
+        bulk: bool = False,
+        scheduler: RequestScheduler = None,
+        optimizer: WeeklyPlanOptimizer = None,
+        goal: str = None,
+        body_weight: float = None,
+    ):
+        """
+        max_workers es el número de peticiones simultáneas a la API al descargar
+        las recetas del plan. Con max_workers=1 se usa el camino secuencial.
+
+        Si se pasa una caché, las recetas se guardan por endpoint e ID, y los
+        planes semanales por tramos de calories_bucket calorías: usuarios con
+        objetivos parecidos comparten el mismo plan.
 
-    def __init__(self, api_key: str = None):
+        Con bulk=True todas las recetas de la semana se piden en una única
+        llamada a informationBulk, así el plan completo cuesta dos peticiones.
+
+        Con un scheduler las peticiones se reparten entre sus API keys, con
+        límite de ritmo y reintentos; api_key no se usa.
+
+        Sin base_url se usa la variable de entorno SPOONACULAR_BASE_URL si
+        existe (por ejemplo para apuntar la app al servidor de pruebas).
+
+        Con un optimizer, el plan de la API se ajusta a los objetivos diarios
+        de calorías y macronutrientes del goal del usuario (y de su
+        body_weight) antes de descargar las recetas: se piden en bulk las del
+        plan original para conocer su nutrición y algunas se cambian por otras
+        del pool del optimizer. Conviene usarlo con bulk=True y una caché, así
+        las recetas del plan no se piden dos veces.
+        """
         self.api_key = api_key if api_key is not None else os.getenv("API_KEY6")
-        self.daily_meals_plan = {
-            "Meal": [],
-            "Name": [],
-            "Ingredients": [],
-            "Instructions": [],
-            "Calories": [],
-            "Carbs": [],
-            "Fat": [],
-            "Protein": [],
-        }
-        logger.info(f"MealPlanner initialized with API_KEY: {self.api_key}")
+        self.base_url = (base_url or os.getenv("SPOONACULAR_BASE_URL") or self.BASE_URL).rstrip("/")
+        self.max_workers = max_workers
+        self.cache = cache
+        self.calories_bucket = calories_bucket
+        self.bulk = bulk
+        self.scheduler = scheduler
+        self.optimizer = optimizer
+        self.goal = goal
+        self.body_weight = body_weight
+        self.fetcher = RecipeFetcher(
+            self.api_key,
+            self.base_url,
+            self.max_workers,
+            cache=self.cache,
+            scheduler=self.scheduler,
+        )
+        self._last_plan: MealPlanBuilder = None
+        # Nunca se escribe la API key en el log
+        logger.info(
+            f"MealPlanner initialized (base_url={self.base_url}, "
+            f"max_workers={self.max_workers}, bulk={self.bulk})"
+        )
 
     def _meal_planner(
         self, time_frame: str = "Week", target_calories: int = 2000
     ) -> dict[str, list[int]]:
+        if self.cache is not None:
+            target_calories = self.bucket(target_calories)
+            cache_key = RecipeCache.plan_key(time_frame, target_calories)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Plan recuperado de la caché: {cache_key}")
+                return cached
         params = {
-            "apiKey": self.api_key,
             "timeFrame": time_frame,
             "targetCalories": target_calories,
         }
         logger.info(f"Realizando petición a la API con parámetros: {params}")
-        response = requests.get(self.URL_PLANNER, params=params)
+        response = self.fetcher.request("mealplanner/generate", params)
+        if response is None:
+            return {}
         if response.status_code == 200:
             data = response.json()
-            logger.debug(f"Respuesta recibida: {data}")
-            return Filtering.filter_id_by_meal(data)
+            registrar_payload("Respuesta recibida: {}", lambda: data)
+            days_and_ids = Filtering.filter_id_by_meal(data)
+            if self.cache is not None and days_and_ids:
+                self.cache.set(cache_key, days_and_ids)
+            return days_and_ids
         else:
             logger.error(
                 f"Error en la solicitud: {response.status_code} - {response.text}"
             )
             return {}
 
-    def _insert_meal_plan_attributes(self, data_to_insert: dict[str, str]):
+    def bucket(self, target_calories: int) -> int:
+        """Tramo de calories_bucket calorías en el que cae target_calories."""
+        return self.calories_bucket * round(target_calories / self.calories_bucket)
+
+    def weekly_plan(self, target_calories: int) -> dict[str, list[int]]:
+        """IDs de las recetas de cada día del plan semanal, sin descargarlas."""
+        return self._meal_planner(target_calories=target_calories)
+
+    def optimize_plan(
+        self,
+        days_and_ids: dict[str, list[int]],
+        target_calories: int,
+        goal: str = None,
+        body_weight: float = None,
+        recipes: dict[int, dict[str, str]] = None,
+    ) -> dict[str, list[int]]:
         """
-        data_to_insert son los datos filtrados que se quieren añadir al plan de
-        comidas diario.
+        Ajusta un plan de weekly_plan con el optimizer a los objetivos diarios
+        de target_calories, goal y body_weight (sin goal, los del planner).
+        recipes son las recetas del plan ya filtradas, si ya se tienen; si no,
+        se piden en bulk. Sin optimizer el plan se devuelve igual.
         """
-        for key, value in data_to_insert.items():
-            self.daily_meals_plan[key].append(value)
-            logger.debug(f"Asignando {key}: {value}")
+        if self.optimizer is None or not days_and_ids:
+            return days_and_ids
+        if goal is None:
+            goal, body_weight = self.goal, self.body_weight
+        if recipes is None:
+            plan_ids = [meal_id for meal_ids in days_and_ids.values() for meal_id in meal_ids]
+            recipes = Filtering.filter_bulk_recipes(
+                list(self.fetcher.fetch_bulk(plan_ids).values())
+            )
+        return self.optimizer.optimize(
+            days_and_ids,
+            daily_targets(target_calories, goal, body_weight),
+            extra=RecipePool.from_recipes(recipes),
+        )
+
+    @property
+    def daily_meals_plan(self) -> dict[str, list]:
+        """Columnas del último plan generado (cada plan empieza de cero)."""
+        if self._last_plan is None:
+            return {column: [] for column in MealPlanBuilder.COLUMNS}
+        return self._last_plan.to_dict()
 
     def format_meal_name(self, index: 1) -> str:
-        if index == 1:
-            return "breakfast"
-        elif index == 2:
-            return "lunch"
-        elif index == 3:
-            return "dinner"
-    
-    def _get_recipe_name_and_ingredients(self, days_and_ids: dict[str, list[int]]):
-        for day, meal_ids_list in days_and_ids.items():
-            for idx, meal_id in enumerate(meal_ids_list):
-                url = f"https://api.spoonacular.com/recipes/{meal_id}/information"
-                params = {"apiKey": self.api_key}
-                response = requests.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    filtered = Filtering.filter_name_and_ingredients(data)
-                    self._insert_meal_plan_attributes(filtered)
-                    meal_label = f"{day} {self.format_meal_name(idx + 1)}"
-                    self.daily_meals_plan["Meal"].append(meal_label)
-                    logger.info(
-                        f"Datos de receta añadidos para {meal_label}: {filtered}"
-                    )
-                else:
-                    logger.error(
-                        f"Error en la solicitud: {response.status_code} - {response.text}"
-                    )
-
-    def _get_instructions(self, days_and_ids: dict[str, list[int]]):
-        for day, meal_ids_list in days_and_ids.items():
-            for meal_id in meal_ids_list:
-                url = f"https://api.spoonacular.com/recipes/{meal_id}/analyzedInstructions"
-                params = {"apiKey": self.api_key}
-                response = requests.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    filtered = Filtering.filter_instructions(data)
-                    self._insert_meal_plan_attributes(filtered)
-                    logger.info(f"Instrucciones añadidas para la receta {meal_id}")
-                else:
-                    logger.error(
-                        f"Error en la solicitud: {response.status_code} - {response.text}"
-                    )
-
-    def _get_nutrition_facts(self, days_and_ids: dict[str, list[int]]):
-        for day, meal_ids_list in days_and_ids.items():
-            for meal_id in meal_ids_list:
-                url = f"https://api.spoonacular.com/recipes/{meal_id}/nutritionWidget.json"
-                params = {"apiKey": self.api_key}
-                response = requests.get(url, params=params)
-                if response.status_code == 200:
-                    data = response.json()
-                    filtered = Filtering.filter_nutrition_facts(data)
-                    self._insert_meal_plan_attributes(filtered)
-                    logger.info(
-                        f"Datos nutricionales añadidos para la receta {meal_id}"
-                    )
-                else:
-                    logger.error(
-                        f"Error en la solicitud: {response.status_code} - {response.text}"
-                    )
+        return MEAL_SLOTS.get(index)
+
+    def _get_recipe_name_and_ingredients(self, plan: MealPlanBuilder):
+        for record in plan.records:
+            data = self.fetcher.fetch("information", record.recipe_id)
+            if data is not None:
+                filtered = Filtering.filter_name_and_ingredients(data)
+                plan.set(*record.key, filtered)
+                logger.info(f"Datos de receta añadidos para {record.label}")
+                registrar_payload("Receta filtrada: {}", lambda: filtered)
 
+    def _get_instructions(self, plan: MealPlanBuilder):
+        for record in plan.records:
+            data = self.fetcher.fetch("analyzedInstructions", record.recipe_id)
+            if data is not None:
+                plan.set(*record.key, Filtering.filter_instructions(data))
+                logger.info(f"Instrucciones añadidas para la receta {record.recipe_id}")
+
+    def _get_nutrition_facts(self, plan: MealPlanBuilder):
+        for record in plan.records:
+            data = self.fetcher.fetch("nutritionWidget", record.recipe_id)
+            if data is not None:
+                plan.set(*record.key, Filtering.filter_nutrition_facts(data))
+                logger.info(
+                    f"Datos nutricionales añadidos para la receta {record.recipe_id}"
+                )
+
+    def _insert_recipes(
+        self, plan: MealPlanBuilder, recipes: dict[int, dict[str, str]]
+    ):
+        """
+        Rellena el plan con las recetas ya filtradas. Las que faltan conservan
+        los valores vacíos, así que las filas no se desalinean.
+        """
+        for meal_id, recipe in recipes.items():
+            plan.set_recipe(meal_id, recipe)
+            logger.debug(f"Receta {meal_id} añadida al plan")
+
+    @staticmethod
+    @trazar("filtering.responses")
+    def _filter_responses(responses: dict[int, dict[str, object]]) -> dict[int, dict[str, str]]:
+        return {
+            meal_id: {
+                **Filtering.filter_name_and_ingredients(response["information"] or {}),
+                **Filtering.filter_instructions(response["analyzedInstructions"] or []),
+                **Filtering.filter_nutrition_facts(response["nutritionWidget"] or {}),
+            }
+            for meal_id, response in responses.items()
+        }
+
+    def _get_recipes_concurrently(self, plan: MealPlanBuilder):
+        """
+        Descarga en paralelo las tres partes de cada receta y las escribe en su
+        fila del plan, así las filas quedan alineadas aunque alguna petición
+        falle.
+        """
+        responses = self.fetcher.fetch_all(plan.recipe_ids)
+        self._insert_recipes(plan, self._filter_responses(responses))
+
+    def _get_recipes_in_bulk(self, plan: MealPlanBuilder):
+        recipes = Filtering.filter_bulk_recipes(
+            list(self.fetcher.fetch_bulk(plan.recipe_ids).values())
+        )
+        self._insert_recipes(plan, recipes)
+
+    @trazar("mealplanner.weekly_menu")
     def get_weekly_menu(self, target_calories: int) -> pd.DataFrame:
-        days_and_ids = self._meal_planner(target_calories= target_calories)
-        self._get_recipe_name_and_ingredients(days_and_ids)
-        self._get_instructions(days_and_ids)
-        self._get_nutrition_facts(days_and_ids)
-        df = pd.DataFrame(self.daily_meals_plan)
+        days_and_ids = self.optimize_plan(
+            self._meal_planner(target_calories=target_calories), target_calories
+        )
+        # Cada llamada usa un plan nuevo, así una misma instancia puede generar
+        # muchos planes sin acumular filas
+        plan = MealPlanBuilder(days_and_ids)
+        if self.bulk:
+            self._get_recipes_in_bulk(plan)
+        elif self.max_workers > 1:
+            self._get_recipes_concurrently(plan)
+        else:
+            self._get_recipe_name_and_ingredients(plan)
+            self._get_instructions(plan)
+            self._get_nutrition_facts(plan)
+        self._last_plan = plan
+        df = plan.to_dataframe()
         logger.info("Menú semanal generado")
         return df
 
+    def iter_weekly_menu(self, target_calories: int) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        Igual que get_weekly_menu, pero devuelve (día, filas del día) en cuanto
+        llegan las recetas de cada día, para ir mostrando el plan mientras se
+        descarga el resto; los días pueden llegar en cualquier orden. Con
+        bulk=True toda la semana se pide en una única llamada a
+        informationBulk, como en get_weekly_menu, y los días se devuelven en
+        orden en cuanto llega.
+        """
+        days_and_ids = self.optimize_plan(
+            self._meal_planner(target_calories=target_calories), target_calories
+        )
+        plan = MealPlanBuilder(days_and_ids)
+        self._last_plan = plan
+        if self.bulk:
+            self._get_recipes_in_bulk(plan)
+            for day in days_and_ids:
+                logger.info(f"Recetas del {day} listas")
+                yield day, plan.day_frame(day)
+            return
+        for day, responses in self.fetcher.iter_groups(days_and_ids):
+            self._insert_recipes(plan, self._filter_responses(responses))
+            logger.info(f"Recetas del {day} listas")
+            yield day, plan.day_frame(day)
+
 
 if __name__ == "__main__":
     planner = MealPlanner()
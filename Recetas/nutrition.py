@@ -0,0 +1,94 @@
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# Columnas de nutrición de Filtering, en el orden de las columnas de los arrays
+NUTRIENTS = ["Calories", "Protein", "Carbs", "Fat"]
+# kcal por gramo de cada macronutriente, en el orden de MACROS
+MACROS = ["Protein", "Carbs", "Fat"]
+KCAL_PER_GRAM = np.array([4.0, 4.0, 9.0])
+
+# Reparto de las calorías del día entre macronutrientes según el objetivo del
+# formulario (los mismos valores que 'objetivo' en session_state)
+GOAL_MACRO_RATIOS = {
+    "Build Muscle": {"Protein": 0.30, "Carbs": 0.45, "Fat": 0.25},
+    "Lose Fat": {"Protein": 0.35, "Carbs": 0.35, "Fat": 0.30},
+    "General Fitness": {"Protein": 0.25, "Carbs": 0.50, "Fat": 0.25},
+    "Increase Strength": {"Protein": 0.30, "Carbs": 0.45, "Fat": 0.25},
+    "Sports Performance": {"Protein": 0.20, "Carbs": 0.55, "Fat": 0.25},
+}
+DEFAULT_MACRO_RATIOS = GOAL_MACRO_RATIOS["General Fitness"]
+# Gramos de proteína por kg de peso, cuando se conoce el peso del usuario
+GOAL_PROTEIN_PER_KG = {
+    "Build Muscle": 1.8,
+    "Lose Fat": 2.0,
+    "Increase Strength": 1.8,
+}
+
+_NUMBER = re.compile(r"[-+]?\d+(?:[.,]\d+)?")
+
+
+def parse_amount(value) -> float:
+    """
+    Cantidad numérica de un valor de nutrición de Spoonacular o Filtering
+    ("45g", "316", "1,5 g", 12). Devuelve NaN si no hay ningún número.
+    """
+    if isinstance(value, (int, float, np.number)) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, str):
+        return math.nan
+    match = _NUMBER.search(value)
+    return float(match.group().replace(",", ".")) if match else math.nan
+
+
+def parse_column(values: pd.Series) -> np.ndarray:
+    """parse_amount para una columna entera, sin recorrerla fila a fila si ya es numérica."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float, na_value=np.nan)
+    text = values.astype("string").str.extract(f"({_NUMBER.pattern})", expand=False)
+    return pd.to_numeric(text.str.replace(",", ".", regex=False), errors="coerce").to_numpy(
+        dtype=float, na_value=np.nan
+    )
+
+
+def nutrition_array(recipes: pd.DataFrame, columns: list[str] = NUTRIENTS) -> np.ndarray:
+    """
+    Nutrición de las recetas como array float de forma (recetas, 4): kcal y
+    gramos de proteína, hidratos y grasa. Sirve tanto para filas de
+    MealPlanBuilder ("45g") como para el recetario local (columnas numéricas
+    en minúsculas, pasando columns=["calories", "protein", "carbs", "fat"]).
+    """
+    if recipes.empty:
+        return np.empty((0, len(columns)))
+    return np.column_stack([parse_column(recipes[column]) for column in columns])
+
+
+def recipes_nutrition(recipes: dict[int, dict[str, str]]) -> tuple[np.ndarray, np.ndarray]:
+    """IDs y nutrición numérica de recetas ya filtradas ({meal_id: columnas de Filtering})."""
+    ids = np.fromiter(recipes, dtype=np.int64, count=len(recipes))
+    values = np.array(
+        [[parse_amount(recipe.get(column)) for column in NUTRIENTS] for recipe in recipes.values()],
+        dtype=float,
+    ).reshape(len(recipes), len(NUTRIENTS))
+    return ids, values
+
+
+def daily_targets(target_calories: float, goal: str = None, body_weight: float = None) -> np.ndarray:
+    """
+    Objetivo diario [kcal, g de proteína, g de hidratos, g de grasa].
+
+    Las calorías se reparten según GOAL_MACRO_RATIOS. Si se conoce el peso y el
+    objetivo tiene una cantidad de proteína por kg, la proteína se fija con
+    ella y el resto de calorías se reparte entre hidratos y grasa en la misma
+    proporción que antes.
+    """
+    ratios = GOAL_MACRO_RATIOS.get(goal, DEFAULT_MACRO_RATIOS)
+    macro_kcal = target_calories * np.array([ratios[macro] for macro in MACROS])
+    protein_per_kg = GOAL_PROTEIN_PER_KG.get(goal)
+    if body_weight and protein_per_kg:
+        protein_kcal = min(body_weight * protein_per_kg * KCAL_PER_GRAM[0], 0.5 * target_calories)
+        rest = macro_kcal[1:] / macro_kcal[1:].sum() * (target_calories - protein_kcal)
+        macro_kcal = np.array([protein_kcal, *rest])
+    return np.concatenate([[float(target_calories)], macro_kcal / KCAL_PER_GRAM])
@@ -0,0 +1,241 @@
+import time
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Recetas.nutrition import NUTRIENTS, nutrition_array, recipes_nutrition
+
+# Columnas de nutrición del recetario local, en el orden de NUTRIENTS
+CORPUS_COLUMNS = ["calories", "protein", "carbs", "fat"]
+# Peso de cada nutriente en el error de un día, en el orden de NUTRIENTS: las
+# calorías son lo primero, luego la proteína
+DEFAULT_WEIGHTS = [3.0, 1.0, 0.5, 0.5]
+
+
+class RecipePool:
+    """
+    Recetas candidatas del optimizador: sus IDs de Spoonacular y su nutrición
+    numérica en un array float32 de forma (recetas, 4), en el orden de
+    NUTRIENTS. Las recetas sin calorías o con algún valor que no se pudo leer
+    no se proponen como candidatas, y tampoco las que no están completas (sin
+    ingredientes o sin instrucciones), aunque sí pueden formar parte del plan
+    que se optimiza.
+    """
+
+    def __init__(self, ids, values, complete=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float32).reshape(len(self.ids), len(NUTRIENTS))
+        self.valid = np.isfinite(self.values).all(axis=1) & (self.values[:, 0] > 0)
+        self.complete = (
+            np.ones(len(self.ids), dtype=bool) if complete is None else np.asarray(complete, dtype=bool)
+        )
+        self._positions: dict[int, int] = None
+
+    @property
+    def candidates(self) -> np.ndarray:
+        """Posiciones de las recetas que se pueden proponer como sustitutas."""
+        return np.flatnonzero(self.valid & self.complete)
+
+    @classmethod
+    def from_corpus(cls, corpus: pd.DataFrame) -> "RecipePool":
+        """Pool con todas las recetas del recetario local (load_recipe_corpus)."""
+        complete = (corpus["ingredients"] != "") & (corpus["steps"] != "")
+        return cls(corpus["id"].to_numpy(), nutrition_array(corpus, CORPUS_COLUMNS), complete.to_numpy())
+
+    @classmethod
+    def from_recipes(cls, recipes: dict[int, dict[str, str]]) -> "RecipePool":
+        """Pool con recetas ya filtradas ({meal_id: columnas de Filtering})."""
+        complete = [bool(recipe.get("Ingredients")) and bool(recipe.get("Instructions")) for recipe in recipes.values()]
+        return cls(*recipes_nutrition(recipes), complete)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def positions(self, ids: list[int]) -> np.ndarray:
+        """Posición de cada ID en el pool, o -1 si no está."""
+        if self._positions is None:
+            self._positions = {int(meal_id): pos for pos, meal_id in enumerate(self.ids.tolist())}
+        return np.array([self._positions.get(int(meal_id), -1) for meal_id in ids], dtype=np.int64)
+
+    def extend(self, other: "RecipePool") -> "RecipePool":
+        """Un pool nuevo con las recetas de other que no estén ya en este."""
+        new = self.positions(other.ids) < 0
+        return RecipePool(
+            np.concatenate([self.ids, other.ids[new]]),
+            np.concatenate([self.values, other.values[new]]),
+            np.concatenate([self.complete, other.complete[new]]),
+        )
+
+
+class WeeklyPlanOptimizer:
+    """
+    Ajusta un plan semanal a objetivos diarios de calorías y macronutrientes
+    cambiando recetas por otras del pool.
+
+    El error de un día es la suma ponderada (weights, en el orden de NUTRIENTS)
+    de la desviación relativa |total - objetivo| / objetivo de cada nutriente.
+    En cada iteración se puntúan a la vez con NumPy todas las sustituciones
+    posibles (cada comida del plan por cada receta del pool) y todos los
+    intercambios de comidas entre dos días; se aplica la mejor sustitución de
+    cada día y el mejor intercambio si bajan el error más de tolerance. Se
+    para cuando ningún cambio mejora o tras max_iter iteraciones. Una receta
+    no se repite en la semana, y ningún cambio deja un día más lejos de sus
+    calorías que calorie_tolerance (o que su desviación actual, si ya era
+    mayor): los macronutrientes no se ganan a costa de las calorías.
+    """
+
+    def __init__(
+        self,
+        pool: RecipePool,
+        weights: list[float] = None,
+        max_iter: int = 30,
+        tolerance: float = 1e-4,
+        calorie_tolerance: float = 0.05,
+    ):
+        self.pool = pool
+        self.weights = np.asarray(DEFAULT_WEIGHTS if weights is None else weights, dtype=np.float32)
+        self.max_iter = max_iter
+        self.tolerance = tolerance
+        self.calorie_tolerance = calorie_tolerance
+
+    def deviation(self, plan: np.ndarray, targets: np.ndarray, pool: RecipePool = None) -> np.ndarray:
+        """Error de cada día de un plan (días × comidas, posiciones en el pool)."""
+        pool = self.pool if pool is None else pool
+        totals = pool.values[plan].sum(axis=1)
+        targets = np.broadcast_to(np.asarray(targets, dtype=np.float32), totals.shape)
+        return (np.abs(totals - targets) * self.weights / np.maximum(targets, 1.0)).sum(axis=1)
+
+    def optimize_positions(self, plan: np.ndarray, targets: np.ndarray, pool: RecipePool = None) -> np.ndarray:
+        """
+        Devuelve una copia optimizada de plan (días × comidas, posiciones en el
+        pool; todas deben ser recetas válidas). targets es un objetivo
+        [kcal, proteína, hidratos, grasa] para todos los días o uno por día.
+        """
+        pool = self.pool if pool is None else pool
+        plan = np.array(plan, dtype=np.int64)
+        days, meals = plan.shape
+        values = pool.values
+        targets = np.broadcast_to(np.asarray(targets, dtype=np.float32), (days, len(NUTRIENTS)))
+        scale = self.weights / np.maximum(targets, 1.0)
+
+        candidates = pool.candidates
+        # Una fila contigua por nutriente, para puntuar nutriente a nutriente
+        columns = np.ascontiguousarray(values[candidates].T)
+        used = np.zeros(len(pool), dtype=bool)
+        used[plan.ravel()] = True
+        slot_day = np.repeat(np.arange(days), meals)
+        same_day = slot_day[:, None] == slot_day[None, :]
+
+        totals = values[plan].sum(axis=1)
+        error = (np.abs(totals - targets) * scale).sum(axis=1)
+        initial = float(error.sum())
+        start = time.perf_counter()
+        cost = np.empty((days, meals, len(candidates)), dtype=np.float32)
+        buffer = np.empty_like(cost)
+        changes = 0
+
+        for iteration in range(1, self.max_iter + 1):
+            changed = False
+
+            # Sustituciones: lo que debería aportar la receta nueva en cada
+            # comida, comparado con todas las candidatas a la vez
+            need = targets[:, None, :] - (totals[:, None, :] - values[plan])
+            allowed = np.maximum(self.calorie_tolerance * targets[:, 0], np.abs(totals[:, 0] - targets[:, 0]))
+            cost.fill(0)
+            for k in range(len(NUTRIENTS)):
+                np.subtract(columns[k], need[:, :, k, None], out=buffer)
+                np.abs(buffer, out=buffer)
+                if k == 0:
+                    # Calorías que quedarían de más o de menos en el día
+                    too_far = buffer > allowed[:, None, None]
+                buffer *= scale[:, None, k, None]
+                cost += buffer
+            cost[too_far] = np.inf
+            cost[:, :, used[candidates]] = np.inf
+            flat = cost.reshape(days, -1)
+            best = flat.argmin(axis=1)
+            gain = error - flat[np.arange(days), best]
+            for day in np.argsort(-gain):
+                if gain[day] <= self.tolerance:
+                    break
+                meal, candidate = divmod(int(best[day]), len(candidates))
+                recipe = candidates[candidate]
+                if used[recipe]:
+                    # Ya la ha elegido otro día en esta iteración
+                    continue
+                used[plan[day, meal]] = False
+                used[recipe] = True
+                totals[day] += values[recipe] - values[plan[day, meal]]
+                plan[day, meal] = recipe
+                error[day] = (np.abs(totals[day] - targets[day]) * scale[day]).sum()
+                changes += 1
+                changed = True
+
+            # Intercambios de una comida entre dos días: la semana sigue
+            # teniendo las mismas recetas, solo se reparten mejor
+            slot_values = values[plan.ravel()]
+            new_totals = totals[slot_day][:, None, :] - slot_values[:, None, :] + slot_values[None, :, :]
+            new_error = (np.abs(new_totals - targets[slot_day][:, None, :]) * scale[slot_day][:, None, :]).sum(axis=2)
+            swap_gain = error[slot_day][:, None] + error[slot_day][None, :] - new_error - new_error.T
+            too_far = np.abs(new_totals[:, :, 0] - targets[slot_day, 0][:, None]) > allowed[slot_day][:, None]
+            swap_gain[same_day | too_far | too_far.T] = -np.inf
+            i, j = np.unravel_index(int(swap_gain.argmax()), swap_gain.shape)
+            if swap_gain[i, j] > self.tolerance:
+                (day_i, meal_i), (day_j, meal_j) = divmod(int(i), meals), divmod(int(j), meals)
+                plan[day_i, meal_i], plan[day_j, meal_j] = plan[day_j, meal_j], plan[day_i, meal_i]
+                totals[[day_i, day_j]] = new_totals[i, j], new_totals[j, i]
+                error[[day_i, day_j]] = new_error[i, j], new_error[j, i]
+                changes += 1
+                changed = True
+
+            if not changed:
+                break
+
+        logger.info(
+            f"Plan optimizado: error {initial:.3f} -> {float(error.sum()):.3f} "
+            f"({changes} cambios, {iteration} iteraciones, {len(candidates)} candidatas, "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms)"
+        )
+        return plan
+
+    def optimize(
+        self, days_and_ids: dict[str, list[int]], targets: np.ndarray, extra: RecipePool = None
+    ) -> dict[str, list[int]]:
+        """
+        Optimiza un plan {día: IDs de receta} como los de MealPlanner. extra
+        son recetas que no están en el pool, como las del plan original de la
+        API. Los días con alguna receta sin nutrición conocida se dejan igual.
+        Las comidas de un día cambiado se ordenan como en LocalMealPlanner: la
+        más ligera de desayuno, la más fuerte de comida y la otra de cena.
+        """
+        pool = self.pool if extra is None else self.pool.extend(extra)
+        meals = max((len(ids) for ids in days_and_ids.values()), default=0)
+        positions = {day: pool.positions(ids) for day, ids in days_and_ids.items()}
+        days = [
+            day for day, pos in positions.items()
+            if len(pos) == meals and (pos >= 0).all() and pool.valid[pos].all()
+        ]
+        if not days:
+            return days_and_ids
+
+        targets = np.asarray(targets, dtype=np.float32)
+        if targets.ndim == 2:
+            order = {day: i for i, day in enumerate(days_and_ids)}
+            targets = targets[[order[day] for day in days]]
+        plan = np.stack([positions[day] for day in days])
+        # Las recetas de los días que no se optimizan tampoco se pueden proponer
+        fixed = [pos[pos >= 0] for day, pos in positions.items() if day not in days]
+        if fixed:
+            pool = RecipePool(pool.ids, pool.values, pool.complete.copy())
+            pool.complete[np.concatenate(fixed)] = False
+        optimized = self.optimize_positions(plan, targets, pool)
+
+        result = dict(days_and_ids)
+        for day, before, after in zip(days, plan, optimized):
+            if (before != after).any():
+                if meals == 3:
+                    lightest, middle, heaviest = after[np.argsort(pool.values[after, 0], kind="stable")]
+                    after = np.array([lightest, heaviest, middle])
+                result[day] = pool.ids[after].tolist()
+        return result
@@ -0,0 +1,107 @@
+from functools import cache
+
+import numpy as np
+import pandas as pd
+
+from Recetas.filtering import Filtering
+
+MEAL_SLOTS = {1: "breakfast", 2: "lunch", 3: "dinner"}
+
+
+@cache
+def empty_row() -> dict:
+    """Valores de una comida sin datos, los mismos que da Filtering sin respuesta."""
+    return {
+        **Filtering.filter_name_and_ingredients({}),
+        **Filtering.filter_instructions([]),
+        **Filtering.filter_nutrition_facts({}),
+    }
+
+
+class MealRecord:
+    """Una comida del plan: el día, el hueco (1, 2 o 3) y la receta."""
+
+    __slots__ = ("day", "meal_slot", "recipe_id", "row")
+
+    def __init__(self, day: str, meal_slot: int, recipe_id: int, row: int):
+        self.day = day
+        self.meal_slot = meal_slot
+        self.recipe_id = recipe_id
+        self.row = row
+
+    @property
+    def key(self) -> tuple[str, int, int]:
+        return (self.day, self.meal_slot, self.recipe_id)
+
+    @property
+    def label(self) -> str:
+        return f"{self.day} {MEAL_SLOTS.get(self.meal_slot)}"
+
+
+class MealPlanBuilder:
+    """
+    Plan de comidas de tamaño fijo que se puede rellenar en cualquier orden.
+
+    Al crearlo a partir de days_and_ids se reserva una fila por comida, en el
+    orden del plan, dentro de un único array 2D de objetos. Los datos de cada
+    receta se escriben en su fila por clave (day, meal_slot, recipe_id) o por
+    recipe_id, así que da igual el orden en que lleguen las respuestas. Las
+    columnas que no se rellenan conservan el valor vacío de Filtering, de modo
+    que las filas nunca se desalinean. to_dataframe no copia los datos.
+    """
+
+    COLUMNS = [
+        "Meal", "Name", "Ingredients", "Instructions", "Calories", "Carbs", "Fat", "Protein",
+    ]
+
+    def __init__(self, days_and_ids: dict[str, list[int]]):
+        self.records: list[MealRecord] = []
+        self._rows_by_key: dict[tuple[str, int, int], int] = {}
+        self._rows_by_recipe: dict[int, list[int]] = {}
+        # Las comidas de un día ocupan filas consecutivas
+        self._rows_by_day: dict[str, slice] = {}
+        for day, meal_ids_list in days_and_ids.items():
+            self._rows_by_day[day] = slice(len(self.records), len(self.records) + len(meal_ids_list))
+            for idx, meal_id in enumerate(meal_ids_list):
+                record = MealRecord(day, idx + 1, meal_id, len(self.records))
+                self.records.append(record)
+                self._rows_by_key[record.key] = record.row
+                self._rows_by_recipe.setdefault(meal_id, []).append(record.row)
+
+        self._column_index = {column: i for i, column in enumerate(self.COLUMNS)}
+        self.values = np.empty((len(self.records), len(self.COLUMNS)), dtype=object)
+        for column, value in empty_row().items():
+            self.values[:, self._column_index[column]] = value
+        self.values[:, 0] = [record.label for record in self.records]
+
+    @property
+    def recipe_ids(self) -> list[int]:
+        """IDs de receta sin repetir, en el orden del plan."""
+        return list(self._rows_by_recipe)
+
+    def _fill(self, rows: list[int], attributes: dict[str, str]) -> None:
+        for column, value in attributes.items():
+            self.values[rows, self._column_index[column]] = value
+
+    def set(self, day: str, meal_slot: int, recipe_id: int, attributes: dict[str, str]) -> None:
+        self._fill([self._rows_by_key[(day, meal_slot, recipe_id)]], attributes)
+
+    def set_recipe(self, recipe_id: int, attributes: dict[str, str]) -> None:
+        """Rellena todas las comidas del plan que usan esa receta."""
+        self._fill(self._rows_by_recipe.get(recipe_id, []), attributes)
+
+    def to_dict(self) -> dict[str, list]:
+        return {column: self.values[:, i].tolist() for i, column in enumerate(self.COLUMNS)}
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self.values, columns=self.COLUMNS, copy=False)
+
+    def day_frame(self, day: str) -> pd.DataFrame:
+        """Filas de un día, con el mismo índice que tienen en to_dataframe."""
+        rows = self._rows_by_day[day]
+        return pd.DataFrame(
+            self.values[rows],
+            columns=self.COLUMNS,
+            index=pd.RangeIndex(rows.start, rows.stop),
+            copy=False,
+        )
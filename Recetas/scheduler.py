@@ -0,0 +1,269 @@
+import os
+import random
+import threading
+import time
+from collections import deque
+
+import requests
+from dotenv import load_dotenv
+from loguru import logger
+
+
+class TokenBucket:
+    """
+    Cubo de tokens: permite ráfagas de hasta `capacity` peticiones y, a partir
+    de ahí, `rate` peticiones por segundo.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self) -> float:
+        """Segundos que faltan para que haya un token disponible."""
+        self._refill()
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def reserve(self) -> float:
+        """Consume un token y devuelve cuánto hay que esperar para usarlo."""
+        wait = self.wait_time()
+        self.tokens -= 1
+        return wait
+
+
+class ApiKeyState:
+    def __init__(self, key: str, bucket: TokenBucket):
+        self.key = key
+        self.bucket = bucket
+        # Pausa corta tras un 429
+        self.cooldown_until = 0.0
+        # Cuota diaria agotada (402 o X-API-Quota-Left a cero)
+        self.exhausted_until = 0.0
+        self.quota_left = None
+        self.requests = 0
+        self.throttled = 0
+        self.exhausted = 0
+
+    @property
+    def label(self) -> str:
+        return f"...{self.key[-4:]}"
+
+
+class RequestScheduler:
+    """
+    Planificador de peticiones a Spoonacular con varias API keys.
+
+    Cada key tiene su propio cubo de tokens, y en cada petición se usa la key
+    disponible que antes pueda enviar. Las respuestas 429 y 5xx (y los errores
+    de conexión) se reintentan con espera exponencial con jitter; un 429 deja la
+    key en pausa el tiempo indicado en Retry-After y un 402 (cuota diaria
+    agotada) la retira durante `quota_reset` segundos. La cabecera
+    X-API-Quota-Left se usa para retirar una key antes de que la API la
+    rechace. Es seguro usarlo desde varios hilos.
+    """
+
+    RETRY_STATUS = {429, 500, 502, 503, 504}
+    QUOTA_HEADER = "X-API-Quota-Left"
+
+    def __init__(
+        self,
+        api_keys: list[str],
+        rate_per_key: float = 1.0,
+        burst: int = 5,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        quota_reset: float = 24 * 3600,
+        session: requests.Session = None,
+        timeout: float = 10,
+        clock=time.monotonic,
+    ):
+        if not api_keys:
+            raise ValueError("Hace falta al menos una API key")
+        self.keys = [ApiKeyState(key, TokenBucket(rate_per_key, burst, clock)) for key in api_keys]
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.quota_reset = quota_reset
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self._started = clock()
+        self._latencies = deque(maxlen=1000)
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+
+    @classmethod
+    def from_env(cls, prefix: str = "API_KEY", **kwargs) -> "RequestScheduler | None":
+        """
+        Usa todas las variables de entorno API_KEY1, API_KEY2, ... definidas
+        (también las del .env). Si no hay ninguna devuelve None, y MealPlanner
+        usa entonces su api_key sin scheduler (por ejemplo, con el servidor de
+        pruebas).
+        """
+        load_dotenv()
+        names = sorted(
+            (name for name in os.environ if name.startswith(prefix) and name[len(prefix):].isdigit()),
+            key=lambda name: int(name[len(prefix):]),
+        )
+        keys = [os.environ[name] for name in names if os.environ[name]]
+        if not keys:
+            logger.warning(f"No hay ninguna variable {prefix}N: las peticiones no pasan por el scheduler")
+            return None
+        return cls(keys, **kwargs)
+
+    def _acquire_key(self) -> tuple[ApiKeyState, float] | None:
+        """
+        Elige, entre las keys con cuota, la que antes puede enviar (empezando
+        por la siguiente a la última usada) y reserva su token. Devuelve la key
+        y los segundos que hay que esperar antes de usarla.
+        """
+        with self._lock:
+            now = self.clock()
+            best = None
+            for offset in range(len(self.keys)):
+                state = self.keys[(self._next + offset) % len(self.keys)]
+                if state.exhausted_until > now:
+                    continue
+                wait = max(state.cooldown_until - now, state.bucket.wait_time())
+                if best is None or wait < best[1]:
+                    best = (state, wait)
+            if best is None:
+                return None
+            state, _ = best
+            wait = max(state.cooldown_until - now, state.bucket.reserve())
+            self._next = (self.keys.index(state) + 1) % len(self.keys)
+            return state, wait
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float | None:
+        try:
+            return float(response.headers["Retry-After"])
+        except (KeyError, ValueError):
+            return None
+
+    def _record(self, state: ApiKeyState, response: requests.Response, attempt: int) -> None:
+        with self._lock:
+            now = self.clock()
+            try:
+                state.quota_left = float(response.headers[self.QUOTA_HEADER])
+            except (KeyError, ValueError):
+                pass
+            if response.status_code == 402 or (state.quota_left is not None and state.quota_left <= 0):
+                state.exhausted += 1
+                state.exhausted_until = now + self.quota_reset
+                state.quota_left = None
+                logger.warning(f"Cuota agotada para la API key {state.label}, se rota a otra")
+            elif response.status_code == 429:
+                state.throttled += 1
+                retry_after = self._retry_after(response)
+                state.cooldown_until = now + (
+                    retry_after if retry_after is not None else self._backoff(attempt)
+                )
+                logger.warning(f"429 de la API con la key {state.label} (intento {attempt + 1})")
+
+    def get(self, url: str, params: dict = None) -> requests.Response | None:
+        """
+        Envía un GET con la mejor key disponible, reintentando los fallos
+        transitorios. Devuelve la última respuesta recibida, o None si no se pudo
+        obtener ninguna.
+        """
+        response = None
+        for attempt in range(self.max_retries + 1):
+            last_attempt = attempt == self.max_retries
+            if attempt:
+                self._increment("retries")
+            acquired = self._acquire_key()
+            if acquired is None:
+                logger.error("Todas las API keys han agotado su cuota")
+                break
+            state, wait = acquired
+            if wait > 0:
+                time.sleep(wait)
+
+            start = time.perf_counter()
+            try:
+                response = self.session.get(
+                    url, params={**(params or {}), "apiKey": state.key}, timeout=self.timeout
+                )
+            except requests.RequestException as e:
+                self._count(state, time.perf_counter() - start)
+                # El mensaje de la excepción lleva la URL completa, con la API key
+                logger.warning(f"Error de conexión con {url} (intento {attempt + 1}): {type(e).__name__}")
+                if not last_attempt:
+                    time.sleep(self._backoff(attempt))
+                continue
+            self._count(state, time.perf_counter() - start)
+            self._record(state, response, attempt)
+
+            # Tras un 402 o un 429 se reintenta enseguida con otra key; si no
+            # hay otra, _acquire_key hace esperar lo necesario
+            if response.status_code in (402, 429):
+                continue
+            if response.status_code in self.RETRY_STATUS:
+                logger.warning(f"Error {response.status_code} de la API (intento {attempt + 1})")
+                retry_after = self._retry_after(response)
+                if not last_attempt:
+                    time.sleep(retry_after if retry_after is not None else self._backoff(attempt))
+                continue
+            if response.status_code >= 400:
+                self._increment("failures")
+            return response
+
+        self._increment("failures")
+        return response
+
+    def _increment(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _count(self, state: ApiKeyState, latency: float) -> None:
+        with self._lock:
+            self.requests += 1
+            state.requests += 1
+            self._latencies.append(latency)
+
+    def metrics(self) -> dict:
+        """Peticiones, reintentos, latencias y estado de cuota de cada key."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            elapsed = max(self.clock() - self._started, 1e-9)
+
+            def percentile(p: float) -> float:
+                if not latencies:
+                    return 0.0
+                return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+            return {
+                "requests": self.requests,
+                "retries": self.retries,
+                "failures": self.failures,
+                "throughput": self.requests / elapsed,
+                "latency_p50": percentile(0.5),
+                "latency_p95": percentile(0.95),
+                "keys": [
+                    {
+                        "key": state.label,
+                        "requests": state.requests,
+                        "throttled": state.throttled,
+                        "exhausted": state.exhausted,
+                        "quota_left": state.quota_left,
+                        "available": state.exhausted_until <= self.clock(),
+                    }
+                    for state in self.keys
+                ],
+            }
@@ -0,0 +1,24 @@
+"""
+Los submódulos se importan la primera vez que se usa cada nombre, así
+`import Rutinas` no carga pandas hasta que hace falta.
+"""
+from typing import TYPE_CHECKING
+
+from Utilidades.perezoso import exportaciones_perezosas
+
+if TYPE_CHECKING:
+    from .catalogo import cargar_rutinas
+    from .ejercicios import IndiceEjercicios, cargar_ejercicios, normalizar_ejercicios
+    from .indice import IndiceRutinas
+
+_EXPORTACIONES = {
+    "IndiceEjercicios": ".ejercicios",
+    "IndiceRutinas": ".indice",
+    "cargar_ejercicios": ".ejercicios",
+    "cargar_rutinas": ".catalogo",
+    "normalizar_ejercicios": ".ejercicios",
+}
+
+__all__ = list(_EXPORTACIONES)
+
+__getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTACIONES)
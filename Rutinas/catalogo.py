@@ -0,0 +1,28 @@
+import ast
+
+import pandas as pd
+
+from Utilidades.instantaneas import cargar_snapshot
+
+COLUMNAS_CATEGORICAS_RUTINAS = [
+    'Workout Title', 'Category', 'Main Goal', 'Workout Type', 'Training Level',
+    'Program Duration', 'Time Per Workout', 'Target Gender',
+]
+
+
+def preparar_rutinas(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte los tipos del CSV de rutinas: la columna 'content' pasa de texto a
+    listas de [ejercicio, series, repeticiones] y las columnas con pocos valores
+    distintos a categóricas.
+    """
+    df = df.drop(columns=['Unnamed: 0'], errors='ignore')
+    df['content'] = df['content'].map(ast.literal_eval)
+    for columna in COLUMNAS_CATEGORICAS_RUTINAS:
+        df[columna] = df[columna].astype('category')
+    df['Days Per Week'] = df['Days Per Week'].astype('int8')
+    return df
+
+
+def cargar_rutinas(ruta_csv: str = 'rutinas.csv') -> pd.DataFrame:
+    return cargar_snapshot(ruta_csv, preparar_rutinas)
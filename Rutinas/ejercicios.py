@@ -0,0 +1,125 @@
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from Rutinas.catalogo import preparar_rutinas
+from Utilidades.instantaneas import cargar_snapshot
+
+COLUMNAS_EJERCICIOS = ['fila', 'workout_id', 'day', 'orden', 'exercise', 'sets', 'reps', 'notes']
+# Columnas de los ejercicios que muestra la página y su título en español
+COLUMNAS_EJERCICIOS_UI = {'exercise': 'Ejercicio', 'sets': 'Series', 'reps': 'Repeticiones', 'notes': 'Notas'}
+
+# Numeración que algunas rutinas ponen delante del ejercicio ('1. ', '5a. ', 'A1. ')
+_NUMERACION = re.compile(r'^(\d+[a-z]?|[A-Z]\d+)\.\s*')
+
+
+def _partes(ejercicio: list[str]) -> tuple[str, str | None, str | None, str | None]:
+    """
+    Reparte una entrada de 'content' en ejercicio, series, repeticiones y notas.
+    Casi todas son [ejercicio, series, repeticiones]; las de dos elementos solo
+    traen las repeticiones (o la duración) y lo que sobra a partir del cuarto
+    elemento se guarda como notas.
+    """
+    nombre = _NUMERACION.sub('', ejercicio[0].strip())
+    if len(ejercicio) == 1:
+        return nombre, None, None, None
+    if len(ejercicio) == 2:
+        return nombre, None, ejercicio[1], None
+    notas = ', '.join(ejercicio[3:]) or None
+    return nombre, ejercicio[1], ejercicio[2], notas
+
+
+def normalizar_ejercicios(rutinas: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte la columna 'content' (ya parseada por preparar_rutinas) en una
+    tabla larga con un ejercicio por fila:
+
+    - fila: etiqueta de la fila de rutinas (el día de entrenamiento).
+    - workout_id: código de 'Workout Title' en rutinas.
+    - day: título del día ('Upper A', 'Day 1'...).
+    - orden: posición del ejercicio dentro del día.
+    - exercise: nombre del ejercicio, categórico (diccionario de ejercicios).
+    - sets, reps, notes: texto tal y como viene en la rutina, o nulo.
+    """
+    filas, ordenes, partes = [], [], []
+    for fila, contenido in zip(rutinas.index, rutinas['content']):
+        orden = 0
+        for ejercicio in contenido:
+            if not ejercicio:
+                continue
+            filas.append(fila)
+            ordenes.append(orden)
+            partes.append(_partes(ejercicio))
+            orden += 1
+
+    filas = np.asarray(filas, dtype=np.int64)
+    posiciones = rutinas.index.get_indexer(filas)
+    nombres, series, repeticiones, notas = zip(*partes) if partes else ((), (), (), ())
+    return pd.DataFrame({
+        'fila': filas,
+        'workout_id': rutinas['Workout Title'].cat.codes.to_numpy()[posiciones].astype(np.int32),
+        'day': pd.Categorical(rutinas['title'].to_numpy()[posiciones]),
+        'orden': np.asarray(ordenes, dtype=np.int16),
+        'exercise': pd.Categorical(nombres),
+        'sets': pd.array(series, dtype='string'),
+        'reps': pd.array(repeticiones, dtype='string'),
+        'notes': pd.array(notas, dtype='string'),
+    }, columns=COLUMNAS_EJERCICIOS)
+
+
+def preparar_ejercicios(df: pd.DataFrame) -> pd.DataFrame:
+    return normalizar_ejercicios(preparar_rutinas(df))
+
+
+def cargar_ejercicios(ruta_csv: str = 'rutinas.csv') -> pd.DataFrame:
+    """Tabla de ejercicios del CSV de rutinas, guardada como instantánea Parquet."""
+    nombre = os.path.splitext(os.path.basename(ruta_csv))[0] + '-ejercicios'
+    return cargar_snapshot(ruta_csv, preparar_ejercicios, nombre, formato='parquet')
+
+
+class IndiceEjercicios:
+    """
+    Consultas sobre la tabla de ejercicios. Los ejercicios se buscan en el
+    diccionario de categorías (unos pocos miles de nombres) y después se
+    filtran las filas comparando códigos enteros, sin recorrer texto.
+    """
+
+    def __init__(self, ejercicios: pd.DataFrame, rutinas: pd.DataFrame):
+        self.ejercicios = ejercicios.sort_values(['fila', 'orden'], kind='stable', ignore_index=True)
+        self.rutinas = rutinas
+        self._codigos = self.ejercicios['exercise'].cat.codes.to_numpy()
+        self._workout_ids = self.ejercicios['workout_id'].to_numpy()
+        self._filas = self.ejercicios['fila'].to_numpy()
+        self._dias_por_rutina = (
+            rutinas.groupby(rutinas['Workout Title'].cat.codes, sort=True)['Days Per Week']
+            .max()
+        )
+
+    def codigos(self, ejercicio: str, exacto: bool = True) -> np.ndarray:
+        """Códigos del diccionario cuyo nombre coincide (sin distinguir mayúsculas)."""
+        nombres = self.ejercicios['exercise'].cat.categories.str.lower()
+        ejercicio = ejercicio.lower()
+        coincide = nombres == ejercicio if exacto else nombres.str.contains(ejercicio, regex=False)
+        return np.flatnonzero(coincide)
+
+    def rutinas_con(self, ejercicio: str, max_dias: int = None, exacto: bool = True) -> list[str]:
+        """
+        Títulos de las rutinas que incluyen el ejercicio, opcionalmente con
+        como mucho max_dias días por semana.
+        """
+        workout_ids = np.unique(self._workout_ids[np.isin(self._codigos, self.codigos(ejercicio, exacto))])
+        if max_dias is not None:
+            dias = self._dias_por_rutina.reindex(workout_ids).to_numpy()
+            workout_ids = workout_ids[dias <= max_dias]
+        categorias = self.rutinas['Workout Title'].cat.categories
+        return categorias[workout_ids].tolist()
+
+    def de_filas(self, filas) -> pd.DataFrame:
+        """Ejercicios de unas filas de rutinas (días), en su orden."""
+        filas = np.asarray(filas)
+        inicio = np.searchsorted(self._filas, filas, side='left')
+        fin = np.searchsorted(self._filas, filas, side='right')
+        posiciones = np.concatenate([np.arange(i, f) for i, f in zip(inicio, fin)]) if len(filas) else []
+        return self.ejercicios.iloc[posiciones]
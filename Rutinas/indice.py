@@ -0,0 +1,73 @@
+import random
+
+import numpy as np
+import pandas as pd
+
+GENERO_AMBOS = 'Male & Female'
+GENEROS = ['Male', 'Female']
+# Sexo del formulario de la app y su valor en 'Target Gender'
+SEXOS = {'Hombre': 'Male', 'Mujer': 'Female'}
+# Columnas de la rutina que muestra la página (son iguales en todas sus filas)
+COLUMNAS_RUTINA_UI = ['Workout Type', 'Program Duration', 'Days Per Week', 'Recommended Supps']
+
+
+class IndiceRutinas:
+    """
+    Índice precalculado del catálogo de rutinas.
+
+    Asocia cada (Main Goal, Training Level, Target Gender) con los títulos de
+    rutina que lo cumplen, y cada título con las posiciones de sus filas. Las
+    rutinas 'Male & Female' se incluyen en las entradas de ambos géneros, así que
+    buscar una rutina personalizada es una consulta a un diccionario.
+    """
+
+    def __init__(self, workouts: pd.DataFrame):
+        self.workouts = workouts
+        self._posiciones: dict[str, np.ndarray] = {
+            titulo: posiciones
+            for titulo, posiciones in workouts.groupby(
+                'Workout Title', observed=True, sort=False
+            ).indices.items()
+        }
+        self.titulos_totales = list(self._posiciones)
+
+        combinaciones = workouts[
+            ['Main Goal', 'Training Level', 'Target Gender', 'Workout Title']
+        ].drop_duplicates()
+        titulos: dict[tuple[str, str, str], list[str]] = {}
+        for objetivo, nivel, genero, titulo in combinaciones.itertuples(index=False):
+            generos = GENEROS if genero == GENERO_AMBOS else [genero]
+            for genero_clave in generos:
+                lista = titulos.setdefault((objetivo, nivel, genero_clave), [])
+                if titulo not in lista:
+                    lista.append(titulo)
+        self._titulos = titulos
+        self._filas: dict[str, pd.DataFrame] = {}
+
+    def titulos(self, objetivo: str, nivel: str, genero: str) -> list[str]:
+        """genero es 'Male' o 'Female'."""
+        return self._titulos.get((objetivo, nivel, genero), [])
+
+    def filas(self, titulo: str) -> pd.DataFrame:
+        """
+        Filas de una rutina. Se calculan una vez por título y se comparten entre
+        llamadas, así que no se deben modificar en sitio.
+        """
+        filas = self._filas.get(titulo)
+        if filas is None:
+            filas = self.workouts.iloc[self._posiciones[titulo]]
+            self._filas[titulo] = filas
+        return filas
+
+    def elegir(self, objetivo: str, nivel: str, genero: str) -> tuple[str, pd.DataFrame]:
+        """
+        Elige al azar una rutina que cumpla los criterios. Si ninguna los cumple,
+        se elige entre todo el catálogo para que el usuario siempre tenga rutina.
+        """
+        candidatas = self.titulos(objetivo, nivel, genero) or self.titulos_totales
+        titulo = random.choice(candidatas)
+        return titulo, self.filas(titulo)
+
+    def personalizada(self, nivel: str, sexo: str, objetivo: str) -> tuple[str, pd.DataFrame]:
+        """Como elegir, con el sexo tal y como llega del formulario ('Hombre' o 'Mujer')."""
+        return self.elegir(objetivo, nivel, SEXOS[sexo])
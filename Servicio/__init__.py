@@ -0,0 +1,24 @@
+"""
+Los submódulos se importan la primera vez que se usa cada nombre, así
+`import Servicio` no carga pandas ni la página de resultados hasta que hace falta.
+"""
+from typing import TYPE_CHECKING
+
+from Utilidades.perezoso import exportaciones_perezosas
+
+if TYPE_CHECKING:
+    from .cliente import ClienteServicio
+    from .planes import ServicioPlanes
+    from .servidor import ServidorPlanes
+    from .singleflight import SingleFlight
+
+_EXPORTACIONES = {
+    "ClienteServicio": ".cliente",
+    "ServicioPlanes": ".planes",
+    "ServidorPlanes": ".servidor",
+    "SingleFlight": ".singleflight",
+}
+
+__all__ = list(_EXPORTACIONES)
+
+__getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTACIONES)
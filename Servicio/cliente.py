@@ -0,0 +1,72 @@
+import json
+import os
+from collections.abc import Iterator
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from Recetas.plan_builder import MealPlanBuilder
+
+
+class ClienteServicio:
+    """
+    Cliente del servicio de planes para la app: devuelve lo mismo que las
+    funciones que sustituye (DataFrames con las columnas que pinta la página),
+    así la página solo cambia de dónde saca los datos.
+
+    Todas las peticiones salen por una misma requests.Session, que se puede
+    compartir entre sesiones de Streamlit (conexiones keep-alive con el servicio).
+    """
+
+    def __init__(self, url: str, timeout: float = 60, max_conexiones: int = 32):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_conexiones)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @classmethod
+    def desde_entorno(cls) -> "ClienteServicio | None":
+        """Cliente de FITPLANNER_SERVICIO_URL, o None si no está definida."""
+        url = os.getenv("FITPLANNER_SERVICIO_URL")
+        return cls(url) if url else None
+
+    def _post(self, ruta: str, datos: dict, stream: bool = False) -> requests.Response:
+        respuesta = self.session.post(f"{self.url}{ruta}", json=datos, timeout=self.timeout, stream=stream)
+        respuesta.raise_for_status()
+        return respuesta
+
+    def iter_weekly_menu(
+        self, calorias: int, usar_api: bool = True, objetivo: str = None, peso: float = None
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """
+        (día, filas del día) en cuanto el servicio tiene cada día, como
+        MealPlanner.iter_weekly_menu, ajustado al objetivo y peso del usuario.
+        """
+        datos = {"calorias": int(calorias), "usar_api": usar_api, "objetivo": objetivo, "peso": peso}
+        with self._post("/menu", datos, stream=True) as respuesta:
+            for linea in respuesta.iter_lines():
+                if not linea:
+                    continue
+                parte = json.loads(linea)
+                if "error" in parte:
+                    raise RuntimeError(f"Error del servicio de planes: {parte['error']}")
+                yield parte["dia"], pd.DataFrame(parte["comidas"], columns=MealPlanBuilder.COLUMNS)
+
+    def rutina(self, nivel: str, sexo: str, objetivo: str) -> tuple[str, pd.DataFrame, pd.DataFrame]:
+        """Título de la rutina, sus filas y sus ejercicios (como IndiceEjercicios.de_filas)."""
+        datos = self._post("/rutina", {"nivel": nivel, "sexo": sexo, "objetivo": objetivo}).json()
+        return datos["titulo"], pd.DataFrame(datos["rutina"]), pd.DataFrame(datos["ejercicios"])
+
+    def ofertas(self, suplementos: list[str], n: int = 6) -> tuple[pd.DataFrame | None, pd.DataFrame]:
+        """Ofertas de los suplementos recomendados (None sin suplementos) y ofertas de cualquier tipo."""
+        datos = self._post("/ofertas", {"suplementos": suplementos, "n": n}).json()
+        recomendadas = None if datos["recomendadas"] is None else pd.DataFrame(datos["recomendadas"])
+        return recomendadas, pd.DataFrame(datos["otras"])
+
+    def estadisticas(self) -> dict:
+        respuesta = self.session.get(f"{self.url}/estadisticas", timeout=self.timeout)
+        respuesta.raise_for_status()
+        return respuesta.json()
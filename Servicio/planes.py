@@ -0,0 +1,203 @@
+"""
+Lógica del servicio de planes: menú semanal, rutina y ofertas, con los
+recursos (caché de recetas, sesión HTTP con Spoonacular, catálogos e índices)
+compartidos por todos los clientes del proceso.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+import pandas as pd
+from loguru import logger
+
+from Decathlon.catalogo import COLUMNAS_PRODUCTOS_UI
+from Recetas.filtering import Filtering
+from Recetas.local_planner import LocalMealPlanner
+from Recetas.plan_builder import MealPlanBuilder
+from Rutinas.ejercicios import COLUMNAS_EJERCICIOS_UI
+from Rutinas.indice import COLUMNAS_RUTINA_UI
+from Servicio.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from Decathlon.ofertas import IndiceOfertas, RankingOfertas
+    from Recetas.mealplanner import MealPlanner
+    from Rutinas.ejercicios import IndiceEjercicios
+    from Rutinas.indice import IndiceRutinas
+
+
+class ServicioPlanes:
+    """
+    Atiende a muchos usuarios a la vez con un solo MealPlanner (una caché y un
+    pool de conexiones con Spoonacular para todo el proceso).
+
+    Las peticiones concurrentes iguales se agrupan: el plan semanal se pide
+    una vez por tramo de calorías y cada receta una vez por ID, aunque la
+    necesiten varios menús a la vez. Así, 50 usuarios con objetivos parecidos
+    cuestan las mismas peticiones a la API que uno solo.
+
+    Las llamadas bloqueantes (HTTP, SQLite, pandas) se ejecutan en un pool de
+    max_workers hilos, que son también las conexiones simultáneas con la API;
+    casi todos esperan a la red, por eso son bastantes. Los métodos públicos
+    son corrutinas para el bucle de eventos del servidor.
+    """
+
+    def __init__(
+        self,
+        planner: "MealPlanner",
+        indice_rutinas: "IndiceRutinas",
+        indice_ejercicios: "IndiceEjercicios",
+        indice_ofertas: "IndiceOfertas",
+        ranking_ofertas: "RankingOfertas",
+        recetario: pd.DataFrame = None,
+        max_workers: int = 64,
+    ):
+        self.planner = planner
+        self.indice_rutinas = indice_rutinas
+        self.indice_ejercicios = indice_ejercicios
+        self.indice_ofertas = indice_ofertas
+        self.ranking_ofertas = ranking_ofertas
+        self.recetario = recetario
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="servicio")
+        self.planes = SingleFlight()
+        self.recetas = SingleFlight()
+
+    @classmethod
+    def desde_recursos(cls, max_workers: int = 64) -> "ServicioPlanes":
+        """
+        Usa los mismos recursos que la app (App.recursos): la caché de recetas
+        en disco, las API keys del .env y los catálogos e índices ya cargados.
+        """
+        from App import recursos
+        from Recetas.mealplanner import MealPlanner
+
+        planner = MealPlanner(
+            cache=recursos.obtener_cache_recetas(),
+            bulk=True,
+            scheduler=recursos.obtener_scheduler(),
+            max_workers=max_workers,
+            optimizer=recursos.obtener_optimizador(),
+        )
+        return cls(
+            planner,
+            recursos.obtener_indice_rutinas(),
+            recursos.obtener_indice_ejercicios(),
+            recursos.obtener_indice_ofertas(),
+            recursos.obtener_ranking_ofertas(),
+            recursos.obtener_recetario(),
+            max_workers=max_workers,
+        )
+
+    async def _en_hilo(self, funcion: Callable, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, lambda: funcion(*args, **kwargs))
+
+    async def _descargar_recetas(self, meal_ids: list[int]) -> dict[int, dict[str, str]]:
+        """Las recetas que no estén en la caché se piden en una llamada a informationBulk."""
+        def descargar():
+            respuestas = self.planner.fetcher.fetch_bulk(meal_ids)
+            return Filtering.filter_bulk_recipes(list(respuestas.values()))
+        return await self._en_hilo(descargar)
+
+    async def _plan(self, calorias: int, objetivo: str, peso: float) -> dict[str, list[int]]:
+        """
+        Plan semanal del tramo de calorias, ajustado al objetivo y al peso del
+        usuario con el optimizer del planner, como MealPlanner.optimize_plan.
+        Las recetas del plan original se piden con el resto (una vez por ID) y
+        el ajuste se agrupa por (calorias, objetivo, peso).
+        """
+        tramo = self.planner.bucket(calorias)
+        days_and_ids = await self.planes.hacer(tramo, lambda: self._en_hilo(self.planner.weekly_plan, tramo))
+        if self.planner.optimizer is None or not days_and_ids:
+            return days_and_ids
+        plan_ids = [meal_id for meal_ids in days_and_ids.values() for meal_id in meal_ids]
+        recetas = await self.recetas.hacer_lote(plan_ids, self._descargar_recetas)
+        recetas = {meal_id: receta for meal_id, receta in recetas.items() if receta is not None}
+        return await self.planes.hacer(
+            (calorias, objetivo, peso),
+            lambda: self._en_hilo(self.planner.optimize_plan, days_and_ids, calorias, objetivo, peso, recetas),
+        )
+
+    async def menu(
+        self, calorias: int, usar_api: bool = True, objetivo: str = None, peso: float = None
+    ) -> AsyncIterator[tuple[str, pd.DataFrame]]:
+        """
+        Devuelve (día, filas del día) de cada día del plan, en orden, como
+        MealPlanner.iter_weekly_menu con bulk=True: todas las recetas que no
+        estén en la caché se piden en una sola llamada a informationBulk, así
+        un plan nuevo cuesta dos peticiones. Sin usar_api el menú se genera
+        con el recetario local. Si el planner tiene optimizer, en los dos
+        casos el menú se ajusta a los macronutrientes del objetivo y el peso
+        del usuario, igual que en la página.
+        """
+        if not usar_api:
+            optimizer = self.planner.optimizer
+            local = LocalMealPlanner(
+                self.recetario, goal=objetivo if optimizer else None, body_weight=peso, optimizer=optimizer
+            )
+            dias = await self._en_hilo(lambda: list(local.iter_weekly_menu(calorias)))
+            for dia, filas in dias:
+                yield dia, filas
+            return
+
+        tramo = self.planner.bucket(calorias)
+        days_and_ids = await self._plan(calorias, objetivo, peso)
+        plan = MealPlanBuilder(days_and_ids)
+        # Las recetas del plan original que ya pidió _plan salen de la caché
+        plan_ids = [meal_id for meal_ids in days_and_ids.values() for meal_id in meal_ids]
+        recetas = await self.recetas.hacer_lote(plan_ids, self._descargar_recetas)
+        for meal_id, receta in recetas.items():
+            if receta is not None:
+                plan.set_recipe(meal_id, receta)
+        for dia in days_and_ids:
+            yield dia, plan.day_frame(dia)
+        logger.info(f"Menú del tramo de {tramo} calorías servido")
+
+    async def rutina(self, nivel: str, sexo: str, objetivo: str) -> tuple[str, pd.DataFrame, pd.DataFrame]:
+        """Título de la rutina elegida, sus filas (columnas de la página) y sus ejercicios."""
+        def elegir():
+            titulo, filas = self.indice_rutinas.personalizada(nivel, sexo, objetivo)
+            ejercicios = self.indice_ejercicios.de_filas(filas.index)
+            return titulo, filas[COLUMNAS_RUTINA_UI], ejercicios[['fila', 'day', *COLUMNAS_EJERCICIOS_UI]]
+        return await self._en_hilo(elegir)
+
+    async def ofertas(self, suplementos: list[str], n: int = 6) -> tuple[pd.DataFrame | None, pd.DataFrame]:
+        """
+        n ofertas de los tipos de producto que coinciden con los suplementos
+        (None si no hay suplementos) y n ofertas de cualquier tipo.
+        """
+        def elegir():
+            recomendadas = None
+            if suplementos:
+                tipos = self.indice_ofertas.tipos_coincidentes(suplementos)
+                recomendadas = self.ranking_ofertas.elegir(n, tipos)[COLUMNAS_PRODUCTOS_UI]
+            return recomendadas, self.ranking_ofertas.elegir(n)[COLUMNAS_PRODUCTOS_UI]
+        return await self._en_hilo(elegir)
+
+    def suplementos(self) -> list[str]:
+        """Suplementos que recomienda alguna rutina del catálogo, separados como en la página."""
+        recomendados = self.indice_rutinas.workouts['Recommended Supps'].dropna().unique()
+        return sorted({s.strip() for valor in recomendados for s in str(valor).split(",") if s.strip()})
+
+    async def calentar(self) -> None:
+        """
+        Compara de antemano todos los suplementos del catálogo con los tipos de
+        producto (la parte lenta de las ofertas; las puntuaciones quedan
+        memorizadas), así ninguna petición paga esa primera comparación.
+        """
+        suplementos = self.suplementos()
+        await self._en_hilo(self.indice_ofertas.tipos_coincidentes, suplementos)
+        logger.info(f"Ofertas de {len(suplementos)} suplementos precalculadas")
+
+    def estadisticas(self) -> dict:
+        """Peticiones agrupadas por el servicio y aciertos de la caché de recetas."""
+        cache = self.planner.cache
+        return {
+            "planes": {"ejecutados": self.planes.ejecutadas, "agrupados": self.planes.coalescidas},
+            "recetas": {"ejecutadas": self.recetas.ejecutadas, "agrupadas": self.recetas.coalescidas},
+            "cache": None if cache is None else {"aciertos": cache.hits, "fallos": cache.misses},
+        }
+
+    def cerrar(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,296 @@
+"""
+API HTTP local del servicio de planes, sobre asyncio (sin dependencias nuevas).
+
+Rutas (cuerpos y respuestas en JSON):
+- GET  /salud
+- GET  /estadisticas       peticiones agrupadas y aciertos de caché
+- POST /menu               {"calorias": 2100, "usar_api": true,
+                            "objetivo": "Build Muscle", "peso": 80}
+                           JSON lines, una línea {"dia", "comidas"} por día en
+                           cuanto está listo
+- POST /rutina             {"nivel", "sexo", "objetivo"}
+- POST /ofertas            {"suplementos": [...], "n": 6}
+
+Las conexiones son HTTP/1.1 con keep-alive, así que un cliente con un pool de
+conexiones (requests.Session) no abre una por petición.
+
+Uso (desde la raíz del repositorio):
+    python -m Servicio.servidor --puerto 8600
+y, para que la app lo use como cliente ligero:
+    FITPLANNER_SERVICIO_URL=http://127.0.0.1:8600 streamlit run App/app.py
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import threading
+from collections.abc import AsyncIterator
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from Servicio.planes import ServicioPlanes
+from Telemetria.trazas import tramo
+
+TAMANO_MAXIMO_CUERPO = 1 << 20
+RAZONES = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    def __init__(self, estado: int, mensaje: str):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+def _valor(dato):
+    if dato is pd.NA or dato is pd.NaT:
+        return None
+    if isinstance(dato, np.generic):
+        dato = dato.item()
+    if isinstance(dato, float) and math.isnan(dato):
+        return None
+    return dato
+
+
+def _a_json(valor):
+    """Los DataFrames se envían como lista de filas {columna: valor}, con None en lugar de NaN."""
+    if isinstance(valor, pd.DataFrame):
+        # Un solo array de objetos: ni una Series por fila ni un acceso por columna
+        columnas = list(valor.columns)
+        return [dict(zip(columnas, map(_valor, fila))) for fila in valor.to_numpy(dtype=object).tolist()]
+    if isinstance(valor, np.generic):
+        return _valor(valor)
+    raise TypeError(f"{type(valor).__name__} no se puede convertir a JSON")
+
+
+def codificar(payload) -> bytes:
+    return json.dumps(payload, default=_a_json, ensure_ascii=False).encode("utf-8")
+
+
+async def leer_peticion(reader: asyncio.StreamReader) -> tuple[str, str, dict, bytes] | None:
+    """Método, ruta, cabeceras (en minúsculas) y cuerpo; None si el cliente cerró la conexión."""
+    linea = await reader.readline()
+    if not linea.strip():
+        return None
+    try:
+        metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ErrorHTTP(400, "Línea de petición no válida")
+    cabeceras = {}
+    while (linea := await reader.readline()) not in (b"\r\n", b"\n", b""):
+        nombre, _, valor = linea.decode("latin-1").partition(":")
+        cabeceras[nombre.strip().lower()] = valor.strip()
+    longitud = int(cabeceras.get("content-length") or 0)
+    if longitud > TAMANO_MAXIMO_CUERPO:
+        raise ErrorHTTP(413, "Cuerpo demasiado grande")
+    cuerpo = await reader.readexactly(longitud) if longitud else b""
+    return metodo.upper(), ruta.split("?", 1)[0], cabeceras, cuerpo
+
+
+class ServidorPlanes:
+    """
+    Servidor HTTP del ServicioPlanes. Todas las conexiones se atienden en un
+    mismo bucle de eventos, que es donde se agrupan las peticiones iguales.
+    """
+
+    def __init__(self, servicio: ServicioPlanes, host: str = "127.0.0.1", puerto: int = 0, calentar: bool = False):
+        """Con calentar=True, al arrancar se lanza en segundo plano ServicioPlanes.calentar()."""
+        self.servicio = servicio
+        self.host = host
+        self.puerto = puerto
+        self.calentar = calentar
+        self._calentamiento: asyncio.Task = None
+        self._servidor: asyncio.Server = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._hilo: threading.Thread = None
+        self.rutas = {
+            ("GET", "/salud"): self._salud,
+            ("GET", "/estadisticas"): self._estadisticas,
+            ("POST", "/menu"): self._menu,
+            ("POST", "/rutina"): self._rutina,
+            ("POST", "/ofertas"): self._ofertas,
+        }
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.puerto}"
+
+    async def iniciar(self) -> None:
+        self._servidor = await asyncio.start_server(self._atender, self.host, self.puerto, backlog=512)
+        self.puerto = self._servidor.sockets[0].getsockname()[1]
+        logger.info(f"Servicio de planes en {self.url}")
+        if self.calentar:
+            self._calentamiento = asyncio.ensure_future(self.servicio.calentar())
+
+    async def servir_siempre(self) -> None:
+        await self.iniciar()
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    def en_hilo(self) -> "ServidorPlanes":
+        """Arranca el servidor en un bucle de eventos propio, en un hilo en segundo plano."""
+        listo = threading.Event()
+
+        def ejecutar():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.iniciar())
+            listo.set()
+            self._loop.run_forever()
+
+        self._hilo = threading.Thread(target=ejecutar, daemon=True, name="servicio-planes")
+        self._hilo.start()
+        listo.wait()
+        return self
+
+    def detener(self) -> None:
+        if self._loop is not None:
+            async def cerrar():
+                self._servidor.close()
+                await self._servidor.wait_closed()
+                # Las conexiones keep-alive abiertas se cierran antes de parar el bucle
+                tareas = asyncio.all_tasks() - {asyncio.current_task()}
+                for tarea in tareas:
+                    tarea.cancel()
+                await asyncio.gather(*tareas, return_exceptions=True)
+            asyncio.run_coroutine_threadsafe(cerrar(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._hilo.join()
+            self._loop.close()
+        self.servicio.cerrar()
+
+    def __enter__(self) -> "ServidorPlanes":
+        return self.en_hilo()
+
+    def __exit__(self, *exc) -> None:
+        self.detener()
+
+    async def _atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    peticion = await leer_peticion(reader)
+                except ErrorHTTP as e:
+                    await self._responder(writer, e.estado, {"error": str(e)}, cerrar=True)
+                    break
+                if peticion is None:
+                    break
+                metodo, ruta, cabeceras, cuerpo = peticion
+                await self._despachar(writer, metodo, ruta, cuerpo)
+                if cabeceras.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            # Al detener el servidor: la conexión se cierra sin más
+            pass
+        except Exception:
+            logger.exception("Error inesperado en la conexión; se cierra")
+        finally:
+            writer.close()
+
+    async def _despachar(self, writer: asyncio.StreamWriter, metodo: str, ruta: str, cuerpo: bytes) -> None:
+        manejador = self.rutas.get((metodo, ruta))
+        if manejador is None:
+            existe = any(r == ruta for _, r in self.rutas)
+            await self._responder(writer, 405 if existe else 404, {"error": f"{metodo} {ruta}"})
+            return
+        with tramo(f"servicio{ruta.replace('/', '.')}") as medicion:
+            try:
+                datos = json.loads(cuerpo) if cuerpo else {}
+                respuesta = await manejador(datos)
+            except (json.JSONDecodeError, KeyError, TypeError, ValueError) as e:
+                medicion.anotar(status=400)
+                await self._responder(writer, 400, {"error": f"Petición no válida: {e!r}"})
+                return
+            except Exception as e:
+                logger.exception(f"Error en {ruta}")
+                medicion.anotar(status=500)
+                await self._responder(writer, 500, {"error": str(e)})
+                return
+            medicion.anotar(status=200)
+            if isinstance(respuesta, AsyncIterator):
+                await self._responder_por_partes(writer, respuesta)
+            else:
+                await self._responder(writer, 200, respuesta)
+
+    async def _responder(self, writer: asyncio.StreamWriter, estado: int, payload, cerrar: bool = False) -> None:
+        cuerpo = codificar(payload)
+        cabeceras = [
+            f"HTTP/1.1 {estado} {RAZONES[estado]}",
+            "Content-Type: application/json; charset=utf-8",
+            f"Content-Length: {len(cuerpo)}",
+        ]
+        if cerrar:
+            cabeceras.append("Connection: close")
+        writer.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode("latin-1") + cuerpo)
+        await writer.drain()
+
+    async def _responder_por_partes(self, writer: asyncio.StreamWriter, lineas: AsyncIterator) -> None:
+        """Envía cada elemento como una línea JSON en su propio trozo (chunked)."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/x-ndjson; charset=utf-8\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        try:
+            async for elemento in lineas:
+                parte = codificar(elemento) + b"\n"
+                writer.write(f"{len(parte):x}\r\n".encode("latin-1") + parte + b"\r\n")
+                await writer.drain()
+        except ConnectionError:
+            raise
+        except Exception as e:
+            # La cabecera 200 ya salió: el error va como última línea
+            logger.exception("Error a mitad de la respuesta")
+            parte = codificar({"error": str(e)}) + b"\n"
+            writer.write(f"{len(parte):x}\r\n".encode("latin-1") + parte + b"\r\n")
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _salud(self, datos: dict) -> dict:
+        return {"ok": True}
+
+    async def _estadisticas(self, datos: dict) -> dict:
+        return self.servicio.estadisticas()
+
+    async def _menu(self, datos: dict) -> AsyncIterator[dict]:
+        calorias = int(datos["calorias"])
+        usar_api = bool(datos.get("usar_api", True))
+        objetivo = datos.get("objetivo")
+        peso = None if datos.get("peso") is None else float(datos["peso"])
+
+        async def dias():
+            async for dia, filas in self.servicio.menu(calorias, usar_api, objetivo, peso):
+                yield {"dia": dia, "comidas": filas}
+        return dias()
+
+    async def _rutina(self, datos: dict) -> dict:
+        titulo, rutina, ejercicios = await self.servicio.rutina(datos["nivel"], datos["sexo"], datos["objetivo"])
+        return {"titulo": titulo, "rutina": rutina, "ejercicios": ejercicios}
+
+    async def _ofertas(self, datos: dict) -> dict:
+        suplementos = [str(s) for s in datos.get("suplementos") or []]
+        recomendadas, otras = await self.servicio.ofertas(suplementos, int(datos.get("n", 6)))
+        return {"recomendadas": recomendadas, "otras": otras}
+
+
+def main(argv: list[str] = None) -> None:
+    parser = argparse.ArgumentParser(description="Servicio de planes de FitPlanner")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8600)
+    parser.add_argument("--hilos", type=int, default=64, help="hilos para las llamadas bloqueantes (casi todas esperan a la API)")
+    args = parser.parse_args(argv)
+
+    servidor = ServidorPlanes(ServicioPlanes.desde_recursos(args.hilos), args.host, args.puerto, calentar=True)
+    try:
+        asyncio.run(servidor.servir_siempre())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.servicio.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+
+
+def _recuperar_excepcion(futuro: asyncio.Future) -> None:
+    """
+    Marca como recuperada la excepción de un trabajo compartido. Si falla y
+    nadie lo espera (el cliente se desconectó o ya recibió la excepción de
+    otra clave del lote), asyncio ya no avisa de que nunca se recuperó; quien
+    lo espera la recibe igual.
+    """
+    if not futuro.cancelled():
+        futuro.exception()
+
+
+class SingleFlight:
+    """
+    Agrupa las peticiones concurrentes iguales: mientras hay un trabajo en
+    curso para una clave, el resto de peticiones con esa clave esperan su
+    resultado en lugar de repetirlo. Al terminar, la clave se libera (el
+    resultado no se guarda: para eso están las cachés).
+
+    El trabajo corre en su propia tarea, así que si el cliente que lo lanzó se
+    desconecta (y su tarea se cancela) los demás siguen recibiendo el resultado.
+    Solo se usa desde el bucle de eventos, por eso no necesita locks.
+    """
+
+    def __init__(self):
+        self._en_curso: dict[Hashable, asyncio.Future] = {}
+        self.ejecutadas = 0
+        self.coalescidas = 0
+
+    @property
+    def en_curso(self) -> int:
+        return len(self._en_curso)
+
+    async def hacer(self, clave: Hashable, funcion: Callable[[], Awaitable]):
+        """Devuelve el resultado de funcion(), o el del trabajo en curso con esa clave."""
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            futuro = asyncio.ensure_future(funcion())
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+            futuro.add_done_callback(_recuperar_excepcion)
+            self.ejecutadas += 1
+        else:
+            self.coalescidas += 1
+        return await asyncio.shield(futuro)
+
+    async def hacer_lote(
+        self, claves: Iterable[Hashable], funcion: Callable[[list], Awaitable[dict]]
+    ) -> dict:
+        """
+        Como hacer(), pero para varias claves a la vez: las que ya están en
+        curso se esperan y el resto se piden juntas con una sola llamada a
+        funcion(claves_nuevas), que devuelve {clave: valor}. Las claves que
+        no aparezcan en su resultado valen None.
+        """
+        loop = asyncio.get_running_loop()
+        futuros = {}
+        nuevas = {}
+        for clave in dict.fromkeys(claves):
+            futuro = self._en_curso.get(clave)
+            if futuro is None:
+                futuro = nuevas[clave] = self._en_curso[clave] = loop.create_future()
+                futuro.add_done_callback(_recuperar_excepcion)
+            else:
+                self.coalescidas += 1
+            futuros[clave] = futuro
+
+        if nuevas:
+            self.ejecutadas += len(nuevas)
+            tarea = asyncio.ensure_future(funcion(list(nuevas)))
+
+            def resolver(tarea: asyncio.Future) -> None:
+                for clave, futuro in nuevas.items():
+                    del self._en_curso[clave]
+                    if tarea.cancelled():
+                        futuro.cancel()
+                    elif tarea.exception() is not None:
+                        futuro.set_exception(tarea.exception())
+                    else:
+                        futuro.set_result(tarea.result().get(clave))
+
+            tarea.add_done_callback(resolver)
+
+        return {clave: await asyncio.shield(futuro) for clave, futuro in futuros.items()}
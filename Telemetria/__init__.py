@@ -0,0 +1,9 @@
+from .trazas import TRAZADOR, Trazador, registrar_payload, tramo, trazar
+
+__all__ = [
+    "TRAZADOR",
+    "Trazador",
+    "registrar_payload",
+    "tramo",
+    "trazar",
+]
@@ -0,0 +1,224 @@
+import json
+import os
+import random
+import threading
+import time
+from array import array
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from loguru import logger
+
+# Muestras recientes que se guardan por tramo para calcular los percentiles
+# (potencia de dos, para avanzar por el anillo con una máscara)
+MUESTRAS_POR_TRAMO = 1024
+CUANTILES = (0.5, 0.9, 0.99)
+
+# Fracción de llamadas cuyo payload se escribe en el log (nivel DEBUG)
+TASA_PAYLOADS = float(os.getenv("FITPLANNER_MUESTREO_PAYLOADS", "0.01"))
+
+
+class Estadistica:
+    """Número de llamadas, tiempo total, errores y las últimas duraciones de un tramo."""
+
+    __slots__ = ("llamadas", "total", "errores", "muestras", "_siguiente")
+
+    def __init__(self):
+        self.llamadas = 0
+        self.total = 0.0
+        self.errores = 0
+        # Anillo de dobles preasignado: registrar un tramo no reserva memoria
+        self.muestras = array("d", bytes(8 * MUESTRAS_POR_TRAMO))
+        self._siguiente = 0
+
+    def anadir(self, segundos: float, error: bool) -> None:
+        self.muestras[self._siguiente & (MUESTRAS_POR_TRAMO - 1)] = segundos
+        self._siguiente += 1
+        self.llamadas += 1
+        self.total += segundos
+        self.errores += error
+
+    def cuantiles(self, cuantiles=CUANTILES) -> dict[float, float]:
+        muestras = sorted(self.muestras[:min(self._siguiente, MUESTRAS_POR_TRAMO)])
+        if not muestras:
+            return {q: 0.0 for q in cuantiles}
+        return {q: muestras[min(len(muestras) - 1, int(q * len(muestras)))] for q in cuantiles}
+
+
+class Tramo:
+    """
+    Mide lo que tarda el bloque `with`. Si el bloque lanza una excepción el
+    tramo se cuenta como error y la excepción sigue su curso.
+    """
+
+    __slots__ = ("trazador", "nombre", "atributos", "inicio")
+
+    def __init__(self, trazador: "Trazador", nombre: str, atributos: dict):
+        self.trazador = trazador
+        self.nombre = nombre
+        self.atributos = atributos
+
+    def anotar(self, **atributos) -> None:
+        """Añade atributos conocidos a mitad del tramo (código HTTP, origen...)."""
+        self.atributos.update(atributos)
+
+    def __enter__(self) -> "Tramo":
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, traza) -> bool:
+        self.trazador.registrar(self.nombre, time.perf_counter() - self.inicio, tipo is not None, self.atributos)
+        return False
+
+
+class Trazador:
+    """
+    Recoge la duración de los tramos de la app (peticiones HTTP, pasos de
+    Filtering, lecturas de CSV, secciones de la página) y calcula sus
+    percentiles sobre las últimas MUESTRAS_POR_TRAMO llamadas.
+
+    Si se pasa ruta_jsonl, cada tramo terminado se escribe además como una
+    línea JSON con su nombre, duración, hilo y atributos. Las métricas se pueden
+    exportar en el formato de texto de Prometheus con prometheus() o servir en
+    un puerto local con servir().
+    """
+
+    def __init__(self, ruta_jsonl: str = None):
+        self._lock = threading.Lock()
+        self._estadisticas: dict[str, Estadistica] = {}
+        self._fichero = None
+        self.exportar_a(ruta_jsonl)
+
+    @classmethod
+    def desde_entorno(cls) -> "Trazador":
+        """Escribe las trazas en FITPLANNER_TRAZAS si la variable está definida."""
+        return cls(os.getenv("FITPLANNER_TRAZAS") or None)
+
+    def tramo(self, nombre: str, **atributos) -> Tramo:
+        return Tramo(self, nombre, atributos)
+
+    def trazar(self, nombre: str):
+        """Decorador que mide cada llamada a la función como un tramo."""
+        def decorador(funcion):
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                inicio = time.perf_counter()
+                error = True
+                try:
+                    resultado = funcion(*args, **kwargs)
+                    error = False
+                    return resultado
+                finally:
+                    self.registrar(nombre, time.perf_counter() - inicio, error)
+            return envoltura
+        return decorador
+
+    def registrar(self, nombre: str, segundos: float, error: bool = False, atributos: dict = None) -> None:
+        with self._lock:
+            try:
+                self._estadisticas[nombre].anadir(segundos, error)
+            except KeyError:
+                self._estadisticas[nombre] = Estadistica()
+                self._estadisticas[nombre].anadir(segundos, error)
+            if self._fichero is not None:
+                self._fichero.write(json.dumps({
+                    "ts": round(time.time(), 6),
+                    "tramo": nombre,
+                    "ms": round(segundos * 1000, 3),
+                    "error": error,
+                    "hilo": threading.current_thread().name,
+                    **(atributos or {}),
+                }, default=str) + "\n")
+
+    def resumen(self) -> dict[str, dict]:
+        """Llamadas, errores, tiempo total y p50/p90/p99 (en segundos) de cada tramo."""
+        with self._lock:
+            return {
+                nombre: {
+                    "llamadas": e.llamadas,
+                    "errores": e.errores,
+                    "total": e.total,
+                    **{f"p{round(q * 100)}": v for q, v in e.cuantiles().items()},
+                }
+                for nombre, e in sorted(self._estadisticas.items())
+            }
+
+    def prometheus(self) -> str:
+        lineas = [
+            "# HELP fitplanner_tramo_segundos Duración de cada tramo de la app",
+            "# TYPE fitplanner_tramo_segundos summary",
+        ]
+        errores = [
+            "# HELP fitplanner_tramo_errores_total Tramos terminados con una excepción",
+            "# TYPE fitplanner_tramo_errores_total counter",
+        ]
+        with self._lock:
+            for nombre, e in sorted(self._estadisticas.items()):
+                etiqueta = nombre.replace("\\", "\\\\").replace('"', '\\"')
+                for q, valor in e.cuantiles().items():
+                    lineas.append(f'fitplanner_tramo_segundos{{tramo="{etiqueta}",quantile="{q}"}} {valor:.6f}')
+                lineas.append(f'fitplanner_tramo_segundos_sum{{tramo="{etiqueta}"}} {e.total:.6f}')
+                lineas.append(f'fitplanner_tramo_segundos_count{{tramo="{etiqueta}"}} {e.llamadas}')
+                errores.append(f'fitplanner_tramo_errores_total{{tramo="{etiqueta}"}} {e.errores}')
+        return "\n".join(lineas + errores) + "\n"
+
+    def servir(self, puerto: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Sirve prometheus() en http://host:puerto/metrics desde un hilo en segundo plano."""
+        trazador = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                cuerpo = trazador.prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+        servidor = ThreadingHTTPServer((host, puerto), _Handler)
+        servidor.daemon_threads = True
+        threading.Thread(target=servidor.serve_forever, daemon=True, name="metricas").start()
+        logger.info(f"Métricas en http://{host}:{servidor.server_address[1]}/metrics")
+        return servidor
+
+    def exportar_a(self, ruta_jsonl: str | None) -> None:
+        """Empieza a escribir las trazas en otro fichero JSON lines (None deja de escribirlas)."""
+        fichero = open(ruta_jsonl, "a", encoding="utf-8", buffering=1) if ruta_jsonl else None
+        with self._lock:
+            anterior, self._fichero = self._fichero, fichero
+        if anterior is not None:
+            anterior.close()
+
+    def reiniciar(self) -> None:
+        with self._lock:
+            self._estadisticas.clear()
+
+
+TRAZADOR = Trazador.desde_entorno()
+
+
+def tramo(nombre: str, **atributos) -> Tramo:
+    """Tramo del trazador global: `with tramo("csv.rutinas"): ...`"""
+    return TRAZADOR.tramo(nombre, **atributos)
+
+
+def trazar(nombre: str):
+    """Decorador del trazador global."""
+    return TRAZADOR.trazar(nombre)
+
+
+def registrar_payload(mensaje: str, valor, tasa: float = None) -> None:
+    """
+    Escribe en DEBUG un payload (respuesta de la API, datos filtrados...) solo
+    en una fracción `tasa` de las llamadas. `valor` es una función sin
+    argumentos que devuelve el payload: solo se evalúa y se formatea si el
+    mensaje se llega a escribir.
+    """
+    if random.random() < (TASA_PAYLOADS if tasa is None else tasa):
+        logger.opt(lazy=True, depth=1).debug(mensaje, valor)
@@ -0,0 +1,18 @@
+"""
+Los submódulos se importan la primera vez que se usa cada nombre, así
+`import Utilidades` no carga pandas hasta que hace falta.
+"""
+from typing import TYPE_CHECKING
+
+from Utilidades.perezoso import exportaciones_perezosas
+
+if TYPE_CHECKING:
+    from .instantaneas import cargar_snapshot
+
+_EXPORTACIONES = {
+    "cargar_snapshot": ".instantaneas",
+}
+
+__all__ = list(_EXPORTACIONES)
+
+__getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTACIONES)
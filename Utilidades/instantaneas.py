@@ -0,0 +1,91 @@
+"""
+Instantáneas binarias de los CSV ya preparados, compartidas por los catálogos
+de Rutinas y Decathlon y por el recetario de Recetas.
+"""
+
+import glob
+import os
+import pickle
+from typing import Callable
+
+import pandas as pd
+from loguru import logger
+
+from Telemetria.trazas import tramo
+
+# Se incrementa cuando cambia el formato de los datos preparados, para que no
+# se reutilicen instantáneas antiguas
+VERSION_ESQUEMA = 1
+DIRECTORIO_SNAPSHOTS = ".snapshots"
+
+# Extensión de cada formato de instantánea
+FORMATOS = {"pickle": "pkl", "parquet": "parquet"}
+
+
+def _ruta_snapshot(ruta_csv: str, nombre: str, mtime_ns: int | str, formato: str = "pickle") -> str:
+    directorio = os.path.join(os.path.dirname(os.path.abspath(ruta_csv)), DIRECTORIO_SNAPSHOTS)
+    return os.path.join(directorio, f"{nombre}-v{VERSION_ESQUEMA}-{mtime_ns}.{FORMATOS[formato]}")
+
+
+def _leer_snapshot(ruta: str, formato: str) -> pd.DataFrame:
+    if formato == "parquet":
+        return pd.read_parquet(ruta)
+    with open(ruta, "rb") as f:
+        return pickle.load(f)
+
+
+def _escribir_snapshot(df: pd.DataFrame, ruta: str, formato: str) -> None:
+    if formato == "parquet":
+        df.to_parquet(ruta, index=False)
+        return
+    with open(ruta, "wb") as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def cargar_snapshot(
+    ruta_csv: str,
+    preparar: Callable[[pd.DataFrame], pd.DataFrame],
+    nombre: str = None,
+    formato: str = "pickle",
+    dependencias: list[str] = (),
+) -> pd.DataFrame:
+    """
+    Lee un CSV ya preparado desde una instantánea binaria (pickle o Parquet)
+    guardada junto al fichero. La instantánea se identifica por la fecha de
+    modificación del CSV y la versión del esquema: si el CSV cambia, se vuelve
+    a leer, se prepara con `preparar` y se guarda una instantánea nueva.
+
+    Si `preparar` lee además otros ficheros, se pasan en `dependencias` y la
+    instantánea también se regenera cuando cambia cualquiera de ellos.
+    """
+    nombre = nombre or os.path.splitext(os.path.basename(ruta_csv))[0]
+    with tramo(f"csv.{nombre}", formato=formato) as medicion:
+        df, origen = _cargar_snapshot(ruta_csv, preparar, nombre, formato, dependencias)
+        medicion.anotar(origen=origen, filas=len(df))
+    return df
+
+
+def _cargar_snapshot(ruta_csv, preparar, nombre, formato, dependencias) -> tuple[pd.DataFrame, str]:
+    mtime_ns = max(os.stat(ruta).st_mtime_ns for ruta in [ruta_csv, *dependencias])
+    ruta = _ruta_snapshot(ruta_csv, nombre, mtime_ns, formato)
+    if os.path.exists(ruta):
+        try:
+            df = _leer_snapshot(ruta, formato)
+            logger.debug(f"Instantánea cargada: {ruta}")
+            return df, "instantanea"
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError) as e:
+            logger.warning(f"Instantánea corrupta, se regenera {ruta}: {e}")
+
+    df = preparar(pd.read_csv(ruta_csv))
+    try:
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        _escribir_snapshot(df, temporal, formato)
+        os.replace(temporal, ruta)
+        for antigua in glob.glob(_ruta_snapshot(ruta_csv, nombre, "*", formato)):
+            if antigua != ruta:
+                os.remove(antigua)
+        logger.info(f"Instantánea guardada: {ruta}")
+    except OSError as e:
+        logger.warning(f"No se pudo guardar la instantánea de {ruta_csv}: {e}")
+    return df, "csv"
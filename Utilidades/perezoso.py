@@ -0,0 +1,35 @@
+"""
+Exportaciones perezosas para los __init__ de los paquetes: cada nombre se
+importa de su submódulo la primera vez que se usa, así importar el paquete no
+carga pandas, requests y compañía hasta que hacen falta.
+"""
+
+import importlib
+import sys
+from typing import Callable
+
+
+def exportaciones_perezosas(paquete: str, exportaciones: dict[str, str]) -> tuple[Callable, Callable]:
+    """
+    Devuelve el __getattr__ y el __dir__ del módulo paquete.
+
+    Args:
+    paquete (str): __name__ del paquete.
+    exportaciones (dict): Nombre exportado y submódulo relativo que lo define.
+
+    Uso:
+        __getattr__, __dir__ = exportaciones_perezosas(__name__, _EXPORTACIONES)
+    """
+
+    def __getattr__(nombre: str):
+        if nombre not in exportaciones:
+            raise AttributeError(f"module {paquete!r} has no attribute {nombre!r}")
+        valor = getattr(importlib.import_module(exportaciones[nombre], paquete), nombre)
+        # Las siguientes veces el nombre ya está en el módulo y no pasa por aquí
+        setattr(sys.modules[paquete], nombre, valor)
+        return valor
+
+    def __dir__() -> list[str]:
+        return sorted(set(vars(sys.modules[paquete])) | set(exportaciones))
+
+    return __getattr__, __dir__
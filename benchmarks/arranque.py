@@ -0,0 +1,158 @@
+"""
+Informe de arranque en frío: tiempo de importación y del primer render de la app.
+
+Cada medida se toma en un proceso nuevo, como el primer usuario tras arrancar el
+servidor:
+- importacion: `python -X importtime` de cada módulo, con los paquetes que más
+  tardan y si llegan a cargarse los módulos pesados que solo hacen falta en
+  algunos caminos (requests, fuzzywuzzy, dotenv...).
+- primer render de app.py (formulario) y de pages/output.py con AppTest, con las
+  instantáneas de datos ya en disco, sin ellas (--en-frio las borra antes) y
+  tras el calentamiento de App.recursos.
+
+El resultado se guarda como JSON para comparar entre ejecuciones.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.arranque --repeticiones 3 --salida benchmarks/resultados/arranque.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import textwrap
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DIRECTORIO_APP = os.path.join(RAIZ, "App")
+MODULOS = ["App.pages.output", "Recetas", "Decathlon", "Rutinas"]
+MODULOS_PESADOS = ["pandas", "numpy", "requests", "fuzzywuzzy", "dotenv", "streamlit"]
+PERFIL = {
+    "nombre": "Usuario", "objetivo": "Build Muscle", "nivel": "Beginner", "sexo": "Hombre",
+    "peso": 75.0, "altura": 178, "edad": 30,
+    "factor_actividad": "Actividad Moderada (3-5 veces por semana)", "usar_api": False,
+}
+
+# Se ejecuta en un proceso nuevo dentro de App/; imprime una línea JSON
+RENDER = textwrap.dedent("""
+    import json, sys, time
+    inicio = time.perf_counter()
+    from loguru import logger
+    logger.remove()
+    from streamlit.testing.v1 import AppTest
+    importar = time.perf_counter() - inicio
+    calentar = 0.0
+    if {calentar!r}:
+        from App.recursos import calentar as calentar_recursos
+        t = time.perf_counter()
+        calentar_recursos()
+        calentar = time.perf_counter() - t
+    at = AppTest.from_file({pagina!r}, default_timeout=120)
+    for clave, valor in {perfil!r}.items():
+        at.session_state[clave] = valor
+    t = time.perf_counter()
+    at.run()
+    render = time.perf_counter() - t
+    if at.exception:
+        sys.exit(str(at.exception[0].value))
+    hitos = at.session_state["tiempos_carga"] if "tiempos_carga" in at.session_state else {{}}
+    print(json.dumps({{"importar_streamlit": importar, "calentar": calentar, "render": render, **hitos}}))
+""")
+
+
+def entorno() -> dict:
+    return {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.getenv("PYTHONPATH")]))}
+
+
+def medir_importacion(modulo: str) -> dict:
+    proceso = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {modulo}"],
+        cwd=RAIZ, env=entorno(), capture_output=True, text=True, check=True,
+    )
+    # Cada módulo aparece después de los que importa; los hijos directos del
+    # módulo medido son los de segundo nivel que lo preceden
+    total_ms, hijos, pendientes, cargados = 0.0, {}, {}, set()
+    for linea in proceso.stderr.splitlines():
+        if not linea.startswith("import time:") or "cumulative" in linea:
+            continue
+        # "import time:   self |  cumulative | <sangría>módulo", en microsegundos
+        _, total, nombre = linea[len("import time:"):].split("|")
+        sangria = len(nombre) - len(nombre.lstrip())
+        nombre = nombre.strip()
+        cargados.add(nombre)
+        if sangria == 3:
+            pendientes[nombre] = int(total) / 1000
+        elif sangria == 1:
+            if nombre == modulo:
+                total_ms, hijos = int(total) / 1000, pendientes
+            pendientes = {}
+    return {
+        "total_ms": round(total_ms, 1),
+        "mas_lentos_ms": {n: round(ms, 1) for n, ms in sorted(hijos.items(), key=lambda par: -par[1])[:8]},
+        "pesados_cargados": [m for m in MODULOS_PESADOS if m in cargados],
+    }
+
+
+def medir_render(pagina: str, calentar: bool = False, en_frio: bool = False) -> dict:
+    if en_frio:
+        shutil.rmtree(os.path.join(DIRECTORIO_APP, ".snapshots"), ignore_errors=True)
+    codigo = RENDER.format(pagina=pagina, perfil=PERFIL, calentar=calentar)
+    proceso = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=DIRECTORIO_APP, env=entorno(), capture_output=True, text=True,
+    )
+    if proceso.returncode:
+        raise RuntimeError(proceso.stderr.strip().splitlines()[-1])
+    return json.loads(proceso.stdout.strip().splitlines()[-1])
+
+
+def mediana(medidas: list[dict]) -> dict:
+    return {clave: round(statistics.median(m[clave] for m in medidas), 4) for clave in medidas[0]}
+
+
+def run(repeticiones: int, en_frio: bool) -> dict:
+    informe = {"importacion": {modulo: medir_importacion(modulo) for modulo in MODULOS}}
+    escenarios = {
+        "app": dict(pagina="app.py"),
+        "output": dict(pagina="pages/output.py"),
+        "output_tras_calentar": dict(pagina="pages/output.py", calentar=True),
+    }
+    if en_frio:
+        escenarios["output_sin_instantaneas"] = dict(pagina="pages/output.py", en_frio=True)
+    informe["primer_render"] = {
+        nombre: mediana([medir_render(**escenario) for _ in range(repeticiones)])
+        for nombre, escenario in escenarios.items()
+    }
+    return informe
+
+
+def main(argv: list[str] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=3, help="procesos por escenario (se da la mediana)")
+    parser.add_argument(
+        "--en-frio", action="store_true",
+        help="medir también sin instantáneas (borra App/.snapshots, que se regenera solo)",
+    )
+    parser.add_argument("--salida", help="fichero JSON donde guardar el resultado")
+    args = parser.parse_args(argv)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeticiones": args.repeticiones,
+        **run(args.repeticiones, args.en_frio),
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+    return informe
+
+
+if __name__ == "__main__":
+    main()
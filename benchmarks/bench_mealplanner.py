@@ -0,0 +1,51 @@
+"""
+Compara la latencia de MealPlanner.get_weekly_menu entre el camino secuencial,
+el concurrente y el bulk contra el servidor local de Spoonacular.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_mealplanner --latency 0.05 --workers 1 4 8 16
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from loguru import logger
+
+from Recetas.mealplanner import MealPlanner
+from tests.spoonacular_stub import SpoonacularStub
+
+
+def run(latency: float, workers: list[int], repeat: int) -> None:
+    with SpoonacularStub(latency=latency) as stub:
+        print(f"Latencia simulada por petición: {latency * 1000:.0f} ms")
+        for max_workers, bulk in [(w, False) for w in workers] + [(1, True)]:
+            times = []
+            for _ in range(repeat):
+                stub.reset()
+                planner = MealPlanner(
+                    api_key="bench", base_url=stub.base_url, max_workers=max_workers, bulk=bulk
+                )
+                start = time.perf_counter()
+                planner.get_weekly_menu(2000)
+                times.append(time.perf_counter() - start)
+            if bulk:
+                mode = "bulk"
+            else:
+                mode = "secuencial" if max_workers <= 1 else f"{max_workers} hilos"
+            print(
+                f"{mode:>12}: mediana {statistics.median(times):.3f} s | "
+                f"peticiones {len(stub.requests)} | simultáneas {stub.max_in_flight}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    run(args.latency, args.workers, args.repeat)
@@ -0,0 +1,67 @@
+"""
+Mide busqueda_ofertas con el índice de tipos de producto frente al recorrido
+fila a fila original, para el catálogo real (~5.000 filas) y uno 100 veces mayor.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_ofertas --sizes 5000 500000
+"""
+
+import argparse
+import time
+import warnings
+
+import pandas as pd
+from fuzzywuzzy import fuzz
+
+from Decathlon.ofertas import IndiceOfertas, _puntuacion
+
+SUPLEMENTOS = ["Whey Protein", "Creatine Monohydrate", "Fish Oil (EFAs)", "Multivitamin", "BCAA's"]
+
+
+def busqueda_fila_a_fila(suplementos, df_productos, umbral=60):
+    ofertas = []
+    for suplemento in suplementos:
+        for index, row in df_productos.iterrows():
+            if fuzz.partial_ratio(suplemento, row['Tipo Producto']) > umbral:
+                ofertas.append(row)
+    return pd.DataFrame(ofertas)
+
+
+def catalogo(filas: int) -> pd.DataFrame:
+    base = pd.read_csv("App/productos_paginas.csv")
+    copias = -(-filas // len(base))
+    return pd.concat([base] * copias, ignore_index=True).iloc[:filas]
+
+
+def medir(funcion, *args) -> tuple[float, int]:
+    inicio = time.perf_counter()
+    resultado = funcion(*args)
+    return time.perf_counter() - inicio, len(resultado)
+
+
+def run(sizes: list[int], legacy_max_rows: int) -> None:
+    for filas in sizes:
+        df = catalogo(filas)
+        _puntuacion.cache_clear()
+        t_frio, n = medir(lambda: IndiceOfertas(df).buscar(SUPLEMENTOS))
+        t_caliente, _ = medir(lambda: IndiceOfertas(df).buscar(SUPLEMENTOS))
+        linea = f"{filas:>8} filas | índice {t_frio * 1000:8.1f} ms (caliente {t_caliente * 1000:6.1f} ms)"
+        if filas <= legacy_max_rows:
+            t_legacy, n_legacy = medir(busqueda_fila_a_fila, SUPLEMENTOS, df)
+            assert n_legacy == n
+            linea += f" | fila a fila {t_legacy * 1000:9.1f} ms | x{t_legacy / t_frio:.0f}"
+        else:
+            linea += " | fila a fila omitido"
+        print(f"{linea} | {n} ofertas")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5000, 500000])
+    parser.add_argument(
+        "--legacy-max-rows", type=int, default=5000,
+        help="tamaño máximo de catálogo en el que medir la versión fila a fila",
+    )
+    args = parser.parse_args()
+    warnings.simplefilter("ignore")
+    run(args.sizes, args.legacy_max_rows)
@@ -0,0 +1,73 @@
+"""
+Compara la búsqueda de una rutina personalizada con IndiceRutinas frente al
+filtrado con máscaras booleanas sobre un catálogo escalado.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_rutinas --scale 100 --lookups 1000
+"""
+
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from Rutinas.indice import IndiceRutinas
+
+CONSULTAS = [
+    ('Build Muscle', 'Beginner', 'Male'),
+    ('Lose Fat', 'Intermediate', 'Female'),
+    ('Increase Strength', 'Beginner', 'Male'),
+    ('General Fitness', 'Beginner', 'Female'),
+]
+
+
+def catalogo(escala: int) -> pd.DataFrame:
+    base = pd.read_csv("App/rutinas.csv")
+    copias = []
+    for i in range(escala):
+        copia = base.copy()
+        copia['Workout Title'] = copia['Workout Title'] + f" #{i}"
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+def elegir_con_mascaras(workouts, objetivo, nivel, genero):
+    filtradas = workouts[
+        (workouts['Main Goal'] == objetivo) &
+        (workouts['Training Level'] == nivel) &
+        ((workouts['Target Gender'] == genero) | (workouts['Target Gender'] == 'Male & Female'))
+    ]
+    titulo = random.choice(filtradas['Workout Title'].unique())
+    return titulo, workouts[workouts['Workout Title'] == titulo]
+
+
+def medir(funcion, consultas) -> float:
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        funcion(*consulta)
+    return (time.perf_counter() - inicio) / len(consultas)
+
+
+def run(escala: int, lookups: int) -> None:
+    workouts = catalogo(escala)
+    consultas = [CONSULTAS[i % len(CONSULTAS)] for i in range(lookups)]
+
+    inicio = time.perf_counter()
+    indice = IndiceRutinas(workouts)
+    t_indice_construccion = time.perf_counter() - inicio
+
+    t_mascaras = medir(lambda *c: elegir_con_mascaras(workouts, *c), consultas)
+    t_indice = medir(indice.elegir, consultas)
+    print(f"Catálogo: {len(workouts)} filas, {len(indice.titulos_totales)} rutinas")
+    print(f"Construcción del índice: {t_indice_construccion * 1000:.1f} ms")
+    print(f"Máscaras: {t_mascaras * 1e6:9.1f} µs por consulta")
+    print(f"Índice:   {t_indice * 1e6:9.1f} µs por consulta (x{t_mascaras / t_indice:.0f})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=100)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.scale, args.lookups)
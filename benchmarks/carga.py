@@ -0,0 +1,183 @@
+"""
+Prueba de carga de la página de resultados con N usuarios simultáneos.
+
+Cada usuario simulado abre pages/output.py con AppTest de Streamlit, con un
+perfil aleatorio en session_state, y repite la visita durante la prueba. AppTest
+no admite varias ejecuciones a la vez en un mismo proceso, así que cada usuario
+corre en su propio proceso: los recursos cacheados (recetario, índices, caché de
+recetas y scheduler) se comparten entre las visitas de un usuario pero no entre
+usuarios, como con varios servidores de Streamlit detrás de un balanceador. Con
+--api el menú se pide a un servidor local que imita Spoonacular, con la latencia
+indicada. Las variables de entorno de la prueba (URL del servidor local, API keys
+simuladas y una caché de recetas temporal) solo se definen en los procesos de los
+usuarios, así que ni la caché de la app ni el entorno de quien la lanza cambian.
+
+El resultado (latencias p50/p95/p99 por hito de carga, errores y visitas por
+segundo) se guarda como JSON para comparar entre ejecuciones.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.carga --usuarios 8 --visitas 5 --salida benchmarks/resultados/carga.json
+    python -m benchmarks.carga --usuarios 8 --api --latencia 0.1 --claves 4
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+from loguru import logger
+
+DIRECTORIO_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "App")
+OBJETIVOS = ["Lose Fat", "Build Muscle", "General Fitness", "Increase Strength", "Sports Performance"]
+NIVELES = ["Beginner", "Advanced", "Intermediate"]
+SEXOS = ["Hombre", "Mujer"]
+FACTORES_ACTIVIDAD = [
+    "Sedentario",
+    "Poca Actividad (1-3 veces por semana)",
+    "Actividad Moderada (3-5 veces por semana)",
+    "Intensa (6-7 veces por semana)",
+]
+HITOS = ["primer_contenido", "productos", "primer_dia", "completo"]
+
+
+def perfil_aleatorio(rng: random.Random, usar_api: bool) -> dict:
+    return {
+        "nombre": f"usuario{rng.randrange(10_000)}",
+        "objetivo": rng.choice(OBJETIVOS),
+        "nivel": rng.choice(NIVELES),
+        "sexo": rng.choice(SEXOS),
+        "peso": rng.randint(50, 110),
+        "altura": rng.randint(150, 200),
+        "edad": rng.randint(18, 65),
+        "factor_actividad": rng.choice(FACTORES_ACTIVIDAD),
+        "usar_api": usar_api,
+    }
+
+
+def visita(perfil: dict, timeout: float) -> dict:
+    """Carga la página de resultados una vez y devuelve sus tiempos de carga."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file("pages/output.py", default_timeout=timeout)
+    for clave, valor in perfil.items():
+        at.session_state[clave] = valor
+    inicio = time.perf_counter()
+    at.run()
+    total = time.perf_counter() - inicio
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    tiempos = at.session_state["tiempos_carga"] if "tiempos_carga" in at.session_state else {}
+    return {"total": total, **tiempos}
+
+
+def preparar_proceso(entorno: dict[str, str]) -> None:
+    os.environ.update(entorno)
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    sys.path.insert(0, os.path.dirname(DIRECTORIO_APP))
+    os.chdir(DIRECTORIO_APP)
+
+
+def usuario(n: int, visitas: int, usar_api: bool, timeout: float, semilla: int) -> tuple[list[dict], list[str]]:
+    rng = random.Random(semilla + n)
+    resultados, errores = [], []
+    for _ in range(visitas):
+        try:
+            resultados.append(visita(perfil_aleatorio(rng, usar_api), timeout))
+        except Exception as e:
+            errores.append(f"{type(e).__name__}: {e}")
+    return resultados, errores
+
+
+def percentiles(valores: list[float]) -> dict:
+    if not valores:
+        return {}
+    p50, p95, p99 = np.percentile(valores, [50, 95, 99])
+    return {
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "max": round(float(max(valores)), 4),
+    }
+
+
+def run(
+    usuarios: int, visitas: int, usar_api: bool, timeout: float, semilla: int, entorno: dict[str, str]
+) -> dict:
+    resultados, errores = [], []
+    inicio = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=usuarios, initializer=preparar_proceso, initargs=(entorno,)) as pool:
+        futuros = [pool.submit(usuario, n, visitas, usar_api, timeout, semilla) for n in range(usuarios)]
+        for futuro in futuros:
+            r, e = futuro.result()
+            resultados.extend(r)
+            errores.extend(e)
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "visitas": len(resultados),
+        "errores": len(errores),
+        "ejemplos_error": errores[:5],
+        "duracion": round(duracion, 3),
+        "visitas_por_segundo": round(len(resultados) / duracion, 3),
+        "latencias": {
+            hito: percentiles([r[hito] for r in resultados if hito in r])
+            for hito in ["total", *HITOS]
+        },
+    }
+
+
+def main(argv: list[str] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usuarios", type=int, default=4, help="usuarios simultáneos")
+    parser.add_argument("--visitas", type=int, default=3, help="visitas por usuario")
+    parser.add_argument("--api", action="store_true", help="pedir el menú al servidor local de Spoonacular")
+    parser.add_argument("--latencia", type=float, default=0.05, help="latencia por petición del servidor local (s)")
+    parser.add_argument("--claves", type=int, default=4, help="API keys simuladas para el scheduler")
+    parser.add_argument("--timeout", type=float, default=60, help="tiempo máximo por visita (s)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="fichero JSON donde guardar el resultado")
+    args = parser.parse_args(argv)
+
+    salida = os.path.abspath(args.salida) if args.salida else None
+
+    configuracion = {k: v for k, v in vars(args).items() if k != "salida"}
+    with tempfile.TemporaryDirectory(prefix="fitplanner-carga-") as temporal:
+        # Caché de recetas vacía y propia de la prueba: las recetas del servidor
+        # local no deben acabar en App/cache_recetas.sqlite
+        entorno = {"FITPLANNER_CACHE_RECETAS": os.path.join(temporal, "cache_recetas.sqlite")}
+        if args.api:
+            from tests.spoonacular_stub import SpoonacularStub
+
+            entorno.update({f"API_KEY{i}": f"carga-{i}" for i in range(1, args.claves + 1)})
+            with SpoonacularStub(latency=args.latencia) as stub:
+                entorno["SPOONACULAR_BASE_URL"] = stub.base_url
+                resultado = run(args.usuarios, args.visitas, True, args.timeout, args.semilla, entorno)
+            resultado["peticiones_api"] = len(stub.requests)
+        else:
+            resultado = run(args.usuarios, args.visitas, False, args.timeout, args.semilla, entorno)
+
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "configuracion": configuracion,
+        **resultado,
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if salida:
+        os.makedirs(os.path.dirname(salida), exist_ok=True)
+        with open(salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Rendimiento del servicio de planes frente a un MealPlanner por sesión, con N usuarios a la vez.
+
+Escenarios, todos contra el servidor local que imita Spoonacular (con la latencia
+indicada) y empezando con la caché de recetas vacía:
+- directo: cada usuario crea su MealPlanner (caché compartida, bulk=True), como
+  hace ahora cada sesión de Streamlit.
+- servicio: los usuarios piden el menú al servicio de planes, que corre en otro
+  proceso, con un mismo ClienteServicio, como las sesiones de la app en modo
+  cliente ligero.
+- servicio_caliente: una segunda ronda de los mismos usuarios, con la caché del
+  servicio ya llena.
+- pagina: todo lo que pide la página en modo cliente ligero (rutina, ofertas y
+  menú) con la caché ya llena.
+
+Se repiten con perfiles aleatorios (sus calorías caen en varios tramos) y con
+todos los usuarios en el mismo tramo. Para cada escenario se dan las latencias
+por usuario, los menús por segundo y las peticiones que llegaron a la API.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.servicio --usuarios 50 --latencia 0.1 --salida benchmarks/resultados/servicio.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import random
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import requests
+from loguru import logger
+
+from App.perfil import calcular_calorias
+from App.recursos import DIRECTORIO_RECETARIO, RUTA_PRODUCTOS, RUTA_RUTINAS
+from benchmarks.carga import percentiles, perfil_aleatorio
+from Decathlon.catalogo import cargar_productos
+from Decathlon.ofertas import IndiceOfertas, RankingOfertas
+from Recetas.cache import RecipeCache
+from Recetas.local_planner import cargar_recetario
+from Recetas.mealplanner import MealPlanner
+from Rutinas.catalogo import cargar_rutinas
+from Rutinas.ejercicios import IndiceEjercicios, cargar_ejercicios
+from Rutinas.indice import IndiceRutinas
+from Servicio.cliente import ClienteServicio
+from Servicio.planes import ServicioPlanes
+from Servicio.servidor import ServidorPlanes
+from tests.spoonacular_stub import SpoonacularStub
+
+
+def cargar_catalogos() -> dict:
+    rutinas = cargar_rutinas(RUTA_RUTINAS)
+    productos = cargar_productos(RUTA_PRODUCTOS)
+    return {
+        "indice_rutinas": IndiceRutinas(rutinas),
+        "indice_ejercicios": IndiceEjercicios(cargar_ejercicios(RUTA_RUTINAS), rutinas),
+        "indice_ofertas": IndiceOfertas(productos),
+        "ranking_ofertas": RankingOfertas(productos),
+        "recetario": cargar_recetario(DIRECTORIO_RECETARIO),
+    }
+
+
+def servir(puerto: int, base_url: str, hilos: int) -> None:
+    """Proceso del servicio, con la caché de recetas vacía y en memoria."""
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    planner = MealPlanner(api_key="bench", base_url=base_url, cache=RecipeCache(), bulk=True, max_workers=hilos)
+    servicio = ServicioPlanes(planner, **cargar_catalogos(), max_workers=hilos)
+
+    async def arrancar():
+        # Se calienta antes de escuchar, para no medir el calentamiento
+        await servicio.calentar()
+        await ServidorPlanes(servicio, puerto=puerto).servir_siempre()
+
+    asyncio.run(arrancar())
+
+
+@contextmanager
+def servicio_en_proceso(base_url: str, hilos: int, usuarios: int):
+    """
+    Arranca el servicio en otro proceso, como se desplegaría, para que los
+    usuarios simulados no compitan con él por el GIL.
+    """
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        puerto = s.getsockname()[1]
+    proceso = multiprocessing.get_context("spawn").Process(target=servir, args=(puerto, base_url, hilos), daemon=True)
+    proceso.start()
+    cliente = ClienteServicio(f"http://127.0.0.1:{puerto}", max_conexiones=usuarios)
+    try:
+        for _ in range(600):
+            if not proceso.is_alive():
+                raise RuntimeError("El proceso del servicio de planes terminó al arrancar")
+            try:
+                cliente.session.get(f"{cliente.url}/salud", timeout=1).raise_for_status()
+                break
+            except requests.RequestException:
+                time.sleep(0.1)
+        else:
+            raise RuntimeError("El servicio de planes no arrancó")
+        yield cliente
+    finally:
+        proceso.terminate()
+        proceso.join()
+
+
+def concurrentes(funcion, perfiles: list[dict]) -> tuple[list[float], float]:
+    """Ejecuta funcion(perfil) para todos los perfiles a la vez; latencias y duración total."""
+    def medir(perfil):
+        inicio = time.perf_counter()
+        funcion(perfil)
+        return time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(perfiles)) as pool:
+        latencias = list(pool.map(medir, perfiles))
+    return latencias, time.perf_counter() - inicio
+
+
+def escenario(funcion, perfiles: list[dict], stub: SpoonacularStub) -> dict:
+    stub.reset()
+    latencias, duracion = concurrentes(funcion, perfiles)
+    return {
+        "duracion": round(duracion, 3),
+        "menus_por_segundo": round(len(perfiles) / duracion, 1),
+        "latencias": percentiles(latencias),
+        "peticiones_api": len(stub.requests),
+    }
+
+
+def comparar(perfiles: list[dict], stub: SpoonacularStub, hilos: int, pagina: bool) -> dict:
+    """Los escenarios directo y servicio (y los que van con la caché llena) con unos perfiles."""
+    cache = RecipeCache()
+
+    def directo(perfil):
+        planner = MealPlanner(api_key="bench", base_url=stub.base_url, cache=cache, bulk=True)
+        list(planner.iter_weekly_menu(perfil["calorias"]))
+
+    informe = {"directo": escenario(directo, perfiles, stub)}
+    with servicio_en_proceso(stub.base_url, hilos, len(perfiles)) as cliente:
+        def menu(perfil):
+            list(cliente.iter_weekly_menu(perfil["calorias"], usar_api=True))
+
+        def pagina_completa(perfil):
+            _, rutina, _ = cliente.rutina(perfil["nivel"], perfil["sexo"], perfil["objetivo"])
+            suplementos = rutina["Recommended Supps"].iloc[0]
+            cliente.ofertas([s.strip() for s in suplementos.split(",")] if isinstance(suplementos, str) else [])
+            list(cliente.iter_weekly_menu(perfil["calorias"], usar_api=True))
+
+        informe["servicio"] = escenario(menu, perfiles, stub)
+        informe["servicio_caliente"] = escenario(menu, perfiles, stub)
+        if pagina:
+            informe["pagina"] = escenario(pagina_completa, perfiles, stub)
+        informe["estadisticas_servicio"] = cliente.estadisticas()
+    return informe
+
+
+def run(usuarios: int, latencia: float, hilos: int, semilla: int) -> dict:
+    rng = random.Random(semilla)
+    perfiles = [perfil_aleatorio(rng, True) for _ in range(usuarios)]
+    for perfil in perfiles:
+        perfil["calorias"] = calcular_calorias(
+            perfil["objetivo"], perfil["peso"], perfil["altura"], perfil["edad"],
+            perfil["sexo"], perfil["factor_actividad"],
+        )
+    tramos = {MealPlanner(api_key="").bucket(perfil["calorias"]) for perfil in perfiles}
+
+    with SpoonacularStub(latency=latencia) as stub:
+        return {
+            # Perfiles aleatorios: las calorías caen en varios tramos
+            "perfiles_aleatorios": {"tramos_de_calorias": len(tramos), **comparar(perfiles, stub, hilos, True)},
+            # Todos los usuarios con objetivos parecidos (mismo tramo de calorías)
+            "mismo_tramo": comparar([{**perfil, "calorias": 2000} for perfil in perfiles], stub, hilos, False),
+        }
+
+
+def main(argv: list[str] = None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--usuarios", type=int, default=50, help="usuarios simultáneos")
+    parser.add_argument("--latencia", type=float, default=0.1, help="latencia por petición del servidor local (s)")
+    parser.add_argument("--hilos", type=int, default=64, help="hilos del servicio para las llamadas bloqueantes")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="fichero JSON donde guardar el resultado")
+    args = parser.parse_args(argv)
+
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    informe = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "configuracion": {k: v for k, v in vars(args).items() if k != "salida"},
+        **run(args.usuarios, args.latencia, args.hilos, args.semilla),
+    }
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if args.salida:
+        os.makedirs(os.path.dirname(os.path.abspath(args.salida)), exist_ok=True)
+        with open(args.salida, "w", encoding="utf-8") as f:
+            f.write(texto)
+    print(texto)
+    return informe
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Suite de rendimiento con pytest-benchmark: parsers de Filtering con respuestas
+grandes, cálculo de calorías, rutina personalizada, búsqueda de ofertas,
+carga de los CSV y generación del menú semanal contra el servidor local de
+Spoonacular.
+
+No se ejecuta con el resto de tests. Uso (desde la raíz del repositorio):
+    python -m pytest benchmarks/suite.py --benchmark-json=benchmarks/resultados/base.json
+    python -m pytest benchmarks/suite.py --benchmark-json=benchmarks/resultados/nuevo.json
+    pytest-benchmark compare benchmarks/resultados/base.json benchmarks/resultados/nuevo.json
+
+BENCH_LATENCIA fija la latencia simulada de cada petición a la API en segundos
+(0.02 por defecto).
+"""
+
+import os
+import random
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+from loguru import logger
+
+from App.pages.output import busqueda_ofertas
+from App.perfil import (
+    FACTOR_ACTIVIDAD_NUM,
+    calcular_calorias,
+    calcular_calorias_df,
+    rutina_personalizada,
+)
+from Decathlon.catalogo import cargar_productos
+from Decathlon.ofertas import RankingOfertas, _puntuacion
+from Recetas.filtering import Filtering
+from Recetas.local_planner import LocalMealPlanner, load_recipe_corpus
+from Recetas.mealplanner import MealPlanner
+from Recetas.nutrition import daily_targets
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from Rutinas.catalogo import cargar_rutinas, preparar_rutinas
+from Rutinas.indice import IndiceRutinas
+from tests.spoonacular_stub import SpoonacularStub, recipe_bulk, weekly_plan
+
+LATENCIA = float(os.getenv("BENCH_LATENCIA", "0.02"))
+SUPLEMENTOS = ["Whey Protein", "Creatine Monohydrate", "Fish Oil (EFAs)", "Multivitamin", "BCAA's"]
+
+
+@pytest.fixture(scope="module", autouse=True)
+def sin_logs():
+    # Los logs DEBUG de Filtering y MealPlanner dominarían las mediciones
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+    yield
+
+
+@pytest.fixture(scope="module")
+def productos():
+    return pd.read_csv("App/productos_paginas.csv")
+
+
+@pytest.fixture(scope="module")
+def rutinas():
+    return cargar_rutinas("App/rutinas.csv")
+
+
+@pytest.fixture(scope="module")
+def stub():
+    with SpoonacularStub(latency=LATENCIA) as stub:
+        yield stub
+
+
+# Filtering con respuestas grandes
+
+def test_filter_id_by_meal(benchmark):
+    # Un plan de un año con 3 comidas al día
+    data = {"week": {f"dia{i}": weekly_plan(2000)["week"]["monday"] for i in range(365)}}
+    resultado = benchmark(Filtering.filter_id_by_meal, data)
+    assert len(resultado) == 365
+
+
+def test_filter_name_and_ingredients(benchmark):
+    receta = {"title": "Receta", "extendedIngredients": [{"original": f"{i} g de arroz"} for i in range(5000)]}
+    resultado = benchmark(Filtering.filter_name_and_ingredients, receta)
+    assert resultado["Ingredients"].startswith("0 g de arroz")
+
+
+def test_filter_instructions(benchmark):
+    pasos = [{"name": "", "steps": [{"number": i, "step": f"Paso {i}."} for i in range(5000)]}]
+    resultado = benchmark(Filtering.filter_instructions, pasos)
+    assert resultado["Instructions"]
+
+
+def test_filter_bulk_recipes(benchmark):
+    recetas = [recipe_bulk(i) for i in range(2000)]
+    resultado = benchmark(Filtering.filter_bulk_recipes, recetas)
+    assert len(resultado) == 2000
+
+
+# Calorías y rutinas
+
+def test_calcular_calorias(benchmark):
+    resultado = benchmark(
+        calcular_calorias, 'Build Muscle', 70, 175, 30, 'Hombre', 'Actividad Moderada (3-5 veces por semana)'
+    )
+    assert resultado > 0
+
+
+def test_calcular_calorias_df(benchmark):
+    rng = np.random.default_rng(0)
+    n = 100_000
+    perfiles = pd.DataFrame({
+        'objetivo': rng.choice(['Lose Fat', 'Build Muscle', 'General Fitness'], n),
+        'peso': rng.uniform(40, 150, n),
+        'altura': rng.uniform(140, 210, n),
+        'edad': rng.integers(16, 90, n),
+        'sexo': rng.choice(['Hombre', 'Mujer'], n),
+        'factor_actividad': rng.choice(list(FACTOR_ACTIVIDAD_NUM), n),
+    })
+    resultado = benchmark(calcular_calorias_df, perfiles)
+    assert resultado.notna().all()
+
+
+def test_rutina_personalizada(benchmark, rutinas):
+    indice = IndiceRutinas(rutinas)
+    random.seed(0)
+    titulo, filas = benchmark(rutina_personalizada, rutinas, 'Beginner', 'Hombre', 'Build Muscle', indice)
+    assert len(filas)
+
+
+def test_rutina_personalizada_sin_indice(benchmark, rutinas):
+    titulo, filas = benchmark(rutina_personalizada, rutinas, 'Beginner', 'Mujer', 'Lose Fat')
+    assert len(filas)
+
+
+# Ofertas
+
+def test_busqueda_ofertas_en_frio(benchmark, productos):
+    def preparar():
+        _puntuacion.cache_clear()
+        return (SUPLEMENTOS, productos), {}
+
+    resultado = benchmark.pedantic(busqueda_ofertas, setup=preparar, rounds=5)
+    assert len(resultado)
+
+
+def test_busqueda_ofertas(benchmark, productos):
+    resultado = benchmark(busqueda_ofertas, SUPLEMENTOS, productos)
+    assert len(resultado)
+
+
+def test_elegir_ofertas(benchmark, productos):
+    ranking = RankingOfertas(productos)
+    resultado = benchmark(ranking.elegir, 6)
+    assert len(resultado) == 6
+
+
+# Carga de datos
+
+def test_leer_csv_rutinas(benchmark):
+    resultado = benchmark(lambda: preparar_rutinas(pd.read_csv("App/rutinas.csv")))
+    assert len(resultado) == 534
+
+
+def test_cargar_rutinas_snapshot(benchmark, tmp_path):
+    ruta = tmp_path / "rutinas.csv"
+    shutil.copy("App/rutinas.csv", ruta)
+    cargar_rutinas(str(ruta))
+    resultado = benchmark(cargar_rutinas, str(ruta))
+    assert len(resultado) == 534
+
+
+def test_cargar_productos_snapshot(benchmark, tmp_path):
+    ruta = tmp_path / "productos_paginas.csv"
+    shutil.copy("App/productos_paginas.csv", ruta)
+    cargar_productos(str(ruta))
+    resultado = benchmark(cargar_productos, str(ruta))
+    assert len(resultado) > 5000
+
+
+def test_load_recipe_corpus(benchmark):
+    resultado = benchmark(load_recipe_corpus)
+    assert len(resultado) == 1090
+
+
+# Menú semanal
+
+@pytest.mark.parametrize("max_workers,bulk", [(1, False), (8, False), (8, True)], ids=["secuencial", "hilos", "bulk"])
+def test_get_weekly_menu(benchmark, stub, max_workers, bulk):
+    def menu():
+        planner = MealPlanner(api_key="bench", base_url=stub.base_url, max_workers=max_workers, bulk=bulk)
+        return planner.get_weekly_menu(2000)
+
+    benchmark.extra_info["latencia"] = LATENCIA
+    resultado = benchmark.pedantic(menu, rounds=3 if max_workers == 1 else 10)
+    assert len(resultado) == 21
+
+
+def test_get_weekly_menu_local(benchmark):
+    planner = LocalMealPlanner(load_recipe_corpus(), seed=0)
+    resultado = benchmark(planner.get_weekly_menu, 2000)
+    assert len(resultado) == 21
+
+
+def test_optimizar_plan_10k_recetas(benchmark):
+    rng = np.random.default_rng(0)
+    macros = rng.uniform([5, 5, 2], [60, 120, 50], size=(10_000, 3))
+    pool = RecipePool(np.arange(10_000) + 1, np.column_stack([macros @ np.array([4.0, 4.0, 9.0]), macros]))
+    elegidas = rng.choice(len(pool), (7, 3), replace=False)
+    plan = {f"dia {i}": pool.ids[fila].tolist() for i, fila in enumerate(elegidas)}
+    optimizer = WeeklyPlanOptimizer(pool)
+    resultado = benchmark(optimizer.optimize, plan, daily_targets(2300, "Build Muscle", body_weight=80))
+    assert len(resultado) == 7
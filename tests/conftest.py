@@ -0,0 +1,9 @@
+import pytest
+
+from tests.spoonacular_stub import SpoonacularStub
+
+
+@pytest.fixture
+def spoonacular_stub():
+    with SpoonacularStub() as stub:
+        yield stub
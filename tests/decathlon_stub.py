@@ -0,0 +1,118 @@
+"""
+Servidor local que imita el buscador del Decathlon (POST /es/ajax/nfs/browse).
+
+Sirve en páginas de 40 productos la lista de items que se le pase, con el mismo
+formato que la respuesta grabada en tests/fixtures/decathlon_pagina.json. Los
+items se pueden cambiar entre ejecuciones para simular cambios de precio,
+productos nuevos o retirados.
+"""
+
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+
+import pandas as pd
+
+from Decathlon.ingesta import PRODUCTOS_POR_PAGINA
+from tests.spoonacular_stub import _StubServer
+
+FIXTURE_PAGINA = os.path.join(os.path.dirname(__file__), "fixtures", "decathlon_pagina.json")
+RUTA_CATALOGO = "/es/ajax/nfs/browse"
+
+
+def cargar_fixture() -> dict:
+    with open(FIXTURE_PAGINA, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def item_desde_fila(fila: dict) -> dict:
+    """Item del buscador con los datos de una fila de productos_paginas.csv."""
+    def valor(v):
+        return None if pd.isna(v) else v
+
+    return {
+        "brand": {"label": fila["Marca"]},
+        "webLabel": valor(fila["Etiqueta Web"]),
+        "natureLabel": fila["Tipo Producto"],
+        "models": [{
+            "price": valor(fila["Precio"]),
+            "previousPrice": valor(fila["Precio Previo"]),
+            "currency": "EUR",
+            "discountRate": valor(fila["Descuento Aplicado (en %)"]),
+            "url": fila["Product URL"],
+            "image": {"url": fila["Image URL"]},
+        }],
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        stub = self.server.stub
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if stub.latency:
+            time.sleep(stub.latency)
+        if self.path != RUTA_CATALOGO:
+            self._send_json(404, {"message": "Not found"})
+            return
+        inicio = int(payload.get("from", 0))
+        pagina = inicio // PRODUCTOS_POR_PAGINA
+        with stub._lock:
+            stub.paginas.append(pagina)
+        if pagina in stub.paginas_fallidas:
+            self._send_json(500, {"message": "error"})
+            return
+        items = stub.items
+        total = max(1, -(-len(items) // PRODUCTOS_POR_PAGINA))
+        self._send_json(200, {
+            "pager": {"total": total},
+            "blocks": {"items": items[inicio:inicio + PRODUCTOS_POR_PAGINA]},
+        })
+
+
+class DecathlonStub:
+    """
+    Uso:
+        with DecathlonStub(items) as stub:
+            DescargaCatalogo(stub.url)
+    """
+
+    def __init__(self, items: list[dict] = None, latency: float = 0.0, paginas_fallidas: set[int] = None):
+        self.items = list(items if items is not None else cargar_fixture()["blocks"]["items"])
+        self.latency = latency
+        self.paginas_fallidas = set(paginas_fallidas or ())
+        self.paginas: list[int] = []
+        self._lock = threading.Lock()
+        self._server = _StubServer(("127.0.0.1", 0), _Handler)
+        self._server.stub = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{RUTA_CATALOGO}"
+
+    def __enter__(self) -> "DecathlonStub":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
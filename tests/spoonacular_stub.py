@@ -0,0 +1,262 @@
+"""
+Servidor local que imita los endpoints de Spoonacular que usa MealPlanner.
+
+Las respuestas se generan de forma determinista a partir del ID de la receta,
+así que los tests y benchmarks no necesitan red ni API key. La latencia de cada
+respuesta se puede configurar para simular el coste real de la API, y también
+se pueden inyectar fallos: 429 cada cierto número de peticiones, 503 en las
+primeras peticiones y una cuota máxima por API key (402 al agotarla). Las
+respuestas de una ruta se pueden retener con hold(ruta) hasta que el test las
+suelte, para que las peticiones concurrentes lleguen todas antes de contestar.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+RECIPE_PATH = re.compile(
+    r"^/recipes/(?P<meal_id>\d+)/(?P<endpoint>information|analyzedInstructions|nutritionWidget\.json)$"
+)
+
+
+def recipe_information(meal_id: int) -> dict:
+    return {
+        "id": meal_id,
+        "title": f"Receta {meal_id}",
+        "extendedIngredients": [
+            {"original": f"{meal_id % 5 + 1} huevos"},
+            {"original": f"{meal_id % 300 + 50} g de arroz"},
+        ],
+    }
+
+
+def recipe_instructions(meal_id: int) -> list:
+    return [
+        {
+            "name": "",
+            "steps": [
+                {"number": 1, "step": f"Preparar la receta {meal_id}."},
+                {"number": 2, "step": "Servir."},
+            ],
+        }
+    ]
+
+
+def recipe_nutrition(meal_id: int) -> dict:
+    return {
+        "calories": str(300 + meal_id % 400),
+        "carbs": f"{20 + meal_id % 60}g",
+        "fat": f"{5 + meal_id % 30}g",
+        "protein": f"{10 + meal_id % 40}g",
+    }
+
+
+def recipe_bulk(meal_id: int) -> dict:
+    """Receta tal y como la devuelve informationBulk con includeNutrition=true."""
+    widget = recipe_nutrition(meal_id)
+    nutrients = [
+        ("Calories", widget["calories"], "kcal"),
+        ("Fat", widget["fat"][:-1], "g"),
+        ("Carbohydrates", widget["carbs"][:-1], "g"),
+        ("Protein", widget["protein"][:-1], "g"),
+    ]
+    return {
+        **recipe_information(meal_id),
+        "analyzedInstructions": recipe_instructions(meal_id),
+        "nutrition": {
+            "nutrients": [
+                {"name": name, "amount": float(amount), "unit": unit}
+                for name, amount, unit in nutrients
+            ]
+        },
+    }
+
+
+def weekly_plan(target_calories: int) -> dict:
+    # Los IDs dependen de las calorías para que distintos objetivos den planes distintos
+    base = int(target_calories) * 10
+    return {
+        "week": {
+            day: {
+                "meals": [
+                    {"id": base + day_idx * 3 + slot, "title": f"Receta {base + day_idx * 3 + slot}"}
+                    for slot in range(3)
+                ]
+            }
+            for day_idx, day in enumerate(DAYS)
+        }
+    }
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Sin esto, con keep-alive cada respuesta espera al ACK retardado del cliente
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload, headers: dict = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in {**self.extra_headers, **(headers or {})}.items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        fault, self.extra_headers = stub._enter(url.path, query.get("apiKey"))
+        try:
+            held = stub.holds.get(url.path)
+            if held is not None:
+                held.wait(timeout=30)
+            if stub.latency:
+                time.sleep(stub.latency)
+            if fault is not None:
+                status, headers = fault
+                self._send_json(status, {"status": "failure", "code": status}, headers)
+                return
+            if url.path == "/mealplanner/generate":
+                self._send_json(200, weekly_plan(int(query.get("targetCalories", 2000))))
+                return
+            if url.path == "/recipes/informationBulk":
+                ids = [int(i) for i in query.get("ids", "").split(",") if i]
+                self._send_json(
+                    200, [recipe_bulk(i) for i in ids if i not in stub.failing_ids]
+                )
+                return
+            match = RECIPE_PATH.match(url.path)
+            if match is None:
+                self._send_json(404, {"status": "failure", "message": "Not found"})
+                return
+            meal_id = int(match["meal_id"])
+            if meal_id in stub.failing_ids:
+                self._send_json(404, {"status": "failure", "message": "Recipe not found"})
+                return
+            endpoint = match["endpoint"]
+            if endpoint == "information":
+                self._send_json(200, recipe_information(meal_id))
+            elif endpoint == "analyzedInstructions":
+                self._send_json(200, recipe_instructions(meal_id))
+            else:
+                self._send_json(200, recipe_nutrition(meal_id))
+        finally:
+            stub._exit()
+
+
+class _StubServer(ThreadingHTTPServer):
+    # La cola por defecto (5) descarta conexiones cuando hay muchos clientes a la vez
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class SpoonacularStub:
+    """
+    Arranca el servidor en un hilo en segundo plano.
+
+    Uso:
+        with SpoonacularStub(latency=0.05) as stub:
+            MealPlanner(api_key="test", base_url=stub.base_url)
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failing_ids: set[int] = None,
+        rate_limit_every: int = 0,
+        retry_after: float = None,
+        server_errors: int = 0,
+        quota_per_key: int = None,
+    ):
+        self.latency = latency
+        self.failing_ids = set(failing_ids or ())
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.server_errors = server_errors
+        self.quota_per_key = quota_per_key
+        self.requests: list[str] = []
+        self.keys: list[str] = []
+        self.used_quota: dict[str, int] = {}
+        self.faults: dict[int, int] = {}
+        self.max_in_flight = 0
+        self.holds: dict[str, threading.Event] = {}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._server = _StubServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    def hold(self, path: str) -> threading.Event:
+        """Retiene las respuestas de path hasta que se llame a set() del evento devuelto."""
+        return self.holds.setdefault(path, threading.Event())
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _enter(self, path: str, api_key: str) -> tuple[tuple[int, dict] | None, dict]:
+        """Registra la petición y decide si hay que responder con un fallo."""
+        with self._lock:
+            self.requests.append(path)
+            self.keys.append(api_key)
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            number = len(self.requests)
+
+            fault = None
+            if number <= self.server_errors:
+                fault = (503, {})
+            elif self.rate_limit_every and number % self.rate_limit_every == 0:
+                headers = {} if self.retry_after is None else {"Retry-After": self.retry_after}
+                fault = (429, headers)
+
+            headers = {}
+            if self.quota_per_key is not None:
+                used = self.used_quota.get(api_key, 0)
+                if used >= self.quota_per_key:
+                    fault = (402, {})
+                elif fault is None:
+                    self.used_quota[api_key] = used + 1
+                headers["X-API-Quota-Left"] = max(0, self.quota_per_key - self.used_quota.get(api_key, 0))
+            if fault is not None:
+                self.faults[fault[0]] = self.faults.get(fault[0], 0) + 1
+            return fault, headers
+
+    def _exit(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests.clear()
+            self.keys.clear()
+            self.faults.clear()
+            self.max_in_flight = 0
+        self.holds: dict[str, threading.Event] = {}
+
+    def start(self) -> "SpoonacularStub":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "SpoonacularStub":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
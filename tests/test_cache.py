@@ -0,0 +1,97 @@
+import time
+
+from Recetas.cache import RecipeCache
+from Recetas.mealplanner import MealPlanner
+
+
+def test_get_set_y_contadores():
+    cache = RecipeCache()
+    assert cache.get("information:1") is None
+    cache.set("information:1", {"title": "Ensalada"})
+    assert cache.get("information:1") == {"title": "Ensalada"}
+    assert cache.stats["hits"] == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["memory_hits"] == 1
+
+
+def test_ttl_caduca_entradas():
+    cache = RecipeCache(ttl=0.05)
+    cache.set("information:1", {"title": "Ensalada"})
+    time.sleep(0.1)
+    assert cache.get("information:1") is None
+    assert len(cache) == 0
+
+
+def test_lru_en_memoria_recurre_al_disco(tmp_path):
+    cache = RecipeCache(str(tmp_path / "cache.sqlite"), max_memory_items=2)
+    for i in range(3):
+        cache.set(f"information:{i}", i)
+    assert cache.stats["memory_items"] == 2
+    assert cache.get("information:0") == 0
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_limite_de_disco_descarta_las_menos_usadas():
+    cache = RecipeCache(max_disk_items=3, max_memory_items=0)
+    for i in range(3):
+        cache.set(f"information:{i}", i)
+    cache.get("information:0")
+    cache.set("information:3", 3)
+    assert len(cache) == 3
+    assert cache.disk_evictions == 1
+    # Sin memoria, cada escritura y cada lectura del disco sale del LRU en
+    # memoria nada más entrar
+    assert cache.memory_evictions == 5
+    assert cache.evictions == 6
+    assert cache.get("information:1") is None
+    assert cache.get("information:0") == 0
+
+
+def test_aciertos_en_memoria_cuentan_para_el_disco():
+    cache = RecipeCache(max_disk_items=3, max_memory_items=2)
+    cache.set("information:0", 0)
+    cache.set("information:1", 1)
+    # information:0 se lee siempre de memoria: en disco sigue siendo la más antigua
+    for _ in range(5):
+        assert cache.get("information:0") == 0
+    cache.set("information:2", 2)
+    cache.set("information:3", 3)
+    assert cache.stats["memory_hits"] == 5
+    assert cache.get("information:1") is None
+    assert cache.get("information:0") == 0
+
+
+def test_len_lleva_la_cuenta_de_filas(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = RecipeCache(path)
+    cache.set("information:1", 1)
+    cache.set("information:1", 1)
+    cache.set("information:2", 2, ttl=-1)
+    assert len(cache) == 2
+    assert cache.get("information:2") is None
+    assert len(cache) == 1
+    cache.close()
+    assert len(RecipeCache(path)) == 1
+    cache = RecipeCache(path)
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_persistencia_entre_instancias(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    RecipeCache(path).set("information:1", {"title": "Ensalada"})
+    assert RecipeCache(path).get("information:1") == {"title": "Ensalada"}
+
+
+def test_mealplanner_reutiliza_recetas_y_planes(spoonacular_stub):
+    cache = RecipeCache()
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, cache=cache)
+    df_first = planner.get_weekly_menu(2010)
+    assert len(spoonacular_stub.requests) == 1 + 21 * 3
+
+    spoonacular_stub.reset()
+    other = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, cache=cache)
+    # 1990 cae en el mismo tramo de 100 calorías que 2010
+    df_second = other.get_weekly_menu(1990)
+    assert spoonacular_stub.requests == []
+    assert df_second.equals(df_first)
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from hypothesis import given, settings
+from hypothesis import strategies as st
+
+from App.perfil import (
+    FACTOR_ACTIVIDAD_NUM,
+    calcular_calorias,
+    calcular_calorias_df,
+    calcular_calorias_vectorizado,
+)
+
+perfiles = st.lists(
+    st.tuples(
+        st.sampled_from(['Lose Fat', 'Build Muscle', 'General Fitness', 'Increase Strength']),
+        st.floats(min_value=0, max_value=300, allow_nan=False),
+        st.one_of(st.integers(min_value=0, max_value=250), st.floats(min_value=0, max_value=250)),
+        st.integers(min_value=0, max_value=100),
+        st.sampled_from(['Hombre', 'Mujer', 'hombre', 'MUJER']),
+        st.sampled_from(list(FACTOR_ACTIVIDAD_NUM)),
+    ),
+    min_size=1,
+    max_size=50,
+)
+
+
+@settings(max_examples=200)
+@given(perfiles)
+def test_vectorizado_igual_que_escalar(perfiles):
+    esperado = [calcular_calorias(*perfil) for perfil in perfiles]
+    resultado = calcular_calorias_vectorizado(*map(list, zip(*perfiles)))
+    assert resultado.tolist() == esperado
+
+
+@given(perfiles)
+def test_df_igual_que_escalar(perfiles):
+    df = pd.DataFrame(
+        perfiles, columns=['objetivo', 'peso', 'altura', 'edad', 'sexo', 'factor_actividad']
+    )
+    df['sexo'] = df['sexo'].astype('category')
+    esperado = [calcular_calorias(*perfil) for perfil in perfiles]
+    assert calcular_calorias_df(df).tolist() == esperado
+
+
+def test_perfiles_no_validos_dan_nulo():
+    df = pd.DataFrame({
+        'objetivo': ['Lose Fat', 'Lose Fat', None],
+        'peso': [70, 70, 70],
+        'altura': [175, 175, 175],
+        'edad': [30, 30, 30],
+        'sexo': ['Otro', 'Hombre', 'Hombre'],
+        'factor_actividad': ['Sedentario', 'Muy activo', 'Sedentario'],
+    })
+    calorias = calcular_calorias_df(df)
+    assert calorias.isna().tolist() == [True, True, False]
+    assert calorias[2] == calcular_calorias(None, 70, 175, 30, 'Hombre', 'Sedentario')
+
+
+def test_columnas_con_otros_nombres():
+    df = pd.DataFrame({
+        'goal': ['Build Muscle'], 'kg': [80.5], 'cm': [180], 'years': [25],
+        'sex': ['Hombre'], 'activity': ['Intensa (6-7 veces por semana)'],
+    })
+    columnas = {
+        'objetivo': 'goal', 'peso': 'kg', 'altura': 'cm', 'edad': 'years',
+        'genero': 'sex', 'factor_actividad': 'activity',
+    }
+    esperado = calcular_calorias('Build Muscle', 80.5, 180, 25, 'Hombre', 'Intensa (6-7 veces por semana)')
+    assert calcular_calorias_df(df, columnas).tolist() == [esperado]
+
+
+def test_un_millon_de_perfiles():
+    n = 1_000_000
+    rng = np.random.default_rng(0)
+    calorias = calcular_calorias_vectorizado(
+        rng.choice(['Lose Fat', 'Build Muscle'], n),
+        rng.uniform(40, 150, n),
+        rng.integers(140, 210, n),
+        rng.integers(15, 90, n),
+        rng.choice(['Hombre', 'Mujer'], n),
+        rng.choice(list(FACTOR_ACTIVIDAD_NUM), n),
+    )
+    assert calorias.shape == (n,)
+    assert not np.isnan(calorias).any()
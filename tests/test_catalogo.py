@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from Decathlon.catalogo import cargar_productos
+from Rutinas.catalogo import cargar_rutinas
+from Utilidades.instantaneas import DIRECTORIO_SNAPSHOTS
+
+
+@pytest.fixture
+def rutinas_csv(tmp_path):
+    ruta = tmp_path / "rutinas.csv"
+    shutil.copy("App/rutinas.csv", ruta)
+    return str(ruta)
+
+
+def test_rutinas_tipadas(rutinas_csv):
+    df = cargar_rutinas(rutinas_csv)
+    assert len(df) == 534
+    assert "Unnamed: 0" not in df.columns
+    assert df["content"].iloc[0][0] == ["Incline Bench Press", "3", "8-10"]
+    for columna in ["Main Goal", "Training Level", "Target Gender"]:
+        assert isinstance(df[columna].dtype, pd.CategoricalDtype)
+    assert df["Days Per Week"].dtype == "int8"
+
+
+def test_snapshot_evita_leer_el_csv(rutinas_csv, monkeypatch):
+    primera = cargar_rutinas(rutinas_csv)
+    assert len(os.listdir(os.path.join(os.path.dirname(rutinas_csv), DIRECTORIO_SNAPSHOTS))) == 1
+
+    def sin_csv(*args, **kwargs):
+        raise AssertionError("No se debería leer el CSV")
+
+    monkeypatch.setattr(pd, "read_csv", sin_csv)
+    segunda = cargar_rutinas(rutinas_csv)
+    pd.testing.assert_frame_equal(primera, segunda)
+
+
+def test_snapshot_se_regenera_si_cambia_el_csv(rutinas_csv):
+    cargar_rutinas(rutinas_csv)
+    df = pd.read_csv(rutinas_csv).head(10)
+    df.to_csv(rutinas_csv, index=False)
+    stat = os.stat(rutinas_csv)
+    os.utime(rutinas_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert len(cargar_rutinas(rutinas_csv)) == 10
+    snapshots = os.listdir(os.path.join(os.path.dirname(rutinas_csv), DIRECTORIO_SNAPSHOTS))
+    assert len(snapshots) == 1
+
+
+def test_productos_tipados(tmp_path):
+    ruta = tmp_path / "productos_paginas.csv"
+    shutil.copy("App/productos_paginas.csv", ruta)
+    df = cargar_productos(str(ruta))
+    assert isinstance(df["Tipo Producto"].dtype, pd.CategoricalDtype)
+    assert df["Precio"].dtype == "float64"
@@ -0,0 +1,87 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from Rutinas.catalogo import cargar_rutinas, preparar_rutinas
+from Rutinas.ejercicios import IndiceEjercicios, cargar_ejercicios, normalizar_ejercicios
+from Utilidades.instantaneas import DIRECTORIO_SNAPSHOTS
+
+
+@pytest.fixture(scope="module")
+def rutinas():
+    return preparar_rutinas(pd.read_csv("App/rutinas.csv"))
+
+
+@pytest.fixture(scope="module")
+def ejercicios(rutinas):
+    return normalizar_ejercicios(rutinas)
+
+
+def test_formato_largo(ejercicios, rutinas):
+    primera = ejercicios[ejercicios["fila"] == 0]
+    assert primera["exercise"].tolist()[:2] == ["Incline Bench Press", "One Arm Dumbbell Row"]
+    assert primera["orden"].tolist() == list(range(6))
+    assert (primera["day"] == "Upper A").all()
+    assert rutinas["Workout Title"].cat.categories[primera["workout_id"].iloc[0]] == rutinas["Workout Title"].iloc[0]
+    assert isinstance(ejercicios["exercise"].dtype, pd.CategoricalDtype)
+    # Un ejercicio por cada entrada no vacía de 'content'
+    assert len(ejercicios) == sum(len([e for e in c if e]) for c in rutinas["content"])
+
+
+def test_entradas_irregulares():
+    rutinas = pd.DataFrame({
+        "title": ["Day 1"],
+        "content": [[
+            ["1. Incline Barbell Bench Press", "2x8-10", "3x10", "2-3 forced reps"],
+            ["Push Ups", "10"],
+            ["*Machine or Band"],
+            [],
+        ]],
+        "Workout Title": pd.Categorical(["Rutina"]),
+    })
+    df = normalizar_ejercicios(rutinas)
+    assert df["exercise"].tolist() == ["Incline Barbell Bench Press", "Push Ups", "*Machine or Band"]
+    assert df["sets"].tolist() == ["2x8-10", pd.NA, pd.NA]
+    assert df["reps"].tolist() == ["3x10", "10", pd.NA]
+    assert df["notes"].tolist() == ["2-3 forced reps", pd.NA, pd.NA]
+
+
+def test_rutinas_con_ejercicio_y_dias(ejercicios, rutinas):
+    indice = IndiceEjercicios(ejercicios, rutinas)
+    titulos = indice.rutinas_con("squats", max_dias=4)
+    assert titulos
+    esperado = set()
+    for fila, contenido in zip(rutinas.index, rutinas["content"]):
+        # La numeración ('1. Squats', 'G2. Squats') no forma parte del nombre
+        if any(e and e[0].split(". ", 1)[-1] == "Squats" for e in contenido):
+            titulo = rutinas.loc[fila, "Workout Title"]
+            if rutinas.loc[rutinas["Workout Title"] == titulo, "Days Per Week"].max() <= 4:
+                esperado.add(titulo)
+    assert set(titulos) == esperado
+    assert len(indice.rutinas_con("squat", exacto=False)) > len(indice.rutinas_con("squats"))
+
+
+def test_de_filas_respeta_el_orden(ejercicios, rutinas):
+    indice = IndiceEjercicios(ejercicios, rutinas)
+    df = indice.de_filas([1, 0])
+    assert df["fila"].tolist() == [1] * 6 + [0] * 6
+    assert df["exercise"].iloc[0] == "Squats"
+
+
+def test_snapshot_parquet(tmp_path, monkeypatch):
+    ruta = tmp_path / "rutinas.csv"
+    shutil.copy("App/rutinas.csv", ruta)
+    primera = cargar_ejercicios(str(ruta))
+    cargar_rutinas(str(ruta))
+    snapshots = sorted(os.listdir(tmp_path / DIRECTORIO_SNAPSHOTS))
+    assert len(snapshots) == 2
+    assert snapshots[0].endswith(".parquet")
+
+    def sin_csv(*args, **kwargs):
+        raise AssertionError("No se debería leer el CSV")
+
+    monkeypatch.setattr(pd, "read_csv", sin_csv)
+    segunda = cargar_ejercicios(str(ruta))
+    pd.testing.assert_frame_equal(primera, segunda)
@@ -24,4 +24,33 @@ def test_filter_name_and_ingredients():
     }
     expected = {"Name": "Ensalada", "Ingredients": "Lechuga, Tomate, Aceite"}
     result = Filtering.filter_name_and_ingredients(recipe_details)
-    assert result == expected
\ No newline at end of file
+    assert result == expected
+
+def test_filter_bulk_recipe():
+    # Datos de prueba con el formato de informationBulk
+    recipe = {
+        "id": 7,
+        "title": "Ensalada",
+        "extendedIngredients": [{"original": "Lechuga"}, {"original": "Tomate"}],
+        "analyzedInstructions": [{"steps": [{"step": "Lavar."}, {"step": "Mezclar."}]}],
+        "nutrition": {
+            "nutrients": [
+                {"name": "Calories", "amount": 316.4, "unit": "kcal"},
+                {"name": "Fat", "amount": 12.2, "unit": "g"},
+                {"name": "Carbohydrates", "amount": 48.6, "unit": "g"},
+                {"name": "Protein", "amount": 3.0, "unit": "g"},
+            ]
+        },
+    }
+    expected = {
+        7: {
+            "Name": "Ensalada",
+            "Ingredients": "Lechuga, Tomate",
+            "Instructions": "1. Lavar. 2. Mezclar.",
+            "Calories": "316",
+            "Carbs": "49g",
+            "Fat": "12g",
+            "Protein": "3g",
+        }
+    }
+    assert Filtering.filter_bulk_recipes([recipe]) == expected
@@ -0,0 +1,91 @@
+import json
+import shutil
+
+import pandas as pd
+import pytest
+
+from App.generar_planes import generar
+from App.perfil import calcular_calorias
+from Recetas.local_planner import LocalMealPlanner, load_recipe_corpus
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+
+
+@pytest.fixture
+def perfiles(tmp_path):
+    filas = []
+    for i in range(40):
+        filas.append({
+            'id': i,
+            'peso': 50 + i,
+            'altura': 150 + i,
+            'edad': 20 + i % 30,
+            'sexo': 'Hombre' if i % 2 else 'Mujer',
+            'factor_actividad': 'Sedentario' if i % 3 else 'Intensa (6-7 veces por semana)',
+            'objetivo': ['Lose Fat', 'Build Muscle', 'General Fitness'][i % 3],
+            'nivel': ['Beginner', 'Intermediate', 'Advanced'][i % 3],
+        })
+    filas.append({**filas[0], 'id': 40, 'sexo': 'Otro'})
+    ruta = tmp_path / 'perfiles.csv'
+    pd.DataFrame(filas).to_csv(ruta, index=False)
+    return ruta
+
+
+@pytest.fixture
+def ruta_rutinas(tmp_path):
+    ruta = tmp_path / 'rutinas.csv'
+    shutil.copy('App/rutinas.csv', ruta)
+    return str(ruta)
+
+
+def test_generar_jsonl(perfiles, ruta_rutinas, tmp_path):
+    salida = tmp_path / 'resultados.jsonl'
+    salida_planes = tmp_path / 'planes.jsonl'
+    resumen = generar(
+        str(perfiles), str(salida), str(salida_planes),
+        procesos=2, tamano_lote=7, ruta_rutinas=ruta_rutinas,
+    )
+    registros = [json.loads(linea) for linea in salida.read_text().splitlines()]
+    assert resumen['perfiles'] == 41
+    assert [r['id'] for r in registros] == list(range(41))
+
+    for r in registros[:40]:
+        assert r['calorias'] == calcular_calorias(
+            r['objetivo'], r['peso'], r['altura'], r['edad'], r['sexo'], r['factor_actividad']
+        )
+        assert r['tramo_calorias'] % 100 == 0
+        assert r['tramo_peso'] % 5 == 0
+        assert r['rutina']
+    assert registros[40]['calorias'] is None
+    assert registros[40]['rutina'] is None
+
+    planes = [json.loads(linea) for linea in salida_planes.read_text().splitlines()]
+    grupos = [(p['tramo_calorias'], p['objetivo'], p['tramo_peso']) for p in planes]
+    assert len(grupos) == len(set(grupos)) == resumen['planes']
+    assert set(grupos) == {(r['tramo_calorias'], r['objetivo'], r['tramo_peso']) for r in registros[:40]}
+    assert resumen['tramos'] == len({r['tramo_calorias'] for r in registros[:40]})
+    assert all(len(p['plan']) == 21 for p in planes)
+
+
+def test_planes_ajustados_al_objetivo_y_al_peso(perfiles, ruta_rutinas, tmp_path):
+    """El menú de cada grupo es el que da LocalMealPlanner con el objetivo y el peso, como en la página."""
+    salida_planes = tmp_path / 'planes.jsonl'
+    generar(
+        str(perfiles), str(tmp_path / 'resultados.jsonl'), str(salida_planes),
+        procesos=1, tamano_lote=50, ruta_rutinas=ruta_rutinas,
+    )
+    recetario = load_recipe_corpus()
+    optimizer = WeeklyPlanOptimizer(RecipePool.from_corpus(recetario))
+    for p in [json.loads(linea) for linea in salida_planes.read_text().splitlines()][:3]:
+        esperado = LocalMealPlanner(
+            recetario, seed=p['tramo_calorias'], goal=p['objetivo'],
+            body_weight=p['tramo_peso'], optimizer=optimizer,
+        ).get_weekly_menu(p['tramo_calorias'])
+        assert [fila['Name'] for fila in p['plan']] == esperado['Name'].tolist()
+
+
+def test_generar_parquet(perfiles, ruta_rutinas, tmp_path):
+    salida = tmp_path / 'resultados.parquet'
+    generar(str(perfiles), str(salida), procesos=1, tamano_lote=10, ruta_rutinas=ruta_rutinas)
+    df = pd.read_parquet(salida)
+    assert len(df) == 41
+    assert df['calorias'].isna().sum() == 1
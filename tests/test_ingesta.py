@@ -0,0 +1,93 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+import requests
+
+from Decathlon.catalogo import cargar_productos
+from Decathlon.ingesta import (
+    AlmacenCatalogo,
+    DescargaCatalogo,
+    actualizar,
+    extraer_productos,
+)
+from tests.decathlon_stub import DecathlonStub, cargar_fixture, item_desde_fila
+
+
+@pytest.fixture
+def catalogo_csv(tmp_path):
+    ruta = tmp_path / "productos_paginas.csv"
+    shutil.copy("App/productos_paginas.csv", ruta)
+    return str(ruta)
+
+
+@pytest.fixture(scope="module")
+def items():
+    productos = pd.read_csv("App/productos_paginas.csv").head(200)
+    return [item_desde_fila(fila) for fila in productos.to_dict(orient="records")]
+
+
+def test_extraer_productos_de_la_respuesta_grabada():
+    productos = extraer_productos(cargar_fixture())
+    esperado = pd.read_csv("App/productos_paginas.csv").head(3)
+    assert [p["Product URL"] for p in productos] == esperado["Product URL"].tolist()
+    assert productos[0]["Precio"] == 2.2
+    assert productos[0]["Descuento Aplicado (en %)"] == 94
+
+
+def test_sin_cambios_no_crea_version(tmp_path, items):
+    salida = str(tmp_path / "productos.csv")
+    pd.read_csv("App/productos_paginas.csv").head(200).to_csv(salida, index=False)
+    mtime = os.stat(salida).st_mtime_ns
+
+    with DecathlonStub(items) as stub:
+        resumen = actualizar(salida, str(tmp_path / "almacen"), DescargaCatalogo(stub.url, hilos=4))
+
+    assert sorted(stub.paginas) == list(range(5))
+    assert resumen["productos"] == 200
+    assert resumen["nuevos"] == resumen["modificados"] == resumen["eliminados"] == 0
+    assert resumen["version"] == 0
+    assert resumen["bytes"] > 0
+    assert resumen["filas_por_segundo"] > 0
+    assert os.stat(salida).st_mtime_ns == mtime
+
+
+def test_solo_se_guardan_los_cambios(tmp_path, items):
+    salida = str(tmp_path / "productos.csv")
+    directorio = str(tmp_path / "almacen")
+    with DecathlonStub(items) as stub:
+        primera = actualizar(salida, directorio, DescargaCatalogo(stub.url))
+        assert primera["nuevos"] == 200
+
+        # Baja un precio, se retira un producto y aparece otro
+        stub.items[5] = {**stub.items[5], "models": [{**stub.items[5]["models"][0], "price": 1.0}]}
+        retirado = stub.items.pop(10)
+        nuevo = {**stub.items[0], "models": [{**stub.items[0]["models"][0], "url": "p/nuevo"}]}
+        stub.items.append(nuevo)
+        segunda = actualizar(salida, directorio, DescargaCatalogo(stub.url))
+
+    assert (segunda["nuevos"], segunda["modificados"], segunda["eliminados"]) == (1, 1, 1)
+    assert segunda["version"] == 2
+    almacen = AlmacenCatalogo(directorio)
+    cambios = almacen.cambios(2).set_index("Product URL")["estado"]
+    assert cambios.to_dict() == {
+        "p/nuevo": "nuevo",
+        items[5]["models"][0]["url"]: "modificado",
+        retirado["models"][0]["url"]: "eliminado",
+    }
+    assert len(almacen.actual()) == 200
+
+    # La app lee el catálogo nuevo
+    df = cargar_productos(salida)
+    assert df.loc[df["Product URL"] == items[5]["models"][0]["url"], "Precio"].item() == 1.0
+    assert not os.path.exists(salida + f".{os.getpid()}.tmp")
+
+
+def test_pagina_fallida_no_publica_nada(catalogo_csv, tmp_path, items):
+    mtime = os.stat(catalogo_csv).st_mtime_ns
+    with DecathlonStub(items, paginas_fallidas={3}) as stub:
+        with pytest.raises(requests.HTTPError):
+            actualizar(catalogo_csv, str(tmp_path / "almacen"), DescargaCatalogo(stub.url))
+    assert os.stat(catalogo_csv).st_mtime_ns == mtime
+    assert AlmacenCatalogo(str(tmp_path / "almacen")).version() == 0
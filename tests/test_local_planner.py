@@ -0,0 +1,84 @@
+import os
+import shutil
+import time
+
+import pandas as pd
+import pytest
+
+from Recetas.local_planner import DATA_DIR, DAYS, LocalMealPlanner, cargar_recetario, load_recipe_corpus
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return load_recipe_corpus()
+
+
+def daily_calories(df: pd.DataFrame) -> pd.Series:
+    day = df["Meal"].str.split().str[0]
+    return df["Calories"].astype(int).groupby(day, sort=False).sum()
+
+
+def test_corpus_une_nutricion_e_ingredientes(corpus):
+    assert len(corpus) == 1090
+    assert corpus["id"].is_unique
+    assert (corpus["ingredients"] != "").sum() == 215
+    assert corpus.loc[corpus["id"] == 149425, "steps"].iloc[0].startswith("1. Pre-heat")
+
+
+def test_weekly_menu_mismo_formato_que_la_api(corpus):
+    df = LocalMealPlanner(corpus, seed=0).get_weekly_menu(2000)
+    assert list(df.columns) == [
+        "Meal", "Name", "Ingredients", "Instructions", "Calories", "Carbs", "Fat", "Protein"
+    ]
+    assert len(df) == 21
+    assert df["Meal"].iloc[0] == "monday breakfast"
+    assert df["Meal"].iloc[-1] == "sunday dinner"
+    assert df["Protein"].str.endswith("g").all()
+
+
+@pytest.mark.parametrize("target", [1500, 2000, 2800])
+def test_weekly_menu_ajusta_las_calorias(corpus, target):
+    df = LocalMealPlanner(corpus, seed=0).get_weekly_menu(target)
+    assert (abs(daily_calories(df) - target) <= target * 0.02).all()
+    assert df["Name"].is_unique
+
+
+def test_weekly_menu_determinista_con_semilla(corpus):
+    first = LocalMealPlanner(corpus, seed=3).get_weekly_menu(2000)
+    second = LocalMealPlanner(corpus, seed=3).get_weekly_menu(2000)
+    assert first.equals(second)
+
+
+def test_macro_ratios_acercan_el_reparto(corpus):
+    ratios = {"Protein": 0.35, "Carbs": 0.35, "Fat": 0.3}
+
+    def protein_share(df):
+        protein = df["Protein"].str.rstrip("g").astype(float) * 4
+        return protein.sum() / df["Calories"].astype(float).sum()
+
+    plain = LocalMealPlanner(corpus, seed=0).get_weekly_menu(2200)
+    balanced = LocalMealPlanner(corpus, macro_ratios=ratios, seed=0).get_weekly_menu(2200)
+    assert abs(protein_share(balanced) - 0.35) < abs(protein_share(plain) - 0.35)
+
+
+def test_iter_weekly_menu_igual_que_get_weekly_menu(corpus):
+    df = LocalMealPlanner(corpus, seed=3).get_weekly_menu(2000)
+    days = list(LocalMealPlanner(corpus, seed=3).iter_weekly_menu(2000))
+    assert [day for day, _ in days] == DAYS
+    assert pd.concat([df_day for _, df_day in days]).equals(df)
+
+
+def test_recetario_desde_instantanea(corpus, tmp_path):
+    for nombre in ["recipes_nutrition.csv", "recipes_completed.csv"]:
+        shutil.copy(os.path.join(DATA_DIR, nombre), tmp_path / nombre)
+    pd.testing.assert_frame_equal(cargar_recetario(str(tmp_path)), corpus)
+    pd.testing.assert_frame_equal(cargar_recetario(str(tmp_path)), corpus)
+
+    # Cambiar solo recipes_completed.csv también regenera la instantánea
+    completed = tmp_path / "recipes_completed.csv"
+    df = pd.read_csv(completed)
+    df.loc[0, "ingredients"] = "agua"
+    df.to_csv(completed, index=False)
+    os.utime(completed, ns=(time.time_ns(), time.time_ns() + 10**9))
+    recetario = cargar_recetario(str(tmp_path))
+    assert recetario.loc[recetario["id"] == df.loc[0, "id"], "ingredients"].item() == "agua"
@@ -1 +1,122 @@
-import pytest
\ No newline at end of file
+import time
+
+import pandas as pd
+import pytest
+
+from Recetas.fetcher import RecipeFetcher
+from Recetas.mealplanner import MealPlanner
+from tests.spoonacular_stub import SpoonacularStub
+
+
+def test_fetch_all_agrupa_por_id(spoonacular_stub):
+    fetcher = RecipeFetcher("test", spoonacular_stub.base_url, max_workers=4)
+    result = fetcher.fetch_all([10, 11, 10])
+    assert list(result) == [10, 11]
+    assert result[10]["information"]["title"] == "Receta 10"
+    assert result[11]["analyzedInstructions"][0]["steps"][0]["number"] == 1
+    assert result[11]["nutritionWidget"]["calories"] == "311"
+    # Las recetas repetidas se piden una sola vez
+    assert len(spoonacular_stub.requests) == 6
+
+
+def test_fetch_all_peticion_fallida_devuelve_none():
+    with SpoonacularStub(failing_ids={7}) as stub:
+        result = RecipeFetcher("test", stub.base_url).fetch_all([7, 8])
+    assert result[7] == {
+        "information": None,
+        "analyzedInstructions": None,
+        "nutritionWidget": None,
+    }
+    assert result[8]["information"]["title"] == "Receta 8"
+
+
+def test_weekly_menu_concurrente_igual_que_secuencial():
+    # Con algo de latencia las peticiones concurrentes llegan a solaparse
+    with SpoonacularStub(latency=0.01) as stub:
+        serial = MealPlanner(api_key="test", base_url=stub.base_url, max_workers=1)
+        df_serial = serial.get_weekly_menu(2000)
+        stub.reset()
+
+        concurrent = MealPlanner(api_key="test", base_url=stub.base_url, max_workers=8)
+        df_concurrent = concurrent.get_weekly_menu(2000)
+
+    assert len(df_concurrent) == 21
+    assert df_concurrent.equals(df_serial)
+    assert df_concurrent["Meal"].iloc[0] == "monday breakfast"
+    assert df_concurrent["Meal"].iloc[-1] == "sunday dinner"
+    # 1 petición del plan + 3 por receta
+    assert len(stub.requests) == 1 + 21 * 3
+    assert stub.max_in_flight > 1
+
+
+def test_weekly_menu_concurrente_mantiene_filas_alineadas():
+    with SpoonacularStub(failing_ids={20000}) as stub:
+        df = MealPlanner(api_key="test", base_url=stub.base_url).get_weekly_menu(2000)
+    assert len(df) == 21
+    assert df.loc[0, "Name"] == ""
+    assert df.loc[1, "Name"] == "Receta 20001"
+    assert df.loc[1, "Calories"] == "301"
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_weekly_menu_sin_plan(max_workers, spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url + "/no-existe", max_workers=max_workers)
+    df = planner.get_weekly_menu(2000)
+    assert df.empty
+
+
+def test_weekly_menu_bulk_igual_que_concurrente(spoonacular_stub):
+    df_concurrent = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url).get_weekly_menu(2000)
+    spoonacular_stub.reset()
+
+    df_bulk = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, bulk=True).get_weekly_menu(2000)
+    assert df_bulk.equals(df_concurrent)
+    assert spoonacular_stub.requests == ["/mealplanner/generate", "/recipes/informationBulk"]
+
+
+def test_weekly_menu_bulk_receta_ausente():
+    with SpoonacularStub(failing_ids={20000}) as stub:
+        df = MealPlanner(api_key="test", base_url=stub.base_url, bulk=True).get_weekly_menu(2000)
+    assert len(df) == 21
+    assert df.loc[0, "Name"] == ""
+    assert df.loc[1, "Name"] == "Receta 20001"
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_iter_weekly_menu_devuelve_cada_dia_al_llegar(bulk):
+    with SpoonacularStub(latency=0.02) as stub:
+        planner = MealPlanner(api_key="test", base_url=stub.base_url, bulk=bulk)
+        df = planner.get_weekly_menu(2000)
+
+        start = time.perf_counter()
+        days = {}
+        first_day = None
+        for day, df_day in planner.iter_weekly_menu(2000):
+            first_day = first_day or time.perf_counter() - start
+            days[day] = df_day
+        total = time.perf_counter() - start
+
+    assert len(days) == 7
+    assert all(len(df_day) == 3 for df_day in days.values())
+    # Juntando los días en orden sale el mismo menú que con get_weekly_menu
+    assert pd.concat(days.values()).sort_index().equals(df)
+    assert first_day < total
+
+
+def test_iter_weekly_menu_bulk_una_llamada_por_semana(spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, bulk=True)
+    days = [day for day, _ in planner.iter_weekly_menu(2000)]
+    assert days == ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    assert spoonacular_stub.requests == ["/mealplanner/generate", "/recipes/informationBulk"]
+
+
+def test_iter_weekly_menu_sin_plan(spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url + "/no-existe")
+    assert list(planner.iter_weekly_menu(2000)) == []
+
+
+def test_base_url_desde_entorno(monkeypatch, spoonacular_stub):
+    monkeypatch.setenv("SPOONACULAR_BASE_URL", spoonacular_stub.base_url + "/")
+    planner = MealPlanner(api_key="test", bulk=True)
+    assert planner.base_url == spoonacular_stub.base_url
+    assert len(planner.get_weekly_menu(2000)) == 21
@@ -0,0 +1,99 @@
+import random
+
+import pandas as pd
+import pytest
+from fuzzywuzzy import fuzz
+
+from Decathlon.catalogo import agrupar_variantes
+from Decathlon.ofertas import IndiceOfertas, RankingOfertas
+
+
+def busqueda_fila_a_fila(suplementos, df_productos, umbral=60):
+    # Implementación original de busqueda_ofertas, usada como referencia
+    ofertas = []
+    for suplemento in suplementos:
+        for index, row in df_productos.iterrows():
+            if fuzz.partial_ratio(suplemento, row['Tipo Producto']) > umbral:
+                ofertas.append(row)
+    return pd.DataFrame(ofertas)
+
+
+@pytest.fixture(scope="module")
+def df_productos():
+    return pd.read_csv("App/productos_paginas.csv")
+
+
+@pytest.mark.parametrize(
+    "suplementos",
+    [
+        ["Whey Protein", "Creatine Monohydrate", "Fish Oil (EFAs)"],
+        ["Protein Powder", "Multivitamin", "Protein Powder"],
+    ],
+)
+def test_mismas_filas_que_la_busqueda_fila_a_fila(df_productos, suplementos):
+    esperado = busqueda_fila_a_fila(suplementos, df_productos)
+    resultado = IndiceOfertas(df_productos).buscar(suplementos)
+    assert list(resultado.index) == list(esperado.index)
+    pd.testing.assert_frame_equal(resultado, esperado, check_dtype=False)
+
+
+def test_umbral_estricto():
+    df = pd.DataFrame({"Tipo Producto": ["Proteína", "Creatina", None, "Proteína"]})
+    indice = IndiceOfertas(df)
+    puntuacion = fuzz.partial_ratio("Proteína", "Creatina")
+    assert list(indice.buscar(["Proteína"], umbral=puntuacion).index) == [0, 3]
+    assert list(indice.buscar(["Proteína"], umbral=puntuacion - 1).index) == [0, 1, 3]
+
+
+def test_sin_coincidencias_mantiene_columnas(df_productos):
+    resultado = IndiceOfertas(df_productos).buscar(["zzzzzzzzzz"])
+    assert resultado.empty
+    assert list(resultado.columns) == list(df_productos.columns)
+
+
+def test_tipos_coincidentes_igual_que_buscar(df_productos):
+    suplementos = ["Whey Protein", "Creatine Monohydrate"]
+    indice = IndiceOfertas(df_productos)
+    tipos = indice.tipos_coincidentes(suplementos)
+    assert set(tipos) == set(indice.buscar(suplementos)["Tipo Producto"])
+
+
+def test_agrupar_variantes(df_productos):
+    productos, variantes = agrupar_variantes(df_productos)
+    assert len(variantes) == len(df_productos)
+    assert productos["n_variantes"].sum() == len(df_productos)
+    assert len(productos) == df_productos["Product URL"].str.split("?").str[0].nunique()
+    # Los sabores del CellUp Energy Shot son un mismo producto
+    cellup = productos[productos["Etiqueta Web"].str.startswith("CellUp Energy Shot - 60ml Cola", na=False)]
+    assert len(cellup) == 1
+    assert cellup["n_variantes"].iloc[0] == 2
+    # Cada producto muestra su variante con más descuento
+    for posicion in [0, 100, 1000]:
+        producto = productos.iloc[posicion]
+        tramo = variantes.iloc[producto["variantes_inicio"]:][: producto["n_variantes"]]
+        assert (tramo["producto"] == posicion).all()
+        assert producto["Product URL"] == tramo["Product URL"].iloc[0]
+        assert tramo["Descuento Aplicado (en %)"].fillna(-1).is_monotonic_decreasing
+
+
+def test_ranking_mejores_por_tipo(df_productos):
+    ranking = RankingOfertas(df_productos, top_n=3)
+    assert len(ranking.tipos) == df_productos["Tipo Producto"].nunique()
+    proteina = ranking.mejores("Proteína")
+    esperado = (
+        ranking.productos[ranking.productos["Tipo Producto"] == "Proteína"]["Descuento Aplicado (en %)"]
+        .sort_values(ascending=False)
+        .head(3)
+    )
+    assert proteina["Descuento Aplicado (en %)"].tolist() == esperado.tolist()
+
+
+def test_ranking_elegir_tipos_distintos(df_productos):
+    ranking = RankingOfertas(df_productos)
+    ofertas = ranking.elegir(6, rng=random.Random(0))
+    assert len(ofertas) == 6
+    assert ofertas["Tipo Producto"].is_unique
+
+    ofertas = ranking.elegir(6, tipos=["Proteína", "Creatina", "no existe"], rng=random.Random(0))
+    assert sorted(ofertas["Tipo Producto"]) == ["Creatina", "Proteína"]
+    assert ranking.variantes_de(ofertas.index[0])["Tipo Producto"].nunique() == 1
@@ -0,0 +1,161 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Recetas.filtering import Filtering
+from Recetas.local_planner import DAYS, LocalMealPlanner, load_recipe_corpus
+from Recetas.mealplanner import MealPlanner
+from Recetas.nutrition import daily_targets, nutrition_array, parse_amount
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from tests.spoonacular_stub import recipe_bulk
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    return load_recipe_corpus()
+
+
+@pytest.fixture(scope="module")
+def pool_grande():
+    # 10.000 recetas con macronutrientes aleatorios y sus calorías coherentes
+    rng = np.random.default_rng(0)
+    macros = rng.uniform([5, 5, 2], [60, 120, 50], size=(10_000, 3))
+    calorias = macros @ np.array([4.0, 4.0, 9.0])
+    return RecipePool(np.arange(10_000) + 1, np.column_stack([calorias, macros]))
+
+
+def plan_aleatorio(pool: RecipePool, seed: int = 1) -> dict[str, list[int]]:
+    elegidas = np.random.default_rng(seed).choice(len(pool), (len(DAYS), 3), replace=False)
+    return {day: pool.ids[fila].tolist() for day, fila in zip(DAYS, elegidas)}
+
+
+def error_semanal(optimizer, pool, days_and_ids, targets):
+    plan = np.stack([pool.positions(ids) for ids in days_and_ids.values()])
+    return optimizer.deviation(plan, targets, pool).sum()
+
+
+def test_parse_amount():
+    assert parse_amount("45g") == 45.0
+    assert parse_amount("316") == 316.0
+    assert parse_amount("1,5 g") == 1.5
+    assert parse_amount(12) == 12.0
+    assert np.isnan(parse_amount(""))
+    assert np.isnan(parse_amount(None))
+
+
+def test_nutrition_array_de_filas_del_plan():
+    filas = pd.DataFrame(
+        [Filtering.filter_bulk_recipe(recipe_bulk(7)), {"Calories": 0, "Carbs": "", "Fat": "3g", "Protein": "1g"}]
+    )
+    valores = nutrition_array(filas)
+    assert valores.dtype == float
+    np.testing.assert_array_equal(valores[0], [307, 17, 27, 12])
+    assert valores[1, 0] == 0 and np.isnan(valores[1, 2])
+
+
+def test_daily_targets_segun_objetivo():
+    kcal, proteina, hidratos, grasa = daily_targets(2000, "Lose Fat")
+    assert kcal == 2000
+    assert proteina * 4 == pytest.approx(700)
+    assert proteina * 4 + hidratos * 4 + grasa * 9 == pytest.approx(2000)
+    # Con el peso, la proteína va por kg y el resto se reparte igual
+    objetivo = daily_targets(2500, "Build Muscle", body_weight=80)
+    assert objetivo[1] == pytest.approx(144)
+    assert objetivo[1] * 4 + objetivo[2] * 4 + objetivo[3] * 9 == pytest.approx(2500)
+
+
+def test_pool_descarta_recetas_sin_nutricion():
+    pool = RecipePool.from_recipes({
+        1: {"Calories": "500", "Protein": "30g", "Carbs": "50g", "Fat": "20g"},
+        2: {"Calories": 0, "Protein": 0, "Carbs": 0, "Fat": 0},
+        3: {"Calories": "400", "Protein": "", "Carbs": "10g", "Fat": "5g"},
+    })
+    assert pool.valid.tolist() == [True, False, False]
+    assert pool.positions([3, 9]).tolist() == [2, -1]
+
+
+def test_optimizar_acerca_el_plan_a_los_objetivos(pool_grande):
+    optimizer = WeeklyPlanOptimizer(pool_grande)
+    targets = daily_targets(2300, "Build Muscle", body_weight=80)
+    original = plan_aleatorio(pool_grande)
+    optimizado = optimizer.optimize(original, targets)
+
+    assert list(optimizado) == DAYS
+    ids = [meal_id for meal_ids in optimizado.values() for meal_id in meal_ids]
+    assert len(ids) == 21 and len(set(ids)) == 21
+    assert error_semanal(optimizer, pool_grande, optimizado, targets) < 0.1 * error_semanal(
+        optimizer, pool_grande, original, targets
+    )
+    # Cada día queda cerca de sus calorías y su proteína
+    plan = np.stack([pool_grande.positions(meal_ids) for meal_ids in optimizado.values()])
+    totales = pool_grande.values[plan].sum(axis=1)
+    assert (abs(totales[:, 0] - 2300) < 2300 * 0.03).all()
+    assert (abs(totales[:, 1] - targets[1]) < targets[1] * 0.05).all()
+
+
+def test_optimizar_10k_recetas_en_menos_de_50_ms(pool_grande):
+    optimizer = WeeklyPlanOptimizer(pool_grande)
+    targets = daily_targets(2300, "Build Muscle", body_weight=80)
+    plan = plan_aleatorio(pool_grande, seed=2)
+    optimizer.optimize(plan, targets)
+    inicio = time.perf_counter()
+    optimizer.optimize(plan, targets)
+    assert time.perf_counter() - inicio < 0.05
+
+
+def test_dias_con_recetas_desconocidas_no_cambian(pool_grande):
+    optimizer = WeeklyPlanOptimizer(pool_grande)
+    original = plan_aleatorio(pool_grande)
+    original["monday"] = [10**9, 10**9 + 1, 10**9 + 2]
+    optimizado = optimizer.optimize(original, daily_targets(2000))
+    assert optimizado["monday"] == original["monday"]
+    assert optimizado["tuesday"] != original["tuesday"]
+
+
+def test_local_planner_con_objetivo_mejora_la_proteina(corpus):
+    def proteina_diaria(df):
+        dia = df["Meal"].str.split().str[0]
+        return df["Protein"].str.rstrip("g").astype(float).groupby(dia, sort=False).sum()
+
+    objetivo = daily_targets(2500, "Build Muscle", body_weight=85)[1]
+    normal = LocalMealPlanner(corpus, seed=0).get_weekly_menu(2500)
+    ajustado = LocalMealPlanner(corpus, seed=0, goal="Build Muscle", body_weight=85).get_weekly_menu(2500)
+    assert len(ajustado) == 21 and ajustado["Name"].is_unique
+    assert abs(proteina_diaria(ajustado) - objetivo).mean() < abs(proteina_diaria(normal) - objetivo).mean()
+    calorias = ajustado["Calories"].astype(int).groupby(ajustado["Meal"].str.split().str[0]).sum()
+    assert (abs(calorias - 2500) <= 2500 * 0.05).all()
+
+
+@pytest.mark.parametrize("goal,body_weight", [("Build Muscle", 85), ("Lose Fat", 70), ("Lose Fat", None)])
+def test_objetivo_no_anade_comidas_incompletas(corpus, goal, body_weight):
+    def incompletas(df):
+        return ((df["Ingredients"] == "") | (df["Instructions"] == "")).sum()
+
+    for seed in range(3):
+        normal = LocalMealPlanner(corpus, seed=seed).get_weekly_menu(2200)
+        ajustado = LocalMealPlanner(corpus, seed=seed, goal=goal, body_weight=body_weight).get_weekly_menu(2200)
+        assert incompletas(ajustado) <= incompletas(normal)
+
+
+def test_pool_del_recetario_solo_propone_recetas_completas(corpus):
+    pool = RecipePool.from_corpus(corpus)
+    completas = (corpus["ingredients"] != "") & (corpus["steps"] != "")
+    assert set(pool.ids[pool.candidates]) == set(corpus.loc[completas, "id"])
+
+
+def test_mealplanner_optimiza_el_plan_de_la_api(spoonacular_stub, corpus):
+    optimizer = WeeklyPlanOptimizer(RecipePool.from_corpus(corpus))
+    planner = MealPlanner(
+        api_key="test", base_url=spoonacular_stub.base_url, bulk=True,
+        optimizer=optimizer, goal="Lose Fat", body_weight=70,
+    )
+    df = planner.get_weekly_menu(2000)
+    assert len(df) == 21
+    # Algunas recetas del plan se han cambiado por otras del recetario, que se
+    # descargan igual que las demás
+    assert df["Name"].str.startswith("Receta ").all()
+    ids = {int(name.split()[1]) for name in df["Name"]}
+    assert ids & set(corpus["id"])
+    assert spoonacular_stub.requests.count("/mealplanner/generate") == 1
@@ -0,0 +1,58 @@
+import threading
+import time
+
+import pytest
+
+from App.pages.output import TiemposCarga, en_segundo_plano
+from Recetas.mealplanner import MealPlanner
+from tests.spoonacular_stub import SpoonacularStub
+
+
+def test_en_segundo_plano_empieza_antes_de_recorrerlo():
+    empezado = threading.Event()
+
+    def generador():
+        empezado.set()
+        yield from range(3)
+
+    dias = en_segundo_plano(generador())
+    # El hilo arranca sin que nadie recorra el iterador
+    assert empezado.wait(1)
+    assert list(dias) == [0, 1, 2]
+
+
+def test_en_segundo_plano_relanza_excepciones():
+    def generador():
+        yield 1
+        raise ValueError("sin plan")
+
+    dias = en_segundo_plano(generador())
+    assert next(dias) == 1
+    with pytest.raises(ValueError, match="sin plan"):
+        next(dias)
+
+
+def test_menu_se_descarga_mientras_se_pinta_el_resto():
+    with SpoonacularStub(latency=0.2) as stub:
+        tiempos = TiemposCarga()
+        planner = MealPlanner(api_key="test", base_url=stub.base_url, bulk=True)
+        dias = en_segundo_plano(planner.iter_weekly_menu(2000))
+        # La rutina y los productos se pintan sin esperar a la API
+        tiempos.marcar('primer_contenido')
+        time.sleep(0.3)
+        for _ in dias:
+            tiempos.marcar('primer_dia')
+        tiempos.marcar('completo')
+
+    assert tiempos.hitos['primer_contenido'] < 0.05
+    # El menú ya estaba descargado cuando se terminó de pintar lo demás
+    assert tiempos.hitos['completo'] - tiempos.hitos['primer_contenido'] < 0.5
+    assert list(tiempos.hitos) == ['primer_contenido', 'primer_dia', 'completo']
+
+
+def test_tiempos_solo_guardan_la_primera_marca():
+    reloj = iter([0.0, 1.0, 2.0]).__next__
+    tiempos = TiemposCarga(reloj)
+    assert tiempos.marcar('primer_dia') == 1.0
+    assert tiempos.marcar('primer_dia') == 1.0
+    assert tiempos.hitos == {'primer_dia': 1.0}
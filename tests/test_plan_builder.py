@@ -0,0 +1,65 @@
+import tracemalloc
+
+import numpy as np
+
+from Recetas.mealplanner import MealPlanner
+from Recetas.plan_builder import MealPlanBuilder
+
+DAYS_AND_IDS = {"monday": [1, 2, 3], "tuesday": [4, 2, 5]}
+
+
+def test_filas_en_orden_del_plan_y_vacias_por_defecto():
+    plan = MealPlanBuilder(DAYS_AND_IDS)
+    df = plan.to_dataframe()
+    assert list(df.columns) == MealPlanBuilder.COLUMNS
+    assert df["Meal"].tolist() == [
+        "monday breakfast", "monday lunch", "monday dinner",
+        "tuesday breakfast", "tuesday lunch", "tuesday dinner",
+    ]
+    assert (df["Name"] == "").all()
+    assert (df["Calories"] == 0).all()
+    assert plan.recipe_ids == [1, 2, 3, 4, 5]
+
+
+def test_rellenar_en_cualquier_orden():
+    plan = MealPlanBuilder(DAYS_AND_IDS)
+    # Las respuestas llegan desordenadas y por partes
+    plan.set("tuesday", 3, 5, {"Calories": "500"})
+    plan.set_recipe(2, {"Name": "Pasta", "Calories": "300"})
+    plan.set("monday", 1, 1, {"Name": "Tostadas"})
+    plan.set("tuesday", 3, 5, {"Name": "Pescado"})
+
+    df = plan.to_dataframe()
+    assert df["Name"].tolist() == ["Tostadas", "Pasta", "", "", "Pasta", "Pescado"]
+    assert df["Calories"].tolist() == [0, "300", 0, 0, "300", "500"]
+
+
+def test_to_dataframe_no_copia():
+    plan = MealPlanBuilder(DAYS_AND_IDS)
+    df = plan.to_dataframe()
+    assert np.shares_memory(df.to_numpy(), plan.values)
+
+
+def test_planner_reutilizado_no_acumula_filas(spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, bulk=True)
+    first = planner.get_weekly_menu(2000)
+    second = planner.get_weekly_menu(2000)
+    assert len(second) == 21
+    assert second.equals(first)
+    assert len(planner.daily_meals_plan["Meal"]) == 21
+
+
+def test_memoria_estable_con_muchos_planes(spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, bulk=True)
+    for _ in range(5):
+        planner.get_weekly_menu(2000)
+
+    tracemalloc.start()
+    planner.get_weekly_menu(2000)
+    before, _ = tracemalloc.get_traced_memory()
+    for _ in range(50):
+        planner.get_weekly_menu(2000)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Con el dict de listas cada plan añadía 21 filas; ahora no crece
+    assert after - before < 64 * 1024
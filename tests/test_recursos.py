@@ -0,0 +1,60 @@
+import shutil
+import subprocess
+import sys
+
+import pytest
+import streamlit as st
+
+from App import recursos
+
+
+@pytest.fixture
+def datos(tmp_path, monkeypatch):
+    # Copias de los datos para que las instantáneas se escriban en tmp_path
+    for nombre in ["rutinas.csv", "productos_paginas.csv"]:
+        shutil.copy(f"App/{nombre}", tmp_path / nombre)
+    shutil.copytree(recursos.DIRECTORIO_RECETARIO, tmp_path / "recetario")
+    monkeypatch.setattr(recursos, "RUTA_RUTINAS", str(tmp_path / "rutinas.csv"))
+    monkeypatch.setattr(recursos, "RUTA_PRODUCTOS", str(tmp_path / "productos_paginas.csv"))
+    monkeypatch.setattr(recursos, "DIRECTORIO_RECETARIO", str(tmp_path / "recetario"))
+    st.cache_resource.clear()
+    yield tmp_path
+    st.cache_resource.clear()
+
+
+@pytest.mark.parametrize("paquete", ["Recetas", "Rutinas", "Decathlon", "Servicio", "Utilidades"])
+def test_importar_paquete_no_carga_dependencias(paquete):
+    codigo = (
+        f"import sys, {paquete}\n"
+        "cargados = [m for m in ('pandas', 'requests', 'fuzzywuzzy', 'dotenv') if m in sys.modules]\n"
+        "assert not cargados, cargados\n"
+        f"assert all(getattr({paquete}, nombre) for nombre in {paquete}.__all__)\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], check=True)
+
+
+def test_nombre_desconocido():
+    import Recetas
+
+    with pytest.raises(AttributeError):
+        Recetas.NoExiste
+
+
+def test_calentar_llena_las_caches(datos):
+    tiempos = recursos.calentar()
+    assert list(tiempos) == list(recursos.PASOS_CALENTAMIENTO)
+    assert (datos / ".snapshots").is_dir()
+    assert (datos / "recetario" / ".snapshots").is_dir()
+    # La página recibe los objetos ya construidos, sin volver a leer nada
+    rutinas = recursos.obtener_rutinas()
+    assert recursos.obtener_indice_rutinas().workouts is rutinas
+    assert len(recursos.obtener_recetario()) == 1090
+
+
+def test_calentamiento_una_vez_por_proceso(datos, monkeypatch):
+    llamadas = []
+    monkeypatch.setattr(recursos, "calentar", lambda: llamadas.append(1))
+    primero = recursos.iniciar_calentamiento()
+    assert recursos.iniciar_calentamiento() is primero
+    primero.join(5)
+    assert llamadas == [1]
@@ -0,0 +1,51 @@
+import pandas as pd
+import pytest
+
+from App.perfil import rutina_personalizada
+from Rutinas.indice import IndiceRutinas
+
+
+@pytest.fixture(scope="module")
+def workouts():
+    return pd.read_csv("App/rutinas.csv")
+
+
+def filtro_con_mascaras(workouts, objetivo, nivel, genero):
+    filtradas = workouts[
+        (workouts['Main Goal'] == objetivo) &
+        (workouts['Training Level'] == nivel) &
+        ((workouts['Target Gender'] == genero) | (workouts['Target Gender'] == 'Male & Female'))
+    ]
+    return set(filtradas['Workout Title'])
+
+
+@pytest.mark.parametrize("genero", ["Male", "Female"])
+def test_indice_igual_que_las_mascaras(workouts, genero):
+    indice = IndiceRutinas(workouts)
+    for objetivo in workouts['Main Goal'].unique():
+        for nivel in workouts['Training Level'].unique():
+            esperado = filtro_con_mascaras(workouts, objetivo, nivel, genero)
+            assert set(indice.titulos(objetivo, nivel, genero)) == esperado
+
+
+def test_filas_de_un_titulo(workouts):
+    indice = IndiceRutinas(workouts)
+    titulo = workouts['Workout Title'].iloc[0]
+    pd.testing.assert_frame_equal(
+        indice.filas(titulo), workouts[workouts['Workout Title'] == titulo]
+    )
+
+
+def test_rutina_personalizada_respeta_el_filtro(workouts):
+    indice = IndiceRutinas(workouts)
+    validas = filtro_con_mascaras(workouts, 'Build Muscle', 'Advanced', 'Female')
+    for _ in range(20):
+        titulo, filas = rutina_personalizada(workouts, 'Advanced', 'Mujer', 'Build Muscle', indice)
+        assert titulo in validas
+        assert (filas['Workout Title'] == titulo).all()
+
+
+def test_rutina_personalizada_sin_coincidencias_elige_cualquiera(workouts):
+    titulo, filas = rutina_personalizada(workouts, 'Advanced', 'Hombre', 'Sports Performance')
+    assert titulo in set(workouts['Workout Title'])
+    assert not filas.empty
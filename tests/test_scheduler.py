@@ -0,0 +1,100 @@
+import pytest
+
+from Recetas.mealplanner import MealPlanner
+from Recetas.scheduler import RequestScheduler, TokenBucket
+from tests.spoonacular_stub import SpoonacularStub
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def scheduler(keys, **kwargs):
+    opciones = {"rate_per_key": 1000, "burst": 1000, "backoff_base": 0.001, **kwargs}
+    return RequestScheduler(keys, **opciones)
+
+
+def test_token_bucket():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.5)
+    clock.now = 1.0
+    assert bucket.wait_time() == 0
+
+
+def test_reparte_entre_keys_con_limite_de_ritmo():
+    clock = FakeClock()
+    s = RequestScheduler(["k1", "k2"], rate_per_key=1, burst=1, clock=clock)
+    waits = [s._acquire_key() for _ in range(4)]
+    assert [state.key for state, _ in waits] == ["k1", "k2", "k1", "k2"]
+    assert [wait for _, wait in waits] == [0, 0, pytest.approx(1), pytest.approx(1)]
+
+
+def test_from_env(monkeypatch):
+    for name in ["TEST_KEY1", "TEST_KEY2", "TEST_KEY10", "TEST_KEYX"]:
+        monkeypatch.setenv(name, name.lower())
+    s = RequestScheduler.from_env("TEST_KEY")
+    assert [state.key for state in s.keys] == ["test_key1", "test_key2", "test_key10"]
+
+
+def test_from_env_lee_el_dotenv_y_sin_keys_devuelve_none(monkeypatch):
+    import Recetas.scheduler
+
+    monkeypatch.delenv("TEST_KEY1", raising=False)
+    assert RequestScheduler.from_env("TEST_KEY") is None
+    # Las keys que solo están en el .env también cuentan
+    monkeypatch.setattr(Recetas.scheduler, "load_dotenv", lambda: monkeypatch.setenv("TEST_KEY1", "k"))
+    assert [state.key for state in RequestScheduler.from_env("TEST_KEY").keys] == ["k"]
+
+
+def test_reintenta_429():
+    with SpoonacularStub(rate_limit_every=3, retry_after=0.01) as stub:
+        s = scheduler(["k1"])
+        url = f"{stub.base_url}/recipes/1/information"
+        responses = [s.get(url) for _ in range(6)]
+    assert all(r.status_code == 200 for r in responses)
+    assert stub.faults[429] >= 2
+    metrics = s.metrics()
+    assert metrics["retries"] == stub.faults[429]
+    assert metrics["keys"][0]["throttled"] == stub.faults[429]
+    assert metrics["failures"] == 0
+
+
+def test_reintenta_errores_del_servidor():
+    with SpoonacularStub(server_errors=2) as stub:
+        s = scheduler(["k1"])
+        response = s.get(f"{stub.base_url}/recipes/1/information")
+    assert response.status_code == 200
+    assert s.metrics()["retries"] == 2
+
+
+def test_rota_keys_al_agotar_la_cuota():
+    with SpoonacularStub(quota_per_key=3) as stub:
+        s = scheduler(["k1", "k2"])
+        url = f"{stub.base_url}/recipes/1/information"
+        responses = [s.get(url) for _ in range(6)]
+        assert all(r.status_code == 200 for r in responses)
+        assert stub.used_quota == {"k1": 3, "k2": 3}
+        # Con X-API-Quota-Left a cero las keys se retiran antes de recibir un 402
+        assert 402 not in stub.faults
+
+        assert s.get(url) is None
+    metrics = s.metrics()
+    assert [k["available"] for k in metrics["keys"]] == [False, False]
+    assert metrics["failures"] == 1
+
+
+def test_mealplanner_con_scheduler_y_fallos():
+    with SpoonacularStub(rate_limit_every=5, retry_after=0.01, server_errors=1) as stub:
+        s = scheduler(["k1", "k2", "k3"])
+        planner = MealPlanner(base_url=stub.base_url, scheduler=s)
+        df = planner.get_weekly_menu(2000)
+    assert len(df) == 21
+    assert (df["Name"] != "").all()
+    assert set(stub.keys) == {"k1", "k2", "k3"}
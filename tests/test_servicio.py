@@ -0,0 +1,268 @@
+import asyncio
+import gc
+import shutil
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from App.recursos import DIRECTORIO_RECETARIO
+from Decathlon.catalogo import cargar_productos
+from Decathlon.ofertas import IndiceOfertas, RankingOfertas
+from Recetas.cache import RecipeCache
+from Recetas.local_planner import cargar_recetario
+from Recetas.mealplanner import MealPlanner
+from Recetas.optimizer import RecipePool, WeeklyPlanOptimizer
+from Recetas.plan_builder import MealPlanBuilder
+from Rutinas.catalogo import cargar_rutinas
+from Rutinas.ejercicios import IndiceEjercicios, cargar_ejercicios
+from Rutinas.indice import IndiceRutinas
+from Servicio.cliente import ClienteServicio
+from Servicio.planes import ServicioPlanes
+from Servicio.servidor import ServidorPlanes
+from Servicio.singleflight import SingleFlight
+from tests.spoonacular_stub import SpoonacularStub
+
+
+@pytest.fixture(scope="module")
+def catalogos(tmp_path_factory):
+    # Copias de los datos para que las instantáneas se escriban fuera del repositorio
+    directorio = tmp_path_factory.mktemp("datos")
+    for nombre in ["rutinas.csv", "productos_paginas.csv"]:
+        shutil.copy(f"App/{nombre}", directorio / nombre)
+    shutil.copytree(DIRECTORIO_RECETARIO, directorio / "recetario")
+    rutinas = cargar_rutinas(str(directorio / "rutinas.csv"))
+    productos = cargar_productos(str(directorio / "productos_paginas.csv"))
+    return {
+        "indice_rutinas": IndiceRutinas(rutinas),
+        "indice_ejercicios": IndiceEjercicios(cargar_ejercicios(str(directorio / "rutinas.csv")), rutinas),
+        "indice_ofertas": IndiceOfertas(productos),
+        "ranking_ofertas": RankingOfertas(productos),
+        "recetario": cargar_recetario(str(directorio / "recetario")),
+    }
+
+
+@pytest.fixture
+def stub():
+    with SpoonacularStub(latency=0.05) as stub:
+        yield stub
+
+
+@pytest.fixture
+def cliente(stub, catalogos):
+    planner = MealPlanner(api_key="test", base_url=stub.base_url, cache=RecipeCache(), bulk=True)
+    with ServidorPlanes(ServicioPlanes(planner, **catalogos)) as servidor:
+        yield ClienteServicio(servidor.url)
+
+
+def test_singleflight_agrupa_llamadas_iguales():
+    llamadas = []
+
+    async def trabajo():
+        llamadas.append(1)
+        await asyncio.sleep(0.01)
+        return 42
+
+    async def escenario():
+        grupo = SingleFlight()
+        resultados = await asyncio.gather(*(grupo.hacer("2000", trabajo) for _ in range(20)))
+        # Terminado el trabajo, la clave se libera
+        assert grupo.en_curso == 0
+        assert await grupo.hacer("2000", trabajo) == 42
+        return grupo, resultados
+
+    grupo, resultados = asyncio.run(escenario())
+    assert resultados == [42] * 20
+    assert llamadas == [1, 1]
+    assert (grupo.ejecutadas, grupo.coalescidas) == (2, 19)
+
+
+def test_singleflight_lote_solo_pide_las_claves_nuevas():
+    lotes = []
+
+    async def descargar(claves):
+        lotes.append(sorted(claves))
+        await asyncio.sleep(0.01)
+        # La 3 no existe: vale None
+        return {clave: f"receta {clave}" for clave in claves if clave != 3}
+
+    async def escenario():
+        grupo = SingleFlight()
+        return await asyncio.gather(
+            grupo.hacer_lote([1, 2, 3], descargar),
+            grupo.hacer_lote([2, 3, 4, 4], descargar),
+        )
+
+    primero, segundo = asyncio.run(escenario())
+    assert lotes == [[1, 2, 3], [4]]
+    assert primero == {1: "receta 1", 2: "receta 2", 3: None}
+    assert segundo == {2: "receta 2", 3: None, 4: "receta 4"}
+
+
+def test_singleflight_cancelar_un_cliente_no_cancela_a_los_demas():
+    async def trabajo():
+        await asyncio.sleep(0.05)
+        return "plan"
+
+    async def escenario():
+        grupo = SingleFlight()
+        primero = asyncio.ensure_future(grupo.hacer("plan", trabajo))
+        segundo = asyncio.ensure_future(grupo.hacer("plan", trabajo))
+        await asyncio.sleep(0.01)
+        primero.cancel()
+        return await segundo
+
+    assert asyncio.run(escenario()) == "plan"
+
+
+def test_singleflight_propaga_errores():
+    async def trabajo():
+        raise ValueError("sin plan")
+
+    async def escenario():
+        grupo = SingleFlight()
+        return await asyncio.gather(
+            grupo.hacer_lote([1], lambda _: trabajo()),
+            grupo.hacer_lote([1], lambda _: trabajo()),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(resultado, ValueError) for resultado in asyncio.run(escenario()))
+
+
+def test_singleflight_errores_sin_esperar_no_avisan():
+    # Si el lote falla y nadie espera algunas de sus claves (el cliente se
+    # desconectó o la primera clave ya lanzó la excepción), asyncio no debe
+    # avisar de que nunca se recuperó
+    avisos = []
+
+    async def trabajo():
+        await asyncio.sleep(0.01)
+        raise ValueError("sin recetas")
+
+    async def escenario():
+        asyncio.get_running_loop().set_exception_handler(lambda _, contexto: avisos.append(contexto))
+        grupo = SingleFlight()
+        cliente = asyncio.ensure_future(grupo.hacer_lote([1, 2, 3], lambda _: trabajo()))
+        desconectado = asyncio.ensure_future(grupo.hacer("plan", trabajo))
+        await asyncio.sleep(0)
+        desconectado.cancel()
+        with pytest.raises(ValueError):
+            await cliente
+        await asyncio.sleep(0.05)
+        del cliente, desconectado
+        gc.collect()
+
+    asyncio.run(escenario())
+    assert avisos == []
+
+
+def esperar(condicion, timeout: float = 10) -> None:
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite, "timeout"
+        time.sleep(0.01)
+
+
+def test_usuarios_concurrentes_comparten_las_peticiones(cliente, stub):
+    # 30 usuarios a la vez en el mismo tramo de calorías (2010 y 1990 caen en 2000)
+    def pedir(calorias):
+        return list(cliente.iter_weekly_menu(calorias, usar_api=True))
+
+    def llegados(tipo: str) -> int:
+        return sum(cliente.estadisticas()[tipo].values())
+
+    # El servidor de pruebas no contesta hasta que todos los usuarios esperan
+    # la misma petición, así los agrupados no dependen de cuándo llega cada uno
+    plan = stub.hold("/mealplanner/generate")
+    recetas = stub.hold("/recipes/informationBulk")
+    with ThreadPoolExecutor(max_workers=30) as pool:
+        futuros = [pool.submit(pedir, calorias) for calorias in [2010, 1990] * 15]
+        esperar(lambda: llegados("planes") == 30)
+        plan.set()
+        esperar(lambda: llegados("recetas") == 30 * 21)
+        recetas.set()
+        menus = [futuro.result() for futuro in futuros]
+
+    # Un plan semanal y una petición bulk con todas sus recetas para todos los usuarios
+    assert stub.requests.count("/mealplanner/generate") == 1
+    assert stub.requests.count("/recipes/informationBulk") == 1
+    for menu in menus:
+        assert len(menu) == 7
+        for dia, filas in menu:
+            assert list(filas.columns) == MealPlanBuilder.COLUMNS
+            assert len(filas) == 3
+            assert filas["Name"].str.startswith("Receta ").all()
+
+    estadisticas = cliente.estadisticas()
+    assert estadisticas["planes"] == {"ejecutados": 1, "agrupados": 29}
+    assert estadisticas["recetas"] == {"ejecutadas": 21, "agrupadas": 29 * 21}
+
+
+def test_menu_igual_que_mealplanner(cliente, stub):
+    servido = {dia: filas for dia, filas in cliente.iter_weekly_menu(2000, usar_api=True)}
+    directo = MealPlanner(api_key="test", base_url=stub.base_url, bulk=True)
+    for dia, filas in directo.iter_weekly_menu(2000):
+        assert servido[dia].to_dict("records") == filas.to_dict("records")
+
+
+def test_menu_con_objetivo_igual_que_mealplanner(stub, catalogos):
+    # Con optimizer, el servicio ajusta el menú al objetivo y al peso del
+    # usuario igual que el MealPlanner de la página
+    optimizer = WeeklyPlanOptimizer(RecipePool.from_corpus(catalogos["recetario"]))
+    planner = MealPlanner(api_key="test", base_url=stub.base_url, cache=RecipeCache(), bulk=True, optimizer=optimizer)
+    with ServidorPlanes(ServicioPlanes(planner, **catalogos)) as servidor:
+        cliente = ClienteServicio(servidor.url)
+        servido = dict(cliente.iter_weekly_menu(2000, usar_api=True, objetivo="Lose Fat", peso=70))
+        sin_objetivo = dict(cliente.iter_weekly_menu(2000, usar_api=True))
+    directo = MealPlanner(
+        api_key="test", base_url=stub.base_url, bulk=True, optimizer=optimizer, goal="Lose Fat", body_weight=70
+    )
+    for dia, filas in directo.iter_weekly_menu(2000):
+        assert servido[dia].to_dict("records") == filas.to_dict("records")
+    assert any(servido[dia]["Name"].tolist() != sin_objetivo[dia]["Name"].tolist() for dia in servido)
+    assert stub.requests.count("/mealplanner/generate") == 2
+
+
+def test_menu_local(cliente, stub):
+    menu = list(cliente.iter_weekly_menu(2000, usar_api=False))
+    assert [dia for dia, _ in menu] == ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+    assert stub.requests == []
+
+
+def test_rutina_y_ofertas(cliente):
+    titulo, rutina, ejercicios = cliente.rutina("Beginner", "Hombre", "Build Muscle")
+    assert titulo
+    assert {"Workout Type", "Program Duration", "Days Per Week", "Recommended Supps"} <= set(rutina.columns)
+    assert {"fila", "day", "exercise", "sets", "reps", "notes"} <= set(ejercicios.columns)
+    assert not ejercicios.empty
+
+    recomendadas, otras = cliente.ofertas(["Protein", "Creatine"])
+    assert 0 < len(recomendadas) <= 6
+    assert len(otras) == 6
+    assert otras["Tipo Producto"].is_unique
+    assert cliente.ofertas([])[0] is None
+
+
+def test_peticiones_no_validas(cliente):
+    respuesta = cliente.session.post(f"{cliente.url}/menu", json={})
+    assert respuesta.status_code == 400
+    assert cliente.session.get(f"{cliente.url}/menu").status_code == 405
+    assert cliente.session.get(f"{cliente.url}/no-existe").status_code == 404
+    # La conexión sigue sirviendo después de un error
+    assert cliente.session.get(f"{cliente.url}/salud").json() == {"ok": True}
+    with pytest.raises(requests.HTTPError):
+        cliente._post("/rutina", {"nivel": "Beginner"})
+
+
+def test_servicio_no_importa_la_pagina():
+    # El proceso del servicio no carga Streamlit ni la página de resultados
+    codigo = (
+        "import sys, Servicio.planes\n"
+        "cargados = [m for m in ('streamlit', 'fuzzywuzzy', 'App.pages.output') if m in sys.modules]\n"
+        "assert not cargados, cargados\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], check=True)
@@ -0,0 +1,147 @@
+import json
+import shutil
+import socket
+
+import pytest
+import requests
+from loguru import logger
+
+from Recetas.fetcher import RecipeFetcher
+from Recetas.mealplanner import MealPlanner
+from Recetas.scheduler import RequestScheduler
+from Rutinas.catalogo import cargar_rutinas
+from Telemetria.trazas import TRAZADOR, Trazador, registrar_payload
+
+
+@pytest.fixture
+def mensajes():
+    recibidos = []
+    sink = logger.add(lambda mensaje: recibidos.append(str(mensaje)), level="DEBUG")
+    yield recibidos
+    logger.remove(sink)
+
+
+@pytest.fixture
+def trazas(tmp_path):
+    # El trazador global empieza vacío y escribe sus tramos en un JSONL temporal
+    ruta = tmp_path / "trazas.jsonl"
+    TRAZADOR.reiniciar()
+    TRAZADOR.exportar_a(str(ruta))
+    yield ruta
+    TRAZADOR.exportar_a(None)
+
+
+def leer(ruta) -> list[dict]:
+    return [json.loads(linea) for linea in ruta.read_text().splitlines()]
+
+
+def test_percentiles_y_errores():
+    trazador = Trazador()
+    for ms in range(1, 101):
+        trazador.registrar("paso", ms / 1000)
+    with pytest.raises(ValueError):
+        with trazador.tramo("paso"):
+            raise ValueError
+    resumen = trazador.resumen()["paso"]
+    assert resumen["llamadas"] == 101
+    assert resumen["errores"] == 1
+    assert resumen["p50"] == pytest.approx(0.050, abs=0.002)
+    assert resumen["p99"] == pytest.approx(0.099, abs=0.002)
+
+
+def test_percentiles_de_las_ultimas_muestras():
+    trazador = Trazador()
+    for _ in range(5000):
+        trazador.registrar("paso", 1.0)
+    for _ in range(1024):
+        trazador.registrar("paso", 0.001)
+    assert trazador.resumen()["paso"]["p99"] == 0.001
+
+
+def test_exporta_json_lines(tmp_path):
+    ruta = tmp_path / "trazas.jsonl"
+    trazador = Trazador(str(ruta))
+    with trazador.tramo("http.recipes/information", receta=7) as tramo:
+        tramo.anotar(status=200)
+    trazador.exportar_a(None)
+    (linea,) = leer(ruta)
+    assert linea["tramo"] == "http.recipes/information"
+    assert (linea["receta"], linea["status"], linea["error"]) == (7, 200, False)
+    assert linea["ms"] >= 0
+
+
+def test_servir_metricas_prometheus():
+    trazador = Trazador()
+    trazador.registrar('csv."rutinas"', 0.25)
+    servidor = trazador.servir(0)
+    try:
+        respuesta = requests.get(f"http://127.0.0.1:{servidor.server_address[1]}/metrics", timeout=5)
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+    assert respuesta.headers["Content-Type"].startswith("text/plain")
+    lineas = respuesta.text.splitlines()
+    assert 'fitplanner_tramo_segundos{tramo="csv.\\"rutinas\\"",quantile="0.5"} 0.250000' in lineas
+    assert 'fitplanner_tramo_segundos_count{tramo="csv.\\"rutinas\\""} 1' in lineas
+    assert 'fitplanner_tramo_errores_total{tramo="csv.\\"rutinas\\""} 0' in lineas
+
+
+def test_registrar_payload_muestreado_y_perezoso(mensajes):
+    llamadas = []
+
+    def payload():
+        llamadas.append(1)
+        return {"receta": 1}
+
+    # Fuera de la muestra el payload ni se calcula
+    registrar_payload("Respuesta: {}", payload, tasa=0)
+    assert llamadas == []
+    registrar_payload("Respuesta: {}", payload, tasa=1)
+    assert llamadas == [1]
+    assert "Respuesta: {'receta': 1}" in mensajes[-1]
+
+
+def test_mealplanner_no_escribe_la_api_key(mensajes):
+    MealPlanner(api_key="clave-secreta")
+    assert mensajes
+    assert not any("clave-secreta" in mensaje for mensaje in mensajes)
+
+
+def test_error_de_conexion_no_escribe_la_api_key(mensajes):
+    # Un puerto sin nadie escuchando: requests falla con la URL completa en el mensaje
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        base_url = f"http://127.0.0.1:{s.getsockname()[1]}"
+    assert RecipeFetcher("clave-secreta", base_url).fetch("information", 7) is None
+    scheduler = RequestScheduler(["clave-secreta"], max_retries=0)
+    assert RecipeFetcher(None, base_url, scheduler=scheduler).fetch("information", 7) is None
+
+    errores = [mensaje for mensaje in mensajes if "ConnectionError" in mensaje]
+    # El fetcher y el scheduler dicen qué falló y dónde, sin la key
+    assert len(errores) == 2
+    assert "recipes/7/information" in errores[1]
+    assert not any("clave-secreta" in mensaje for mensaje in mensajes)
+
+
+def test_tramos_del_menu_semanal(trazas, spoonacular_stub):
+    planner = MealPlanner(api_key="test", base_url=spoonacular_stub.base_url, bulk=True)
+    planner.get_weekly_menu(2000)
+    resumen = TRAZADOR.resumen()
+    assert resumen["http.mealplanner/generate"]["llamadas"] == 1
+    assert resumen["http.recipes/informationBulk"]["llamadas"] == 1
+    assert resumen["filtering.bulk_recipes"]["llamadas"] == 1
+    assert resumen["filtering.id_by_meal"]["llamadas"] == 1
+    assert resumen["mealplanner.weekly_menu"]["llamadas"] == 1
+    # Las peticiones no llevan los IDs en el nombre del tramo, sí el código HTTP
+    http = [t for t in leer(trazas) if t["tramo"].startswith("http.")]
+    assert {t["status"] for t in http} == {200}
+
+
+def test_tramo_de_carga_csv(trazas, tmp_path):
+    ruta = tmp_path / "rutinas.csv"
+    shutil.copy("App/rutinas.csv", ruta)
+    cargar_rutinas(str(ruta))
+    cargar_rutinas(str(ruta))
+    cargas = [t for t in leer(trazas) if t["tramo"] == "csv.rutinas"]
+    assert [t["origen"] for t in cargas] == ["csv", "instantanea"]
+    assert cargas[0]["filas"] == 534